@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.dependencies.repositories import (
+    get_export_chat_use_case,
+    get_import_chat_use_case,
+    require_admin_token,
+)
+from app.use_case.archive_chat import ExportChatUseCase, ImportChatUseCase
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/chats/{id}/archive", response_class=StreamingResponse)
+async def export_chat_archive(
+    id: int,
+    use_case: ExportChatUseCase = Depends(get_export_chat_use_case),
+):
+    """
+    Выгрузить чат со всеми сообщениями в архив (gzip NDJSON).
+
+    Архив отдается потоком по мере чтения из БД серверным курсором.
+
+    Args:
+        id (int): ID чата.
+        use_case (ExportChatUseCase): UseCase для выгрузки чата.
+
+    Returns:
+        StreamingResponse: Файл chat-{id}.ndjson.gz.
+
+    Raises:
+        HTTPException 403: Если токен администратора не передан или неверен.
+        HTTPException 404: Если чат с указанным ID не найден.
+    """
+    chat = await use_case.get_chat(id)
+    return StreamingResponse(
+        use_case.export(chat),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="chat-{id}.ndjson.gz"'},
+    )
+
+
+@router.post("/chats/import", status_code=status.HTTP_201_CREATED)
+async def import_chat_archive(
+    request: Request,
+    use_case: ImportChatUseCase = Depends(get_import_chat_use_case),
+) -> dict:
+    """
+    Восстановить чат из архива, переданного телом запроса.
+
+    Тело читается и загружается потоково, без буферизации в памяти.
+
+    Args:
+        request (Request): Запрос с архивом (gzip NDJSON) в теле.
+        use_case (ImportChatUseCase): UseCase для восстановления чата.
+
+    Returns:
+        dict: ID нового чата, число сообщений, размер архива, время и скорость (строк/с).
+
+    Raises:
+        HTTPException 400: Если архив поврежден или в неизвестном формате.
+        HTTPException 403: Если токен администратора не передан или неверен.
+        HTTPException 500: Если сообщения не удалось сохранить.
+    """
+    chat_id, stats = await use_case.execute(request.stream())
+    return {"chat_id": chat_id, **stats.as_dict()}
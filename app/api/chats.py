@@ -1,19 +1,41 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, Response, status
+from fastapi.responses import StreamingResponse
 from app.dependencies.repositories import (
     get_create_chat_use_case,
     get_send_message_use_case,
+    get_send_messages_batch_use_case,
     get_chat_use_case,
+    get_list_chats_use_case,
     get_delete_chat_use_case,
+    get_purge_chat_use_case,
+    get_stream_chat_use_case,
+    get_search_messages_use_case,
+)
+from app.schemas.chats import ChatListSchema, ChatSchemas, ChatWithMessagesSchema
+from app.schemas.cursors import MessageCursor
+from app.cache.encoded_pages import encoded_page_cache
+from app.schemas.compression import compress_body, negotiate_encoding
+from app.schemas.encoders import JSONBytesResponse, encode_chat_page, match_etag, page_headers
+from app.schemas.messages import MessageSchemas, MessageBatchSchemas, MessageSearchSchema
+from app.schemas.responses import (
+    ChatResponseSchema,
+    ChatListResponseSchema,
+    MessageResponseSchema,
+    MessageBatchResponseSchema,
+    ChatWithMessagesResponseSchema,
+    MessageSearchResponseSchema,
 )
-from app.schemas.chats import ChatSchemas, ChatWithMessagesSchema
-from app.schemas.messages import MessageSchemas
-from app.schemas.responses import ChatResponseSchema, MessageResponseSchema, ChatWithMessagesResponseSchema
 from app.use_case.create_chat import CreateChatUseCase
 from app.use_case.delete_chat import DeleteChatUseCase
 from app.use_case.get_chat import GetChatUseCase
+from app.use_case.list_chats import ListChatsUseCase
+from app.use_case.purge_chat import PurgeChatUseCase
+from app.use_case.search_messages import SearchMessagesUseCase
 from app.use_case.send_message import SendMessageUseCase
+from app.use_case.send_messages_batch import SendMessagesBatchUseCase
+from app.use_case.stream_chat import StreamChatUseCase
 
 router = APIRouter(prefix="/chats", tags=["chats"])
 
@@ -39,6 +61,30 @@ async def create_chat(
     return await use_case.execute(data)
 
 
+@router.get("/", response_model=ChatListResponseSchema)
+async def list_chats(
+    data: Annotated[ChatListSchema, Depends()],
+    use_case: ListChatsUseCase = Depends(get_list_chats_use_case),
+):
+    """
+    Получить список чатов, последние по активности — первыми.
+
+    Args:
+        data (ChatListSchema): Размер страницы (по умолчанию 20, максимум 100) и курсор.
+        use_case (ListChatsUseCase): UseCase для списка чатов.
+
+    Returns:
+        ChatListResponseSchema: Чаты с временем и ID последнего сообщения и числом
+            сообщений и курсор следующей страницы.
+
+    Raises:
+        HTTPException 400: Если курсор некорректен.
+        HTTPException 500: Если список не удалось получить.
+    """
+    chats, next_cursor = await use_case.execute(data.limit, data.cursor)
+    return ChatListResponseSchema(chats=[chat._asdict() for chat in chats], next_cursor=next_cursor)
+
+
 @router.post("/{id}/messages/", response_model=MessageResponseSchema, status_code=status.HTTP_201_CREATED)
 async def send_message_in_chat(
     id: int,
@@ -63,53 +109,221 @@ async def send_message_in_chat(
     return await use_case.execute(id, data.text)
 
 
+@router.post("/{id}/messages/batch", response_model=MessageBatchResponseSchema, status_code=status.HTTP_201_CREATED)
+async def send_messages_batch_in_chat(
+    id: int,
+    data: MessageBatchSchemas,
+    use_case: SendMessagesBatchUseCase = Depends(get_send_messages_batch_use_case),
+):
+    """
+    Загрузить пачку сообщений в существующий чат одной транзакцией.
+
+    Args:
+        id (int): ID чата, в который загружаются сообщения.
+        data (MessageBatchSchemas): Схема Pydantic со списком сообщений (до 5000 штук).
+        use_case (SendMessagesBatchUseCase): UseCase для пакетной загрузки сообщений.
+
+    Returns:
+        MessageBatchResponseSchema: ID чата и ID созданных сообщений в порядке запроса.
+
+    Raises:
+        HTTPException 404: Если чат с указанным chat_id не существует.
+        HTTPException 500: Если сообщения не удалось сохранить.
+    """
+    ids = await use_case.execute(id, data)
+    return MessageBatchResponseSchema(chat_id=id, ids=ids)
+
+
+@router.get("/messages/search", response_model=MessageSearchResponseSchema)
+async def search_messages(
+    data: Annotated[MessageSearchSchema, Depends()],
+    use_case: SearchMessagesUseCase = Depends(get_search_messages_use_case),
+):
+    """
+    Найти сообщения во всех чатах.
+
+    Args:
+        data (MessageSearchSchema): Запрос q (синтаксис websearch: "фраза", OR, -слово),
+            размер страницы (по умолчанию 20, максимум 100) и курсор.
+        use_case (SearchMessagesUseCase): UseCase для поиска сообщений.
+
+    Returns:
+        MessageSearchResponseSchema: Сообщения по убыванию релевантности с рангом
+            и фрагментом, где найденные слова выделены <b>...</b>, и курсор следующей страницы.
+
+    Raises:
+        HTTPException 400: Если курсор некорректен.
+        HTTPException 500: Если поиск завершился ошибкой.
+    """
+    hits, next_cursor = await use_case.execute(data.q, data.limit, data.cursor)
+    return MessageSearchResponseSchema(messages=[hit._asdict() for hit in hits], next_cursor=next_cursor)
+
+
+@router.get("/{id}/messages/search", response_model=MessageSearchResponseSchema)
+async def search_chat_messages(
+    id: int,
+    data: Annotated[MessageSearchSchema, Depends()],
+    use_case: SearchMessagesUseCase = Depends(get_search_messages_use_case),
+):
+    """
+    Найти сообщения в чате.
+
+    Args:
+        id (int): ID чата.
+        data (MessageSearchSchema): Запрос q, размер страницы и курсор.
+        use_case (SearchMessagesUseCase): UseCase для поиска сообщений.
+
+    Returns:
+        MessageSearchResponseSchema: Сообщения чата по убыванию релевантности
+            с рангом и фрагментом, и курсор следующей страницы.
+
+    Raises:
+        HTTPException 400: Если курсор некорректен.
+        HTTPException 404: Если чат с указанным ID не найден.
+        HTTPException 500: Если поиск завершился ошибкой.
+    """
+    hits, next_cursor = await use_case.execute(data.q, data.limit, data.cursor, chat_id=id)
+    return MessageSearchResponseSchema(messages=[hit._asdict() for hit in hits], next_cursor=next_cursor)
+
+
 @router.get("/{id}", response_model=ChatWithMessagesResponseSchema)
 async def get_chat_with_messages(
     id: int,
     data: Annotated[ChatWithMessagesSchema,Depends()],
+    if_none_match: Annotated[str | None, Header()] = None,
+    accept_encoding: Annotated[str | None, Header()] = None,
     use_case: GetChatUseCase = Depends(get_chat_use_case),
-) -> ChatWithMessagesResponseSchema:
+) -> Response:
     """
     Получить чат и последние N сообщений.
 
+    История листается курсорами: next_cursor из ответа передается как before
+    для более старой страницы, prev_cursor — как after для более новой.
+
+    Ответ кодируется сразу в JSON (encode_chat_page) без повторной валидации
+    через response_model; схема остается в response_model для OpenAPI.
+
+    Первая страница (без курсоров) отдается с ETag. Если он совпадает
+    с If-None-Match, возвращается 304 без тела: ETag проверяется по версии
+    чата (или кэшу воркера), сообщения не читаются и не кодируются.
+
+    Тело сжимается gzip или zstd по Accept-Encoding (см. app.schemas.compression).
+    Готовое тело первой страницы кэшируется по ETag и выбранному сжатию
+    (EncodedPageCache), поэтому горячая страница кодируется и сжимается
+    один раз, пока чат не изменится. Без If-None-Match ETag для поиска
+    в этом кэше берется только из кэша воркера, чтобы промах не стоил
+    лишнего запроса к БД.
+
     Args:
         id (int): ID чата.
-        data (ChatWithMessagesSchema): Cхема Pydantic сообщений для возврата (по умолчанию 20, максимум 100).
+        data (ChatWithMessagesSchema): Cхема Pydantic сообщений для возврата (по умолчанию 20, максимум 100)
+            и курсоры пагинации before/after.
+        if_none_match (str | None): Заголовок If-None-Match с ETag ранее полученной страницы.
+        accept_encoding (str | None): Заголовок Accept-Encoding со сжатиями, которые принимает клиент.
         use_case (GetChatUseCase): UseCase для получения чата и сообщений.
 
     Returns:
-        ChatWithMessagesResponseSchema: Чат и список сообщений, отсортированных по created_at.
+        ChatWithMessagesResponseSchema: Чат, список сообщений, отсортированных по created_at, и курсоры;
+            304 Not Modified, если первая страница не изменилась.
 
     Raises:
+        HTTPException 400: Если курсор некорректен.
         HTTPException 404: Если чат с указанным ID не найден.
         HTTPException 500: Если возникла ошибка при получении сообщений.
     """
-    chat, messages = await use_case.execute(id, data.limit)
-    return ChatWithMessagesResponseSchema(
-        id=chat.id,
-        title=chat.title,
-        created_at=chat.created_at,
-        messages=messages
+    first_page = data.before is None and data.after is None
+    encoding = negotiate_encoding(accept_encoding)
+    if first_page and (if_none_match is not None or encoded_page_cache.enabled):
+        etag = await use_case.etag(id, data.limit, cached_only=if_none_match is None)
+        if etag is not None:
+            matched = match_etag(if_none_match, etag) if if_none_match is not None else None
+            if matched is not None:
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": matched})
+            cached = encoded_page_cache.get(etag, encoding)
+            if cached is not None:
+                body, content_encoding = cached
+                return JSONBytesResponse(body, headers=page_headers(etag, content_encoding))
+
+    chat, messages = await use_case.execute(id, data.limit, data.before, data.after)
+    body = encode_chat_page(
+        chat,
+        messages,
+        next_cursor=MessageCursor.from_message(messages[-1]).encode() if len(messages) == data.limit else None,
+        prev_cursor=MessageCursor.from_message(messages[0]).encode() if messages else data.after,
+    )
+    body, content_encoding = await compress_body(body, encoding)
+    etag = use_case.page_etag(id, data.limit, messages) if first_page else None
+    if etag is not None:
+        encoded_page_cache.put(etag, encoding, body, content_encoding)
+    return JSONBytesResponse(body, headers=page_headers(etag, content_encoding))
+
+
+@router.get("/{id}/stream", response_class=StreamingResponse)
+async def stream_chat_messages(
+    id: int,
+    since: str | None = None,
+    last_event_id: Annotated[str | None, Header()] = None,
+    use_case: StreamChatUseCase = Depends(get_stream_chat_use_case),
+):
+    """
+    Получать новые сообщения чата потоком Server-Sent Events.
+
+    Каждое событие message содержит MessageResponseSchema, а его id — курсор
+    сообщения. При переподключении курсор передается в since (или браузер сам
+    присылает его в заголовке Last-Event-ID), и пропущенные сообщения
+    догоняются из истории. Событие reset означает, что клиент не успевал
+    читать поток и должен переподключиться, deleted — что чат удален.
+
+    Args:
+        id (int): ID чата.
+        since (str | None): Курсор последнего полученного сообщения.
+        last_event_id (str | None): Заголовок Last-Event-ID (используется, если since не задан).
+        use_case (StreamChatUseCase): UseCase для потоковой доставки сообщений.
+
+    Returns:
+        StreamingResponse: Поток text/event-stream.
+
+    Raises:
+        HTTPException 400: Если курсор некорректен.
+        HTTPException 404: Если чат с указанным ID не найден.
+    """
+    subscription, cursor = await use_case.subscribe(id, since or last_event_id)
+    return StreamingResponse(
+        use_case.events(subscription, cursor),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_chat_and_messages(
     id: int,
+    background_tasks: BackgroundTasks,
+    purge: bool = False,
     use_case: DeleteChatUseCase = Depends(get_delete_chat_use_case),
+    purge_use_case: PurgeChatUseCase | None = Depends(get_purge_chat_use_case),
 ):
     """
     Удалить чат вместе со всеми его сообщениями.
 
     Args:
         id (int): ID чата для удаления.
+        purge (bool): Удалить чат в фоне порциями (для очень больших чатов).
         use_case (DeleteChatUseCase): UseCase для удаления чата.
+        purge_use_case (PurgeChatUseCase | None): UseCase для фонового удаления чата
+            (создается только при purge=true). Сбои фонового удаления
+            учитываются в счетчике chat_purges_total в /metrics.
 
     Returns:
-        None: Возвращает 204 No Content при успешном удалении.
+        None: Возвращает 204 No Content при успешном удалении
+            или 202 Accepted, если удаление поставлено в фон.
 
     Raises:
         HTTPException 404: Если чат с указанным ID не найден.
         HTTPException 500: Если удаление не удалось.
     """
+    if purge_use_case is not None:
+        await purge_use_case.execute(id)
+        background_tasks.add_task(purge_use_case.purge, id)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
     return await use_case.execute(id)
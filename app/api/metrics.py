@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Response
+
+from app.cache.encoded_pages import encoded_page_cache
+from app.cache.hot_chats import hot_chat_cache
+from app.cache.shared import shared_chat_cache
+from app.database.db import db
+from app.database.partitions import partition_manager
+from app.middleware.admission import admission_controller
+from app.monitoring.collectors import db_pool_connections, registry
+from app.realtime.hub import message_hub
+from app.realtime.pg_broadcast import pg_broadcaster
+from app.repositories.write_coalescer import message_write_coalescer
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=Response)
+async def get_prometheus_metrics() -> Response:
+    """
+    Получить метрики воркера в текстовом формате Prometheus.
+
+    Returns:
+        Response: Гистограммы времени HTTP- и SQL-запросов, счетчики ответов
+            и медленных запросов, запросы в обработке и состояние пула соединений.
+    """
+    pool = db.engine.pool
+    db_pool_connections.set("checked_out", value=pool.checkedout())
+    db_pool_connections.set("checked_in", value=pool.checkedin())
+    db_pool_connections.set("overflow", value=pool.overflow())
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/pool")
+async def get_pool_metrics() -> dict:
+    """
+    Получить состояние пула соединений с БД.
+
+    Returns:
+        dict: Размер пула, выданные/свободные соединения, overflow,
+            количество выдач и таймаутов, среднее и максимальное ожидание соединения;
+            в ключе replicas — то же для пула каждой реплики.
+    """
+    return db.pool_status()
+
+
+@router.get("/cache")
+async def get_cache_metrics() -> dict:
+    """
+    Получить статистику кэша активных чатов, общего кэша воркеров и кэша готовых страниц.
+
+    Returns:
+        dict: Количество чатов в кэше, занятая память, попадания, промахи и вытеснения;
+            в ключе shared — попадания, промахи и полученные инвалидации общего кэша;
+            в ключе encoded — счетчики кэша закодированных и сжатых страниц.
+    """
+    return {**hot_chat_cache.stats(), "shared": shared_chat_cache.stats(), "encoded": encoded_page_cache.stats()}
+
+
+@router.get("/stream")
+async def get_stream_metrics() -> dict:
+    """
+    Получить статистику потоковой доставки сообщений.
+
+    Returns:
+        dict: Чаты с подписчиками, число подписчиков, опубликованные события
+            и подписчики, отключенные из-за переполнения очереди;
+            в ключе broadcast — счетчики LISTEN/NOTIFY (None, если рассылка выключена).
+    """
+    broadcast = pg_broadcaster.stats() if pg_broadcaster is not None else None
+    return {**message_hub.stats(), "broadcast": broadcast}
+
+
+@router.get("/partitions")
+async def get_partition_metrics() -> dict | None:
+    """
+    Получить статистику обслуживания партиций сообщений.
+
+    Returns:
+        dict | None: Созданные и удаленные (отсоединенные) партиции и сообщения,
+            удаленные по сроку хранения чата; None, если обслуживание выключено.
+    """
+    return partition_manager.stats() if partition_manager is not None else None
+
+
+@router.get("/writes")
+async def get_write_metrics() -> dict | None:
+    """
+    Получить статистику группового коммита сообщений.
+
+    Returns:
+        dict | None: Записанные пачки и сообщения, средний размер пачки
+            и пачки, сохраненные по одному после ошибки; None, если групповой коммит выключен.
+    """
+    return message_write_coalescer.stats() if message_write_coalescer is not None else None
+
+
+@router.get("/admission")
+async def get_admission_metrics() -> dict | None:
+    """
+    Получить состояние ограничения нагрузки.
+
+    Returns:
+        dict | None: Для чтений и записей — текущий лимит, запросы в обработке
+            и в очереди, средняя и базовая задержка, допущенные и отклоненные
+            запросы; None, если ограничение выключено.
+    """
+    return admission_controller.stats() if admission_controller is not None else None
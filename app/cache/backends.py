@@ -0,0 +1,293 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+from urllib.parse import urlsplit
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище общего кэша: ключ-значение с TTL, счетчики и pub/sub.
+
+    Значения — байты, сериализацией занимается вызывающий код.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Получить значение ключа или None."""
+
+    @abstractmethod
+    async def mget(self, *keys: str) -> list[bytes | None]:
+        """Получить значения нескольких ключей за одно обращение."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохранить значение на ttl секунд."""
+
+    @abstractmethod
+    async def incr(self, key: str, ttl: float) -> int:
+        """Увеличить счетчик на 1 и продлить его жизнь на ttl секунд."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Удалить ключи."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None:
+        """Отправить сообщение подписчикам канала."""
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        """Подписаться на канал; итератор отдает сообщения до разрыва связи."""
+
+    async def close(self) -> None:
+        """Освободить соединения."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Хранилище в памяти процесса (для одного воркера и тестов)."""
+
+    def __init__(self):
+        self._values: dict[str, tuple[bytes, float]] = {}
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def mget(self, *keys: str) -> list[bytes | None]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._values[key] = (value, time.monotonic() + ttl)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        value = int(await self.get(key) or 0) + 1
+        await self.set(key, str(value).encode(), ttl)
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key, None)
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._subscribers.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers[channel].discard(queue)
+
+
+class RedisError(Exception):
+    """Ошибка, которую вернул сервер по протоколу RESP."""
+
+
+class RespConnection:
+    """
+    Соединение с сервером, говорящим на протоколе Redis (RESP2).
+
+    Attributes:
+        timeout (float | None): Сколько секунд ждать ответы на команды (None — без ограничения).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float | None = None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+
+    @classmethod
+    async def open(
+        cls,
+        host: str,
+        port: int,
+        db: int,
+        password: str | None,
+        connect_timeout: float | None = None,
+        timeout: float | None = None,
+    ) -> "RespConnection":
+        """
+        Открыть соединение, при необходимости авторизоваться и выбрать базу.
+
+        Raises:
+            TimeoutError: Если сервер не принял соединение за connect_timeout секунд.
+        """
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), connect_timeout)
+        connection = cls(reader, writer, timeout)
+        if password:
+            await connection.execute("AUTH", password)
+        if db:
+            await connection.execute("SELECT", db)
+        return connection
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        prefix, data = line[:1], line[1:-2]
+        if prefix == b"+":
+            return data
+        if prefix == b"-":
+            raise RedisError(data.decode())
+        if prefix == b":":
+            return int(data)
+        if prefix == b"$":
+            length = int(data)
+            if length == -1:
+                return None
+            return (await self.reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            length = int(data)
+            if length == -1:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise RedisError(f"unexpected reply: {line!r}")
+
+    async def pipeline(self, *commands: tuple) -> list:
+        """
+        Отправить несколько команд разом и прочитать все ответы.
+
+        Raises:
+            TimeoutError: Если ответы не пришли за timeout секунд; соединение
+                после этого нельзя использовать.
+        """
+        return await asyncio.wait_for(self._pipeline(*commands), self.timeout)
+
+    async def _pipeline(self, *commands: tuple) -> list:
+        self.writer.write(b"".join(self.encode(*command) for command in commands))
+        await self.writer.drain()
+        return [await self.read_reply() for _ in commands]
+
+    async def execute(self, *args):
+        return (await self.pipeline(args))[0]
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Хранилище в сервере, совместимом с протоколом Redis.
+
+    Держит небольшой пул соединений для команд; подписка на канал
+    использует отдельное соединение. Подключение и ответы на команды
+    ограничены по времени, чтобы зависший сервер не держал запросы
+    к API; ожидание сообщений подписки не ограничено.
+
+    Attributes:
+        url (str): Адрес вида redis://[:password@]host[:port][/db].
+        max_connections (int): Максимум одновременно открытых соединений для команд.
+        connect_timeout (float | None): Сколько секунд ждать подключения.
+        timeout (float | None): Сколько секунд ждать ответа на команды.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 10,
+        connect_timeout: float | None = 1.0,
+        timeout: float | None = 1.0,
+    ):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout
+        self._idle: list[RespConnection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> RespConnection:
+        return await RespConnection.open(
+            self.host, self.port, self.db, self.password, self.connect_timeout, self.timeout
+        )
+
+    async def _pipeline(self, *commands: tuple) -> list:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            try:
+                replies = await connection.pipeline(*commands)
+            except BaseException:
+                await connection.close()
+                raise
+            self._idle.append(connection)
+            return replies
+
+    async def get(self, key: str) -> bytes | None:
+        return (await self._pipeline(("GET", key)))[0]
+
+    async def mget(self, *keys: str) -> list[bytes | None]:
+        return (await self._pipeline(("MGET", *keys)))[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._pipeline(("SET", key, value, "PX", int(ttl * 1000)))
+
+    async def incr(self, key: str, ttl: float) -> int:
+        value, _ = await self._pipeline(("INCR", key), ("PEXPIRE", key, int(ttl * 1000)))
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        await self._pipeline(("DEL", *keys))
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self._pipeline(("PUBLISH", channel, message))
+
+    async def subscribe(self, channel: str) -> AsyncIterator[bytes]:
+        connection = await self._connect()
+        try:
+            await connection.execute("SUBSCRIBE", channel)
+            while True:
+                kind, _, message = await connection.read_reply()
+                if kind == b"message":
+                    yield message
+        finally:
+            await connection.close()
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
+
+
+def create_backend(url: str, connect_timeout: float | None = 1.0, timeout: float | None = 1.0) -> CacheBackend:
+    """
+    Создать хранилище по адресу: memory:// или redis://host:port/db.
+
+    Args:
+        url (str): Адрес хранилища.
+        connect_timeout (float | None): Сколько секунд ждать подключения к серверу.
+        timeout (float | None): Сколько секунд ждать ответа на команды.
+
+    Raises:
+        ValueError: Если схема адреса не поддерживается.
+    """
+    scheme = urlsplit(url).scheme
+    if scheme == "memory":
+        return InMemoryCacheBackend()
+    if scheme == "redis":
+        return RedisCacheBackend(url, connect_timeout=connect_timeout, timeout=timeout)
+    raise ValueError(f"unsupported cache url: {url}")
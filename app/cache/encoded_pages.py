@@ -0,0 +1,106 @@
+from collections import OrderedDict
+
+from app.config import settings
+
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class EncodedPageCache:
+    """
+    LRU-кэш готовых тел первой страницы истории (JSON, сжатый или нет).
+
+    Ключ — ETag страницы и выбранное сжатие. ETag меняется при любом
+    изменении истории чата, поэтому запись не нужно инвалидировать:
+    новая версия страницы кэшируется под новым ETag, а старая вытесняется
+    по LRU. Горячая страница кодируется и сжимается один раз на версию.
+
+    Attributes:
+        max_bytes (int): Ограничение памяти под тела страниц (0 — кэш выключен).
+        max_entry_bytes (int): Тела больше этого размера не кэшируются.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: OrderedDict[tuple[str, str | None], tuple[bytes, str | None]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, etag: str, encoding: str | None) -> tuple[bytes, str | None] | None:
+        """
+        Получить готовое тело страницы.
+
+        Args:
+            etag (str): ETag страницы.
+            encoding (str | None): Сжатие, выбранное по Accept-Encoding.
+
+        Returns:
+            tuple | None: (тело, Content-Encoding или None) или None при промахе.
+        """
+        key = (etag, encoding)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, etag: str, encoding: str | None, body: bytes, content_encoding: str | None) -> None:
+        """
+        Сохранить готовое тело страницы.
+
+        Args:
+            etag (str): ETag страницы.
+            encoding (str | None): Сжатие, выбранное по Accept-Encoding.
+            body (bytes): Тело ответа.
+            content_encoding (str | None): Фактическое сжатие тела (None, если тело меньше порога сжатия).
+        """
+        if not self.enabled or len(body) > self.max_entry_bytes:
+            return
+        key = (etag, encoding)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous[0]) + ENTRY_OVERHEAD_BYTES
+        self._entries[key] = (body, content_encoding)
+        self.size += len(body) + ENTRY_OVERHEAD_BYTES
+        while self._entries and self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted) + ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def evict_chat(self, chat_id: int) -> None:
+        """Удалить все тела страниц чата (например, после удаления сообщений по сроку хранения)."""
+        prefix = f'"{chat_id}.'
+        for key in [key for key in self._entries if key[0].startswith(prefix)]:
+            body, _ = self._entries.pop(key)
+            self.size -= len(body) + ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        """Количество тел, занятая память, попадания, промахи и вытеснения."""
+        return {
+            "pages": len(self._entries),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+encoded_page_cache = EncodedPageCache(
+    max_bytes=settings.encoded_page_cache_max_bytes,
+    max_entry_bytes=settings.encoded_page_cache_max_entry_bytes,
+)
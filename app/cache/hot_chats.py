@@ -0,0 +1,188 @@
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+
+from app.config import settings
+
+MESSAGE_OVERHEAD_BYTES = 200
+CHAT_OVERHEAD_BYTES = 500
+
+
+class CachedChat:
+    """
+    Запись кэша: заголовок чата и кольцевой буфер его новейших сообщений.
+
+    Attributes:
+        chat: Заголовок чата (объект с id, title, created_at).
+        messages (deque): Сообщения от новых к старым, не больше maxlen.
+        complete (bool): В буфере все сообщения чата (их меньше maxlen).
+        size (int): Оценка занимаемой памяти в байтах.
+        expires_at (float): Момент (time.monotonic), после которого запись устаревает.
+    """
+    __slots__ = ("chat", "messages", "complete", "size", "expires_at")
+
+    def __init__(self, chat, messages: list, max_messages: int, complete: bool, expires_at: float):
+        self.chat = chat
+        self.messages = deque(messages, maxlen=max_messages)
+        self.complete = complete
+        self.size = CHAT_OVERHEAD_BYTES + sum(message_size(message) for message in self.messages)
+        self.expires_at = expires_at
+
+
+def message_size(message) -> int:
+    """Оценка памяти, занимаемой сообщением в кэше."""
+    return MESSAGE_OVERHEAD_BYTES + len(message.text)
+
+
+class HotChatCache:
+    """
+    Ограниченный LRU/TTL-кэш активных чатов в памяти процесса.
+
+    Для каждого чата хранит заголовок и до max_messages новейших сообщений,
+    отдает из памяти любые limit <= max_messages. Запись сквозная: отправка
+    сообщения дописывает его в буфер (или вытесняет запись, если сообщение
+    не новее буфера), удаление чата вытесняет запись.
+
+    Заполнение после промаха защищено счетчиком записей: если между чтением
+    из БД и put() в кэш что-то писали, put() ничего не сохраняет, чтобы
+    не закэшировать устаревшую страницу.
+
+    Attributes:
+        max_chats (int): Максимум чатов в кэше (0 — кэш выключен).
+        max_messages (int): Размер кольцевого буфера сообщений чата.
+        ttl (float): Время жизни записи в секундах.
+        max_bytes (int): Ограничение оценки занимаемой памяти.
+    """
+
+    def __init__(self, max_chats: int, max_messages: int, ttl: float, max_bytes: int):
+        self.max_chats = max_chats
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[int, CachedChat] = OrderedDict()
+        self._writes = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_chats > 0
+
+    def get(self, chat_id: int, limit: int) -> tuple[object, list] | None:
+        """
+        Получить чат и limit новейших сообщений из памяти.
+
+        Returns:
+            tuple | None: (chat, messages) или None при промахе.
+        """
+        entry = self._entries.get(chat_id)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._drop(chat_id)
+            entry = None
+        if entry is None or limit > self.max_messages or (limit > len(entry.messages) and not entry.complete):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(chat_id)
+        self.hits += 1
+        return entry.chat, list(islice(entry.messages, limit))
+
+    def fill_token(self) -> int:
+        """Метка для put(): берется до чтения данных из БД."""
+        return self._writes
+
+    def put(self, chat_id: int, chat, messages: list, token: int) -> None:
+        """
+        Сохранить чат и его новейшие сообщения (от новых к старым).
+
+        Args:
+            chat_id (int): ID чата.
+            chat: Заголовок чата.
+            messages (list): До max_messages новейших сообщений чата.
+            token (int): Значение fill_token(), полученное до чтения из БД.
+        """
+        if not self.enabled or token != self._writes:
+            return
+        self._drop(chat_id)
+        entry = CachedChat(
+            chat,
+            messages[:self.max_messages],
+            self.max_messages,
+            complete=len(messages) < self.max_messages,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._entries[chat_id] = entry
+        self.size += entry.size
+        self._shrink()
+
+    def append(self, chat_id: int, message) -> None:
+        """
+        Дописать новое сообщение в буфер чата, если чат в кэше.
+
+        Буфер должен совпадать с порядком истории в БД (created_at DESC, id DESC).
+        created_at — время начала транзакции, поэтому при параллельной отправке
+        сообщение может зафиксироваться позже более нового; такое сообщение
+        не дописывается, а запись чата вытесняется и перечитывается из БД.
+        """
+        self._writes += 1
+        entry = self._entries.get(chat_id)
+        if entry is None:
+            return
+        if entry.messages and (message.created_at, message.id) <= (entry.messages[0].created_at, entry.messages[0].id):
+            self._drop(chat_id)
+            self.evictions += 1
+            return
+        if len(entry.messages) == entry.messages.maxlen:
+            removed = message_size(entry.messages[-1])
+            entry.size -= removed
+            self.size -= removed
+        entry.messages.appendleft(message)
+        added = message_size(message)
+        entry.size += added
+        self.size += added
+        self._shrink()
+
+    def evict(self, chat_id: int) -> None:
+        """Удалить чат из кэша (чат удален или изменен в обход кэша)."""
+        self._writes += 1
+        if self._drop(chat_id):
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._writes += 1
+        self._entries.clear()
+        self.size = 0
+
+    def _drop(self, chat_id: int) -> bool:
+        entry = self._entries.pop(chat_id, None)
+        if entry is None:
+            return False
+        self.size -= entry.size
+        return True
+
+    def _shrink(self) -> None:
+        while self._entries and (len(self._entries) > self.max_chats or self.size > self.max_bytes):
+            chat_id, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Счетчики попаданий, промахов, вытеснений и занятая память."""
+        return {
+            "chats": len(self._entries),
+            "size_bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+hot_chat_cache = HotChatCache(
+    max_chats=settings.hot_cache_max_chats,
+    max_messages=settings.hot_cache_max_messages,
+    ttl=settings.hot_cache_ttl,
+    max_bytes=settings.hot_cache_max_bytes,
+)
@@ -0,0 +1,166 @@
+import asyncio
+import uuid
+
+from app.cache.backends import CacheBackend, create_backend
+from app.cache.hot_chats import HotChatCache, hot_chat_cache
+from app.config import settings
+from app.logs.logger import logger
+from app.schemas.responses import ChatWithMessagesResponseSchema
+
+INVALIDATION_CHANNEL = "chat-invalidate"
+
+
+class SharedChatCache:
+    """
+    Общий для всех воркеров кэш страниц истории чатов.
+
+    Хранит сериализованный ChatWithMessagesResponseSchema с новейшими
+    сообщениями чата (до max_messages) и отдает из него любые меньшие limit.
+
+    У каждого чата есть счетчик версии. Изменение чата увеличивает версию,
+    удаляет страницу и рассылает по pub/sub уведомление, по которому остальные
+    воркеры вытесняют чат из своего локального кэша (HotChatCache). Страница,
+    прочитанная из БД до изменения, сохраняется с устаревшей версией
+    и при чтении отбрасывается.
+
+    Attributes:
+        backend (CacheBackend | None): Хранилище; None — общий кэш выключен.
+        local (HotChatCache): Локальный кэш воркера, вытесняемый по уведомлениям.
+        ttl (float): Время жизни страницы в секундах.
+        max_messages (int): Сколько новейших сообщений хранится в странице.
+    """
+
+    VERSION_TTL_FACTOR = 100
+
+    def __init__(self, backend: CacheBackend | None, local: HotChatCache, ttl: float, max_messages: int):
+        self.backend = backend
+        self.local = local
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.origin = uuid.uuid4().hex
+        self._listener: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations_received = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def _page_key(chat_id: int) -> str:
+        return f"chat:{chat_id}:page"
+
+    @staticmethod
+    def _version_key(chat_id: int) -> str:
+        return f"chat:{chat_id}:version"
+
+    async def get(self, chat_id: int, limit: int) -> ChatWithMessagesResponseSchema | None:
+        """
+        Получить страницу истории с limit новейшими сообщениями.
+
+        Returns:
+            ChatWithMessagesResponseSchema | None: Страница или None при промахе.
+        """
+        payload, version = await self.backend.mget(self._page_key(chat_id), self._version_key(chat_id))
+        if payload is not None:
+            page_version, data = payload.split(b"\n", 1)
+            page = ChatWithMessagesResponseSchema.model_validate_json(data)
+            complete = len(page.messages) < self.max_messages
+            if int(page_version) == int(version or 0) and (limit <= len(page.messages) or complete):
+                self.hits += 1
+                return page
+        self.misses += 1
+        return None
+
+    async def fill_token(self, chat_id: int) -> int:
+        """Версия чата для put(): берется до чтения данных из БД."""
+        return int(await self.backend.get(self._version_key(chat_id)) or 0)
+
+    async def put(self, chat_id: int, page: ChatWithMessagesResponseSchema, token: int) -> None:
+        """Сохранить страницу, прочитанную при версии token."""
+        payload = b"%d\n%s" % (token, page.model_dump_json().encode())
+        await self.backend.set(self._page_key(chat_id), payload, self.ttl)
+
+    async def invalidate(self, chat_id: int) -> None:
+        """Сбросить страницу чата во всех воркерах."""
+        if not self.enabled:
+            return
+        await asyncio.gather(
+            self.backend.incr(self._version_key(chat_id), self.ttl * self.VERSION_TTL_FACTOR),
+            self.backend.delete(self._page_key(chat_id)),
+            self.backend.publish(INVALIDATION_CHANNEL, f"{self.origin}:{chat_id}".encode()),
+        )
+
+    async def try_invalidate(self, chat_id: int) -> bool:
+        """
+        Сбросить страницу чата после записи, не пробрасывая ошибки хранилища.
+
+        Запись в БД к этому моменту уже зафиксирована, поэтому сбой общего
+        кэша не должен превращаться в ошибку запроса. Пропущенную
+        инвалидацию закрывают версия страницы с TTL и очистка локальных
+        кэшей при переподключении подписки.
+
+        Returns:
+            bool: True, если страница сброшена (или общий кэш выключен).
+        """
+        try:
+            await self.invalidate(chat_id)
+            return True
+        except Exception as e:
+            logger.warning("Не удалось сбросить чат id=%s в общем кэше: %s", chat_id, e)
+            return False
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self.backend.subscribe(INVALIDATION_CHANNEL):
+                    origin, chat_id = message.decode().split(":")
+                    if origin != self.origin:
+                        self.invalidations_received += 1
+                        self.local.evict(int(chat_id))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Подписка на инвалидацию кэша прервана: %s", e)
+            # Пока подписки не было, уведомления могли потеряться.
+            self.local.clear()
+            await asyncio.sleep(1)
+
+    async def start(self) -> None:
+        """Запустить прием уведомлений об инвалидации."""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        """Остановить прием уведомлений и закрыть хранилище."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> dict:
+        """Счетчики попаданий, промахов и полученных инвалидаций."""
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations_received": self.invalidations_received,
+        }
+
+
+shared_chat_cache = SharedChatCache(
+    backend=create_backend(
+        settings.cache_url,
+        connect_timeout=settings.cache_connect_timeout,
+        timeout=settings.cache_timeout,
+    ) if settings.cache_url else None,
+    local=hot_chat_cache,
+    ttl=settings.shared_cache_ttl,
+    max_messages=settings.hot_cache_max_messages,
+)
@@ -0,0 +1,75 @@
+"""Командная строка ChatAPI: архивы чатов.
+
+Запуск:
+    python -m app.cli export 42 chat-42.ndjson.gz
+    python -m app.cli import chat-42.ndjson.gz
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.database.db import db
+from app.use_case.archive_chat import ArchiveStats, ExportChatUseCase, ImportChatUseCase
+
+READ_CHUNK = 1024 * 1024
+
+
+async def read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, READ_CHUNK):
+            yield chunk
+
+
+async def export_chat(args: argparse.Namespace) -> None:
+    use_case = ExportChatUseCase(db.pick_session_factory(read_only=True), args.batch_size, args.level)
+    chat = await use_case.get_chat(args.chat_id)
+    stats = ArchiveStats()
+    with open(args.path, "wb") as file:
+        async for chunk in use_case.export(chat, stats):
+            await asyncio.to_thread(file.write, chunk)
+    print(
+        f"chat {chat.id}: exported {stats.rows} messages, {stats.bytes} bytes "
+        f"in {stats.seconds:.2f}s ({stats.rows_per_sec:.0f} rows/s)"
+    )
+
+
+async def import_chat(args: argparse.Namespace) -> None:
+    use_case = ImportChatUseCase(db.session_factory, args.batch_size)
+    chat_id, stats = await use_case.execute(read_file(args.path))
+    print(
+        f"chat {chat_id}: imported {stats.rows} messages from {stats.bytes} bytes "
+        f"in {stats.seconds:.2f}s ({stats.rows_per_sec:.0f} rows/s)"
+    )
+
+
+async def main(args: argparse.Namespace) -> int:
+    try:
+        await args.command(args)
+        return 0
+    except HTTPException as e:
+        print(f"error: {e.detail}", file=sys.stderr)
+        return 1
+    finally:
+        await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    commands = parser.add_subparsers(required=True)
+
+    export_parser = commands.add_parser("export", help="выгрузить чат в gzip NDJSON")
+    export_parser.add_argument("chat_id", type=int)
+    export_parser.add_argument("path")
+    export_parser.add_argument("--level", type=int, default=6, help="уровень сжатия gzip")
+    export_parser.set_defaults(command=export_chat)
+
+    import_parser = commands.add_parser("import", help="восстановить чат из архива")
+    import_parser.add_argument("path")
+    import_parser.set_defaults(command=import_chat)
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
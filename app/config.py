@@ -13,6 +13,76 @@ class Settings(BaseSettings):
         port (str): Порт подключения к БД.
         pg_url (str): Полный URL подключения к PostgreSQL.
         echo (bool): Включение логирования SQL-запросов (по умолчанию False).
+        purge_batch_size (int): Размер порции сообщений при фоновом удалении чата.
+        pool_size (int): Количество постоянных соединений в пуле.
+        max_overflow (int): Количество дополнительных соединений сверх pool_size.
+        pool_timeout (float): Сколько секунд ждать свободное соединение из пула.
+        pool_recycle (int): Через сколько секунд пересоздавать соединение (-1 — никогда).
+        pool_pre_ping (bool): Проверять соединение перед выдачей из пула.
+        statement_cache_size (int): Размер кэша подготовленных запросов asyncpg (0 — выключен).
+        statement_timeout (int): statement_timeout на стороне PostgreSQL в мс (0 — без ограничения).
+        replica_urls (list[str]): URL реплик для чтения (JSON-список, по умолчанию пусто).
+        replica_sticky_seconds (float): Сколько секунд после записи клиент читает из основной БД.
+        hot_cache_max_chats (int): Сколько активных чатов держать в памяти (0 — кэш выключен).
+        hot_cache_max_messages (int): Сколько новейших сообщений чата держать в памяти.
+        hot_cache_ttl (float): Время жизни записи кэша в секундах.
+        hot_cache_max_bytes (int): Ограничение памяти кэша в байтах (оценка).
+        cache_url (str | None): Общий кэш воркеров: memory:// или redis://host:port/db (None — выключен).
+        shared_cache_ttl (float): Время жизни страницы в общем кэше в секундах.
+        cache_connect_timeout (float): Сколько секунд ждать подключения к общему кэшу.
+        cache_timeout (float): Сколько секунд ждать ответа общего кэша; при сбое
+            или таймауте запрос обслуживается из БД.
+        stream_queue_size (int): Размер очереди событий одного подписчика потока.
+        stream_heartbeat (float): Интервал пингов в потоке сообщений в секундах.
+        stream_replay_limit (int): Максимум сообщений, догоняемых при переподключении к потоку.
+        pg_broadcast (bool): Рассылать новые сообщения между воркерами через LISTEN/NOTIFY PostgreSQL.
+        pg_broadcast_interval (float): Сколько секунд копить уведомления перед отправкой.
+        log_level (str): Минимальный уровень записей в файле логов (INFO по умолчанию).
+        log_format (str): Формат записей: text или json.
+        log_max_bytes (int): Размер файла логов, после которого он ротируется.
+        log_backup_count (int): Сколько ротированных файлов логов хранить.
+        log_sample_rates (dict[str, float]): Доля сохраняемых записей по уровням,
+            например {"INFO": 0.1} (JSON, по умолчанию сохраняются все).
+        slow_query_threshold_ms (int): Логировать SQL-запросы дольше порога в мс (0 — не логировать).
+        message_partitioning (bool): Обслуживать помесячные партиции таблицы message;
+            саму таблицу секционирует alembic -x partition_messages=true upgrade head.
+        message_partition_premake (int): На сколько месяцев вперед создавать партиции.
+        message_recent_window_days (int): Сначала искать страницу истории только в последних
+            днях (партициях), остальное — лишь если сообщений не хватило (0 — выключено).
+        message_retention_days (int): Срок хранения сообщений в днях (0 — бессрочно);
+            старые партиции удаляются или отсоединяются целиком.
+        message_retention_mode (str): Что делать с устаревшей партицией: drop или detach
+            (отсоединить в отдельную таблицу для архивации).
+        message_chat_retention_days (dict[int, int]): Более короткие сроки хранения для
+            отдельных чатов, например {"42": 7} (JSON).
+        partition_maintenance_interval (float): Интервал обслуживания партиций и сроков хранения в секундах.
+        search_config (str): Конфигурация полнотекстового поиска PostgreSQL (simple, russian, english...);
+            должна совпадать с alembic -x search_config=..., с которой создан search_vector.
+        admin_token (str | None): Токен административных эндпоинтов /admin в заголовке
+            X-Admin-Token (None — эндпоинты закрыты).
+        archive_batch_size (int): Размер порции сообщений при выгрузке и загрузке архивов.
+        write_coalescing (bool): Сохранять одиночные сообщения пачками (групповой коммит).
+        write_coalesce_max_delay (float): Сколько секунд копить пачку после первого сообщения.
+        write_coalesce_max_batch (int): Максимальный размер пачки группового коммита.
+        admission_control (bool): Ограничивать одновременные запросы к /chats и отвечать 503
+            при перегрузке.
+        admission_read_limit (int): Начальный и максимальный лимит одновременных чтений.
+        admission_write_limit (int): Начальный и максимальный лимит одновременных записей.
+        admission_min_limit (int): Ниже этого лимит не опускается.
+        admission_queue_size (int): Сколько запросов каждого класса может ждать места.
+        admission_queue_timeout (float): Сколько секунд запрос ждет места до ответа 503.
+        admission_latency_tolerance (float): Во сколько раз задержка может превысить базовую
+            до снижения лимита.
+        admission_retry_after (int): Значение заголовка Retry-After в ответе 503, в секундах.
+        response_compression (bool): Сжимать страницы истории чата (gzip, zstd при установленном
+            zstandard) по заголовку Accept-Encoding.
+        compression_min_size (int): Тела меньше этого размера в байтах не сжимаются.
+        compression_thread_min_size (int): Тела от этого размера сжимаются в пуле потоков.
+        compression_gzip_level (int): Уровень сжатия gzip.
+        compression_zstd_level (int): Уровень сжатия zstd.
+        encoded_page_cache_max_bytes (int): Память под готовые (закодированные и сжатые)
+            первые страницы истории в байтах (0 — кэш выключен).
+        encoded_page_cache_max_entry_bytes (int): Тела больше этого размера не кэшируются.
     """
 
     host: str
@@ -22,6 +92,63 @@ class Settings(BaseSettings):
     port: str
     pg_url: str
     echo: bool = False
+    purge_batch_size: int = 5000
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    statement_cache_size: int = 100
+    statement_timeout: int = 0
+    replica_urls: list[str] = []
+    replica_sticky_seconds: float = 5.0
+    hot_cache_max_chats: int = 1000
+    hot_cache_max_messages: int = 100
+    hot_cache_ttl: float = 60
+    hot_cache_max_bytes: int = 64 * 1024 * 1024
+    cache_url: str | None = None
+    shared_cache_ttl: float = 60
+    cache_connect_timeout: float = 1.0
+    cache_timeout: float = 0.5
+    stream_queue_size: int = 256
+    stream_heartbeat: float = 15
+    stream_replay_limit: int = 1000
+    pg_broadcast: bool = False
+    pg_broadcast_interval: float = 0.01
+    log_level: str = "INFO"
+    log_format: str = "text"
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_sample_rates: dict[str, float] = {}
+    slow_query_threshold_ms: int = 500
+    message_partitioning: bool = False
+    message_partition_premake: int = 3
+    message_recent_window_days: int = 31
+    message_retention_days: int = 0
+    message_retention_mode: str = "drop"
+    message_chat_retention_days: dict[int, int] = {}
+    partition_maintenance_interval: float = 3600
+    search_config: str = "simple"
+    admin_token: str | None = None
+    archive_batch_size: int = 5000
+    write_coalescing: bool = False
+    write_coalesce_max_delay: float = 0.002
+    write_coalesce_max_batch: int = 500
+    admission_control: bool = False
+    admission_read_limit: int = 64
+    admission_write_limit: int = 32
+    admission_min_limit: int = 2
+    admission_queue_size: int = 128
+    admission_queue_timeout: float = 0.5
+    admission_latency_tolerance: float = 2.0
+    admission_retry_after: int = 1
+    response_compression: bool = True
+    compression_min_size: int = 1024
+    compression_thread_min_size: int = 64 * 1024
+    compression_gzip_level: int = 6
+    compression_zstd_level: int = 3
+    encoded_page_cache_max_bytes: int = 32 * 1024 * 1024
+    encoded_page_cache_max_entry_bytes: int = 1024 * 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,3 +1,10 @@
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 from app.config import settings
@@ -5,32 +12,187 @@ from app.database.models import Base
 from app.logs.logger import logger
 
 
+class PoolWaitStats:
+    """Статистика ожидания соединения из пула."""
+    def __init__(self):
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Учесть одно успешное получение соединения."""
+        self.acquired += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def summary(self) -> dict:
+        """Количество выдач и таймаутов, среднее и максимальное ожидание в мс."""
+        return {
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": self.wait_total / self.acquired * 1000 if self.acquired else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
 class Database:
-    """Класс для управления подключением и сессиями базы данных."""
-    def __init__(self, url: str, echo: bool):
+    """
+    Класс для управления подключением и сессиями базы данных.
+
+    Запись всегда идет в основную БД (engine). Если заданы replica_urls,
+    сессии только для чтения выдаются из реплик: выбирается реплика
+    с наименьшим числом занятых соединений, при равенстве — по кругу.
+    """
+    def __init__(
+        self,
+        url: str,
+        echo: bool,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        statement_cache_size: int = 100,
+        statement_timeout: int = 0,
+        replica_urls: list[str] | None = None,
+    ):
+        engine_options = dict(
+            echo=echo,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
         self.engine = create_async_engine(
             url=url,
-            echo=echo
+            connect_args=self._connect_args(url, statement_cache_size, statement_timeout),
+            **engine_options,
         )
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
+        self.session_factory = self._session_factory(self.engine)
+        self.replica_engines = [
+            create_async_engine(
+                url=replica_url,
+                connect_args=self._connect_args(replica_url, statement_cache_size, statement_timeout),
+                **engine_options,
+            )
+            for replica_url in replica_urls or []
+        ]
+        self.replica_session_factories = [self._session_factory(engine) for engine in self.replica_engines]
+        self._replica_turn = itertools.count()
+        self.wait_stats = PoolWaitStats()
+        self.replica_wait_stats = [PoolWaitStats() for _ in self.replica_engines]
+        self._wait_stats = {
+            self.session_factory: self.wait_stats,
+            **dict(zip(self.replica_session_factories, self.replica_wait_stats)),
+        }
+
+    @staticmethod
+    def _session_factory(engine) -> async_sessionmaker:
+        return async_sessionmaker(
+            bind=engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
-    async def get_session(self) -> AsyncSession:
-        """Возвращает асинхронную сессию базы данных."""
+    @staticmethod
+    def _connect_args(url: str, statement_cache_size: int, statement_timeout: int) -> dict:
+        """Параметры подключения asyncpg (для других драйверов не передаются)."""
+        if make_url(url).get_driver_name() != "asyncpg":
+            return {}
+        connect_args = {"statement_cache_size": statement_cache_size}
+        if statement_timeout:
+            connect_args["server_settings"] = {"statement_timeout": str(statement_timeout)}
+        return connect_args
+
+    def pick_session_factory(self, read_only: bool = False) -> async_sessionmaker:
+        """
+        Выбрать фабрику сессий: основную БД или наименее загруженную реплику.
+
+        Args:
+            read_only (bool): Сессия нужна только для чтения.
+
+        Returns:
+            async_sessionmaker: Фабрика сессий выбранной БД.
+        """
+        if not read_only or not self.replica_session_factories:
+            return self.session_factory
+        count = len(self.replica_engines)
+        start = next(self._replica_turn) % count
+        order = [(start + i) % count for i in range(count)]
+        index = min(order, key=lambda i: self.replica_engines[i].pool.checkedout())
+        return self.replica_session_factories[index]
+
+    @asynccontextmanager
+    async def session(self, read_only: bool = False) -> AsyncIterator[AsyncSession]:
+        """
+        Открыть асинхронную сессию базы данных.
+
+        Соединение берется из пула сразу, чтобы учесть время ожидания
+        в статистике пула выбранной БД (основной или реплики).
+
+        Args:
+            read_only (bool): Сессия только для чтения (может быть выдана репликой).
+        """
         try:
-            async with self.session_factory() as session:
+            factory = self.pick_session_factory(read_only)
+            wait_stats = self._wait_stats[factory]
+            async with factory() as session:
+                started = time.perf_counter()
+                try:
+                    await session.connection()
+                except PoolTimeoutError:
+                    wait_stats.timeouts += 1
+                    raise
+                wait_stats.record(time.perf_counter() - started)
                 logger.debug("Создана новая асинхронная сессия базы данных.")
                 yield session
         except Exception as e:
-            logger.exception(f"Ошибка при создании сессии: {e}")
+            logger.exception("Ошибка при создании сессии: %s", e)
             raise
 
+    async def get_session(self) -> AsyncSession:
+        """Возвращает асинхронную сессию основной базы данных."""
+        async with self.session() as session:
+            yield session
+
+    async def get_read_session(self) -> AsyncSession:
+        """Возвращает асинхронную сессию только для чтения (реплика, если есть)."""
+        async with self.session(read_only=True) as session:
+            yield session
+
+    async def dispose(self) -> None:
+        """Закрыть пулы соединений основной БД и реплик."""
+        for engine in [self.engine, *self.replica_engines]:
+            await engine.dispose()
+
+    def pool_status(self) -> dict:
+        """Текущее состояние пула соединений основной БД и реплик, статистика ожидания каждого пула."""
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            **self.wait_stats.summary(),
+            "replicas": [
+                {"checked_out": engine.pool.checkedout(), "overflow": engine.pool.overflow(), **stats.summary()}
+                for engine, stats in zip(self.replica_engines, self.replica_wait_stats)
+            ],
+        }
+
 
 db = Database(
     url=settings.pg_url,
     echo=settings.echo,
+    pool_size=settings.pool_size,
+    max_overflow=settings.max_overflow,
+    pool_timeout=settings.pool_timeout,
+    pool_recycle=settings.pool_recycle,
+    pool_pre_ping=settings.pool_pre_ping,
+    statement_cache_size=settings.statement_cache_size,
+    statement_timeout=settings.statement_timeout,
+    replica_urls=settings.replica_urls,
 )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, func, ForeignKey
+from sqlalchemy import DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -24,22 +24,44 @@ class ChatModels(Base):
        id (int): Уникальный идентификатор чата.
        title (str): Название чата. Не может быть пустым.
        created_at (datetime): Дата и время создания чата.
+       last_message_at (datetime): Время последнего сообщения (время создания, пока сообщений нет).
+       last_message_id (int | None): ID последнего сообщения (None, пока сообщений нет).
+       message_count (int): Количество сообщений чата.
        messages (list[MessageModels]): Связанные сообщения чата.
 
+    Денормализованные last_message_at, last_message_id и message_count
+    обновляются в той же транзакции, что и вставка сообщений
+    (MessageRepository), и используются для списка чатов без агрегатов
+    по таблице message.
+
+    Индексы:
+       ix_chat_last_message_at_id: (last_message_at, id) для списка чатов
+       по последней активности с keyset-пагинацией.
+
     Связи:
        Один чат может иметь много сообщений.
-       При удалении чата все связанные сообщения удаляются каскадно.
+       При удалении чата все связанные сообщения удаляются каскадно
+       на стороне БД (ON DELETE CASCADE), ORM не загружает их (passive_deletes).
    """
     __tablename__ = "chat"
+    __table_args__ = (
+        Index("ix_chat_last_message_at_id", "last_message_at", "id"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now())
+    last_message_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now())
+    last_message_id: Mapped[int | None] = mapped_column(nullable=True)
+    message_count: Mapped[int] = mapped_column(server_default="0")
     messages: Mapped[list["MessageModels"]] = relationship(
         "MessageModels",
         back_populates="chats",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -58,10 +80,27 @@ class MessageModels(Base):
 
     Связи:
         Каждое сообщение принадлежит одному чату.
+
+    Индексы:
+        ix_message_chat_id_created_at_id: составной индекс (chat_id, created_at, id)
+        для выборки истории чата и keyset-пагинации без сортировки.
+
+    Секционирование:
+        Миграция, запущенная с -x partition_messages=true, делает таблицу секционированной
+        по месяцам created_at с первичным ключом (id, created_at); id остается
+        уникальным (общая последовательность), поэтому модель не меняется.
+
+    Полнотекстовый поиск:
+        Колонка search_vector (tsvector от text) и GIN-индекс ix_message_search_vector
+        создаются миграцией и в модели не описаны: ORM их не читает и не возвращает
+        из вставок; запросы поиска обращаются к колонке через MessageRepository.
     """
     __tablename__ = "message"
+    __table_args__ = (
+        Index("ix_message_chat_id_created_at_id", "chat_id", "created_at", "id"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
-    chat_id: Mapped[int] = mapped_column(ForeignKey("chat.id"))
+    chat_id: Mapped[int] = mapped_column(ForeignKey("chat.id", ondelete="CASCADE"))
     text: Mapped[str] = mapped_column(nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
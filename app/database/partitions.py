@@ -0,0 +1,341 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import TextClause, delete, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.cache.encoded_pages import EncodedPageCache, encoded_page_cache
+from app.cache.hot_chats import HotChatCache, hot_chat_cache
+from app.cache.shared import SharedChatCache, shared_chat_cache
+from app.config import settings
+from app.database.db import db
+from app.database.models import MessageModels
+from app.logs.logger import logger
+from app.repositories.messages import MessageRepository
+
+PARENT = "message"
+RETENTION_MODES = ("drop", "detach")
+# Ключ advisory-блокировки: обслуживание выполняет один воркер за раз.
+MAINTENANCE_LOCK = 0x6D657373
+
+
+def quote(name: str) -> str:
+    """Имя таблицы в виде идентификатора SQL (в двойных кавычках) для DDL."""
+    return postgresql.dialect().identifier_preparer.quote_identifier(name)
+
+
+def month_start(moment: datetime) -> datetime:
+    """Начало месяца (UTC), в который попадает moment."""
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    """Сдвинуть начало месяца на months месяцев."""
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start: datetime) -> str:
+    """Имя партиции месяца, например message_p2026_10."""
+    return f"{PARENT}_p{start:%Y_%m}"
+
+
+def partition_start(name: str) -> datetime | None:
+    """Начало месяца партиции по ее имени (None, если имя не из этой схемы)."""
+    try:
+        return datetime.strptime(name, f"{PARENT}_p%Y_%m").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def create_partition_sql(start: datetime) -> str:
+    """DDL партиции месяца, начинающегося в start."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {quote(partition_name(start))} PARTITION OF {quote(PARENT)} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    )
+
+
+def uncount_partition_sql(name: str) -> TextClause:
+    """
+    UPDATE, вычитающий сообщения партиции из счетчиков чатов перед ее удалением.
+
+    Последнее сообщение затронутых чатов пересчитывается по новейшему
+    сообщению вне партиции (или времени создания чата, если их нет).
+    Возвращает ID затронутых чатов.
+    """
+    return text(
+        f"UPDATE chat SET message_count = chat.message_count - retired.n, "
+        f"last_message_id = newest.id, "
+        f"last_message_at = coalesce(newest.created_at, chat.created_at) "
+        f"FROM (SELECT chat_id, count(*) AS n FROM {quote(name)} GROUP BY chat_id) AS retired "
+        f"LEFT JOIN LATERAL (SELECT m.id, m.created_at FROM {quote(PARENT)} AS m "
+        f"WHERE m.chat_id = retired.chat_id AND m.tableoid <> to_regclass(:partition) "
+        f"ORDER BY m.created_at DESC, m.id DESC LIMIT 1) AS newest ON true "
+        f"WHERE chat.id = retired.chat_id RETURNING chat.id"
+    ).bindparams(partition=quote(name))
+
+
+def expired_partitions(names: list[str], cutoff: datetime) -> list[str]:
+    """Партиции, все строки которых старше cutoff, от старых к новым."""
+    expired = [
+        (start, name)
+        for name in names
+        if (start := partition_start(name)) is not None and add_months(start, 1) <= cutoff
+    ]
+    return [name for _, name in sorted(expired)]
+
+
+class PartitionManager:
+    """
+    Обслуживание помесячных партиций таблицы `message` и сроков хранения.
+
+    При старте и затем раз в interval секунд:
+    - создает партиции текущего месяца и premake месяцев вперед, чтобы вставка
+      никогда не упиралась в отсутствующую партицию;
+    - партиции, целиком старше retention_days, удаляет (drop) или отсоединяет
+      в самостоятельные таблицы для архивации (detach) — без построчного DELETE;
+    - для чатов из chat_retention_days удаляет более старые сообщения порциями
+      по batch_size через индекс (chat_id, created_at, id). Срок чата может
+      быть только короче общего: общая политика удаляет партиции целиком.
+
+    Если таблица не секционирована (миграции применялись без
+    -x partition_messages=true), выполняются только сроки хранения чатов.
+    Воркеры обслуживают таблицу по очереди под advisory-блокировкой.
+
+    Удаленные сообщения не должны оставаться в кэшах: после удаления
+    по сроку чата чат вытесняется из кэшей воркера и сбрасывается в общем
+    кэше (остальные воркеры вытесняют его по уведомлению), после удаления
+    партиций локальные кэши очищаются целиком, а затронутые чаты
+    сбрасываются в общем кэше.
+
+    Attributes:
+        engine (AsyncEngine): Движок основной БД.
+        premake (int): На сколько месяцев вперед создавать партиции.
+        retention_days (int): Общий срок хранения в днях (0 — бессрочно).
+        retention_mode (str): drop или detach.
+        chat_retention_days (dict[int, int]): Сроки хранения отдельных чатов в днях.
+        batch_size (int): Размер порции при удалении сообщений чата.
+        interval (float): Интервал обслуживания в секундах.
+        cache (HotChatCache): Кэш активных чатов воркера.
+        shared_cache (SharedChatCache): Общий кэш страниц истории.
+        encoded_cache (EncodedPageCache): Кэш готовых тел страниц истории.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        premake: int,
+        retention_days: int,
+        retention_mode: str,
+        chat_retention_days: dict[int, int],
+        batch_size: int,
+        interval: float,
+        cache: HotChatCache = hot_chat_cache,
+        shared_cache: SharedChatCache = shared_chat_cache,
+        encoded_cache: EncodedPageCache = encoded_page_cache,
+    ):
+        if retention_mode not in RETENTION_MODES:
+            raise ValueError(f"retention_mode должен быть одним из {RETENTION_MODES}, получено {retention_mode!r}")
+        self.engine = engine
+        self.premake = premake
+        self.retention_days = retention_days
+        self.retention_mode = retention_mode
+        self.chat_retention_days = chat_retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.encoded_cache = encoded_cache
+        self._task: asyncio.Task | None = None
+        self.partitions_created = 0
+        self.partitions_retired = 0
+        self.messages_expired = 0
+
+    async def is_partitioned(self) -> bool:
+        """Секционирована ли таблица message."""
+        async with self.engine.connect() as conn:
+            kind = await conn.scalar(text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:name)"), {"name": PARENT})
+        return kind == "p"
+
+    async def partitions(self) -> list[str]:
+        """Имена партиций таблицы message."""
+        query = text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        )
+        async with self.engine.connect() as conn:
+            return list((await conn.scalars(query, {"name": PARENT})).all())
+
+    async def ensure_partitions(self, now: datetime | None = None) -> list[str]:
+        """
+        Создать недостающие партиции с текущего месяца на premake месяцев вперед.
+
+        Args:
+            now (datetime | None): Текущий момент (по умолчанию — сейчас).
+
+        Returns:
+            list[str]: Имена созданных партиций.
+        """
+        current = month_start(now or datetime.now(timezone.utc))
+        existing = set(await self.partitions())
+        missing = [
+            start
+            for start in (add_months(current, i) for i in range(self.premake + 1))
+            if partition_name(start) not in existing
+        ]
+        if not missing:
+            return []
+        async with self.engine.begin() as conn:
+            if not await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK}):
+                return []
+            for start in missing:
+                await conn.execute(text(create_partition_sql(start)))
+        created = [partition_name(start) for start in missing]
+        self.partitions_created += len(created)
+        logger.info("Созданы партиции сообщений: %s", ", ".join(created))
+        return created
+
+    async def apply_retention(self, now: datetime | None = None) -> list[str]:
+        """
+        Удалить или отсоединить партиции, целиком старше retention_days.
+
+        Сообщения партиции вычитаются из счетчиков чатов (и последние
+        сообщения чатов пересчитываются) в той же транзакции. После фиксации
+        локальные кэши очищаются, а затронутые чаты сбрасываются в общем кэше.
+
+        Args:
+            now (datetime | None): Текущий момент (по умолчанию — сейчас).
+
+        Returns:
+            list[str]: Имена удаленных или отсоединенных партиций.
+        """
+        if not self.retention_days:
+            return []
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=self.retention_days)
+        expired = expired_partitions(await self.partitions(), cutoff)
+        if not expired:
+            return []
+        chat_ids = set()
+        async with self.engine.begin() as conn:
+            if not await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK}):
+                return []
+            for name in expired:
+                chat_ids.update((await conn.execute(uncount_partition_sql(name))).scalars())
+                if self.retention_mode == "detach":
+                    await conn.execute(text(f"ALTER TABLE {quote(PARENT)} DETACH PARTITION {quote(name)}"))
+                else:
+                    await conn.execute(text(f"DROP TABLE {quote(name)}"))
+        self.cache.clear()
+        self.encoded_cache.clear()
+        for chat_id in sorted(chat_ids):
+            await self.shared_cache.try_invalidate(chat_id)
+        self.partitions_retired += len(expired)
+        logger.info("Партиции сообщений старше %s (%s): %s", cutoff.date(), self.retention_mode, ", ".join(expired))
+        return expired
+
+    async def expire_chat_messages(self, now: datetime | None = None) -> int:
+        """
+        Удалить сообщения чатов старше их собственного срока хранения.
+
+        Каждая порция удаляется в отдельной короткой транзакции вместе
+        с уменьшением счетчика и пересчетом последнего сообщения чата,
+        затем чат вытесняется из кэшей.
+
+        Args:
+            now (datetime | None): Текущий момент (по умолчанию — сейчас).
+
+        Returns:
+            int: Количество удаленных сообщений.
+        """
+        now = now or datetime.now(timezone.utc)
+        total = 0
+        for chat_id, days in self.chat_retention_days.items():
+            cutoff = now - timedelta(days=days)
+            batch = (
+                select(MessageModels.id)
+                .where(MessageModels.chat_id == chat_id, MessageModels.created_at < cutoff)
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            query = delete(MessageModels).where(
+                MessageModels.id.in_(batch),
+                MessageModels.created_at < cutoff,
+            )
+            chat_total = 0
+            while True:
+                async with self.engine.begin() as conn:
+                    deleted = (await conn.execute(query)).rowcount
+                    if deleted:
+                        await conn.execute(MessageRepository.uncount_messages(chat_id, deleted))
+                chat_total += deleted
+                if deleted < self.batch_size:
+                    break
+            if chat_total:
+                self.cache.evict(chat_id)
+                self.encoded_cache.evict_chat(chat_id)
+                await self.shared_cache.try_invalidate(chat_id)
+            total += chat_total
+        if total:
+            self.messages_expired += total
+            logger.info("Удалено %s сообщений с истекшим сроком хранения чата", total)
+        return total
+
+    async def run_once(self) -> None:
+        """Один проход обслуживания: партиции вперед, сроки хранения."""
+        if await self.is_partitioned():
+            await self.ensure_partitions()
+            await self.apply_retention()
+        elif self.retention_days:
+            logger.warning("Таблица %s не секционирована, общий срок хранения не применяется", PARENT)
+        await self.expire_chat_messages()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning("Ошибка обслуживания партиций сообщений: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Создать недостающие партиции и запустить периодическое обслуживание."""
+        if await self.is_partitioned():
+            await self.ensure_partitions()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Обслуживание партиций сообщений запущено, интервал %s с", self.interval)
+
+    async def close(self) -> None:
+        """Остановить периодическое обслуживание."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """Созданные и удаленные партиции, удаленные по сроку чата сообщения."""
+        return {
+            "partitions_created": self.partitions_created,
+            "partitions_retired": self.partitions_retired,
+            "messages_expired": self.messages_expired,
+        }
+
+
+partition_manager = PartitionManager(
+    engine=db.engine,
+    premake=settings.message_partition_premake,
+    retention_days=settings.message_retention_days,
+    retention_mode=settings.message_retention_mode,
+    chat_retention_days=settings.message_chat_retention_days,
+    batch_size=settings.purge_batch_size,
+    interval=settings.partition_maintenance_interval,
+) if (
+    settings.message_partitioning
+    or settings.message_retention_days
+    or settings.message_chat_retention_days
+) else None
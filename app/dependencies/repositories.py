@@ -1,54 +1,154 @@
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+import secrets
+import time
+from functools import partial
 
-from app.repositories.messages import MessageRepository
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+
+from app.cache.hot_chats import hot_chat_cache
+from app.cache.shared import shared_chat_cache
+from app.config import settings
 from app.use_case.create_chat import CreateChatUseCase
-from app.repositories.chats import ChatRepository
 from app.database.db import db
+from app.realtime.hub import message_hub
+from app.repositories.unit_of_work import UnitOfWork
+from app.repositories.write_coalescer import message_write_coalescer
+from app.use_case.archive_chat import ExportChatUseCase, ImportChatUseCase
 from app.use_case.get_chat import GetChatUseCase
+from app.use_case.list_chats import ListChatsUseCase
 from app.use_case.send_message import SendMessageUseCase
+from app.use_case.send_messages_batch import SendMessagesBatchUseCase
 from app.use_case.delete_chat import DeleteChatUseCase
+from app.use_case.purge_chat import PurgeChatUseCase
+from app.use_case.search_messages import SearchMessagesUseCase
+from app.use_case.stream_chat import StreamChatUseCase
+
+
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+
+async def get_write_unit_of_work(response: Response) -> UnitOfWork:
+    """
+    Единица работы основной БД для запросов, которые пишут.
+
+    Если есть реплики, клиенту ставится cookie, по которой его чтения
+    ближайшие replica_sticky_seconds секунд идут в основную БД
+    (read-your-writes, пока реплики догоняют).
+    """
+    if db.replica_engines and settings.replica_sticky_seconds > 0:
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            str(time.time() + settings.replica_sticky_seconds),
+            max_age=int(settings.replica_sticky_seconds) + 1,
+            httponly=True,
+        )
+    return UnitOfWork(db.session)
 
 
-async def get_chat_repo(
-    session: AsyncSession = Depends(db.get_session),
-) -> ChatRepository:
-    """Репозиторий для работы с чатами."""
-    return ChatRepository(session)
+async def get_read_unit_of_work(request: Request) -> UnitOfWork:
+    """Единица работы только для чтения: реплика или основная БД, если клиент недавно писал."""
+    try:
+        sticky = float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        sticky = False
+    return UnitOfWork(partial(db.session, read_only=not sticky), read_only=True)
 
 
-async def get_message_repo(
-    session: AsyncSession = Depends(db.get_session),
-) -> MessageRepository:
-    """Репозиторий для работы с сообщениями."""
-    return MessageRepository(session)
+async def require_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
+    """Пропустить запрос к /admin, только если X-Admin-Token совпадает с настройкой admin_token."""
+    if not settings.admin_token or not secrets.compare_digest(x_admin_token or "", settings.admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+
+# Use case собирается одной зависимостью прямо из единицы работы: FastAPI разрешает
+# на запрос один уровень Depends вместо цепочки сессия -> репозиторий -> use case.
+# Сессию открывает сам use case (async with uow), только когда нужна БД.
 
 
 async def get_create_chat_use_case(
-    repo: ChatRepository = Depends(get_chat_repo),
+    uow: UnitOfWork = Depends(get_write_unit_of_work),
 ) -> CreateChatUseCase:
     """UseCase для создания чата."""
-    return CreateChatUseCase(repo)
+    return CreateChatUseCase(uow)
 
 
 async def get_send_message_use_case(
-    chat_repo: ChatRepository = Depends(get_chat_repo),
-    message_repo: MessageRepository = Depends(get_message_repo),
+    uow: UnitOfWork = Depends(get_write_unit_of_work),
 ) -> SendMessageUseCase:
     """UseCase для отправки сообщения в чат."""
-    return SendMessageUseCase(chat_repo, message_repo)
+    return SendMessageUseCase(
+        uow,
+        hot_chat_cache,
+        shared_chat_cache,
+        message_hub,
+        message_write_coalescer,
+    )
+
+
+async def get_send_messages_batch_use_case(
+    uow: UnitOfWork = Depends(get_write_unit_of_work),
+) -> SendMessagesBatchUseCase:
+    """UseCase для пакетной загрузки сообщений в чат."""
+    return SendMessagesBatchUseCase(uow, hot_chat_cache, shared_chat_cache, message_hub)
 
 
 async def get_chat_use_case(
-    chat_repo: ChatRepository = Depends(get_chat_repo),
-    message_repo: MessageRepository = Depends(get_message_repo),
+    uow: UnitOfWork = Depends(get_read_unit_of_work),
 ) -> GetChatUseCase:
-    """UseCase для получения чата и последних сообщений."""
-    return GetChatUseCase(chat_repo, message_repo)
+    """
+    UseCase для получения чата и последних сообщений.
+
+    Кэши заполняются только чтением из основной БД: страница с отстающей
+    реплики, попав в кэш, отдавалась бы и клиентам, читающим из основной БД.
+    """
+    return GetChatUseCase(uow, hot_chat_cache, shared_chat_cache, UnitOfWork(db.session, read_only=True))
+
+
+async def get_list_chats_use_case(
+    uow: UnitOfWork = Depends(get_read_unit_of_work),
+) -> ListChatsUseCase:
+    """UseCase для списка чатов по последней активности."""
+    return ListChatsUseCase(uow)
+
+
+async def get_search_messages_use_case(
+    uow: UnitOfWork = Depends(get_read_unit_of_work),
+) -> SearchMessagesUseCase:
+    """UseCase для полнотекстового поиска сообщений."""
+    return SearchMessagesUseCase(uow)
 
 
 async def get_delete_chat_use_case(
-    repo: ChatRepository = Depends(get_chat_repo),
+    uow: UnitOfWork = Depends(get_write_unit_of_work),
 ) -> DeleteChatUseCase:
     """UseCase для удаления чата вместе с сообщениями."""
-    return DeleteChatUseCase(repo)
\ No newline at end of file
+    return DeleteChatUseCase(uow, hot_chat_cache, shared_chat_cache, message_hub)
+
+
+async def get_purge_chat_use_case(
+    purge: bool = False,
+    uow: UnitOfWork = Depends(get_write_unit_of_work),
+) -> PurgeChatUseCase | None:
+    """UseCase для фонового удаления больших чатов порциями (None, если удаление не фоновое)."""
+    if not purge:
+        return None
+    return PurgeChatUseCase(
+        uow, db.session_factory, settings.purge_batch_size,
+        hot_chat_cache, shared_chat_cache, message_hub,
+    )
+
+
+async def get_stream_chat_use_case() -> StreamChatUseCase:
+    """UseCase для потоковой доставки сообщений чата (сессии берет сам, на время запросов)."""
+    return StreamChatUseCase(
+        db.session_factory, message_hub, settings.stream_heartbeat, settings.stream_replay_limit
+    )
+
+
+async def get_export_chat_use_case() -> ExportChatUseCase:
+    """UseCase для выгрузки чата в архив (сессию на время выгрузки берет сам, из реплики, если есть)."""
+    return ExportChatUseCase(db.pick_session_factory(read_only=True), settings.archive_batch_size)
+
+
+async def get_import_chat_use_case() -> ImportChatUseCase:
+    """UseCase для восстановления чата из архива."""
+    return ImportChatUseCase(db.session_factory, settings.archive_batch_size)
@@ -1,35 +1,127 @@
+import atexit
+import json
 import logging
+import queue
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+from app.config import settings
+
 """Модуль логгирования приложения.
 
-Создает логгер `app_logger`, который:
-- выводит сообщения уровня INFO и выше в консоль,
-- записывает сообщения уровня DEBUG и выше в файл logs/app.log."""
+Создает логгер `app_logger`, который не пишет ничего в потоке event loop:
+записи кладутся в очередь (QueueHandler), а форматирование и вывод
+выполняет отдельный поток (QueueListener):
+- сообщения уровня INFO и выше выводятся в консоль,
+- сообщения уровня LOG_LEVEL и выше пишутся в logs/app.log с ротацией по размеру.
+
+Сообщения логируются в %-стиле (logger.info("чат id=%s", id)): строка
+собирается только в потоке вывода и только для записей, прошедших фильтры.
+Каждая запись несет ID запроса (см. RequestIdMiddleware), формат — текст
+или JSON (LOG_FORMAT). Многочисленные записи отдельных уровней можно
+прореживать (LOG_SAMPLE_RATES)."""
 
 LOG_DIR = Path(__file__).parent.parent / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
 LOG_FILE = LOG_DIR / "app.log"
 
-logger = logging.getLogger("app_logger")
-logger.setLevel(logging.DEBUG)
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
 
-formatter = logging.Formatter(
-    "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-)
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет в запись ID текущего запроса (поле request_id)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает лишь долю записей указанных уровней.
+
+    Attributes:
+        rates (dict[int, float]): Доля пропускаемых записей по уровню (1 — все, 0 — ни одной);
+            записи уровней, которых нет в словаре, пропускаются все.
+    """
+
+    def __init__(self, rates: dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        return rate is None or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler, который не форматирует запись при постановке в очередь.
+
+    Стандартный prepare() собирает сообщение в вызывающем потоке; здесь это
+    откладывается до потока QueueListener. Записи не покидают процесс,
+    поэтому сериализовать их не нужно.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def sample_rates(rates: dict[str, float]) -> dict[int, float]:
+    """Перевести {"INFO": 0.1} из настроек в {logging.INFO: 0.1}."""
+    return {logging.getLevelName(level.upper()): rate for level, rate in rates.items()}
+
+
+if settings.log_format == "json":
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(name)s [%(request_id)s]: %(message)s"
+    )
 
 console_handler = logging.StreamHandler()
 console_handler.setLevel(logging.INFO)
 console_handler.setFormatter(formatter)
 
-file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
-file_handler.setLevel(logging.DEBUG)
+file_handler = RotatingFileHandler(
+    LOG_FILE,
+    maxBytes=settings.log_max_bytes,
+    backupCount=settings.log_backup_count,
+    encoding="utf-8",
+)
+file_handler.setLevel(settings.log_level.upper())
 file_handler.setFormatter(formatter)
 
-if not logger.hasHandlers():
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = DeferredQueueHandler(log_queue)
+queue_handler.addFilter(SamplingFilter(sample_rates(settings.log_sample_rates)))
+queue_handler.addFilter(RequestIdFilter())
 
+listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
 
+logger = logging.getLogger("app_logger")
+logger.setLevel(settings.log_level.upper())
 
+if not logger.hasHandlers():
+    logger.addHandler(queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
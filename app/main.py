@@ -3,7 +3,19 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.logs.logger import logger
+from app.api.admin import router as admin_router
 from app.api.chats import router as chats_router
+from app.api.metrics import router as metrics_router
+from app.cache.shared import shared_chat_cache
+from app.config import settings
+from app.database.db import db
+from app.database.partitions import partition_manager
+from app.middleware.admission import AdmissionMiddleware, admission_controller
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+from app.monitoring.sql import instrument_engine
+from app.realtime.pg_broadcast import pg_broadcaster
+from app.repositories.write_coalescer import message_write_coalescer
 
 
 @asynccontextmanager
@@ -14,17 +26,45 @@ async def lifespan(app: FastAPI):
     Используется для:
     - Логирования запуска и завершения сервера
     - Создания таблиц в базе данных при старте
+    - Логирования статистики пула соединений и закрытия пула при остановке
+    - Запуска и остановки приема инвалидаций общего кэша
+    - Запуска и остановки рассылки сообщений между воркерами (LISTEN/NOTIFY)
+    - Запуска и остановки обслуживания партиций и сроков хранения сообщений
+    - Сохранения накопленных пачек группового коммита при остановке
 
     Args:
         app (FastAPI): Экземпляр FastAPI приложения.
     """
     try:
         logger.info("Запуск сервера")
+        await shared_chat_cache.start()
+        if pg_broadcaster is not None:
+            await pg_broadcaster.start()
+        if partition_manager is not None:
+            await partition_manager.start()
         yield
+        if message_write_coalescer is not None:
+            await message_write_coalescer.close()
+        if partition_manager is not None:
+            await partition_manager.close()
+        if pg_broadcaster is not None:
+            await pg_broadcaster.close()
+        await shared_chat_cache.close()
+        logger.info("Статистика пула соединений: %s", db.pool_status())
+        await db.dispose()
         logger.info("Выключение сервера")
     except ConnectionRefusedError as e:
-        logger.warning(f"Не удалось подключиться к БД: {e}")
+        logger.warning("Не удалось подключиться к БД: %s", e)
 
 
 app = FastAPI(lifespan=lifespan)
+if admission_controller is not None:
+    app.add_middleware(AdmissionMiddleware, controller=admission_controller)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 app.include_router(chats_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+
+for engine in (db.engine, *db.replica_engines):
+    instrument_engine(engine, settings.slow_query_threshold_ms / 1000)
@@ -0,0 +1,242 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.logs.logger import logger
+
+READ = "read"
+WRITE = "write"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class AdaptiveLimiter:
+    """
+    Ограничитель одновременных запросов с адаптивным лимитом и ограниченной очередью.
+
+    Лимит подстраивается по задержке запросов (градиентом, как в Netflix
+    concurrency-limits): короткая скользящая средняя задержки сравнивается
+    с базовой (быстро опускается, медленно поднимается). Пока средняя
+    не превышает базовую больше чем в tolerance раз, лимит растет на
+    sqrt(лимита), иначе уменьшается пропорционально росту задержки, но не
+    больше чем вдвое за шаг. Задержка включает ожидание соединения из пула
+    и SQL, поэтому насыщение пула тоже снижает лимит.
+
+    Запросы сверх лимита ждут в очереди не больше queue_timeout секунд,
+    очередь не длиннее max_queue; остальным сразу отказывают.
+
+    Attributes:
+        name (str): Класс запросов (read или write).
+        max_limit (int): Начальный и максимальный лимит.
+        min_limit (int): Минимальный лимит.
+        max_queue (int): Максимальная длина очереди.
+        queue_timeout (float): Сколько секунд запрос может ждать в очереди.
+        tolerance (float): Во сколько раз задержка может превысить базовую до снижения лимита.
+    """
+
+    SHORT_WEIGHT = 0.1
+    BASELINE_DRIFT = 0.001
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        min_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        tolerance: float = 2.0,
+    ):
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.latency: float | None = None
+        self.baseline: float | None = None
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self) -> bool:
+        """
+        Занять место, при необходимости подождав в очереди.
+
+        Returns:
+            bool: True, если запрос допущен; False, если очередь полна
+                или место не освободилось за queue_timeout.
+        """
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release(None)
+            else:
+                waiter.cancel()
+            raise
+        if waiter.done():
+            self.admitted += 1
+            return True
+        waiter.cancel()
+        self.rejected += 1
+        return False
+
+    def release(self, latency: float | None) -> None:
+        """
+        Освободить место и учесть задержку запроса.
+
+        Args:
+            latency (float | None): Время обработки запроса в секундах (None — не учитывать).
+        """
+        if latency is not None:
+            self._adapt(latency)
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _adapt(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = self.baseline = latency
+            return
+        self.latency += (latency - self.latency) * self.SHORT_WEIGHT
+        if self.latency < self.baseline:
+            self.baseline = self.latency
+        else:
+            self.baseline += (self.latency - self.baseline) * self.BASELINE_DRIFT
+        gradient = max(0.5, min(1.0, self.tolerance * self.baseline / self.latency))
+        target = self.limit * gradient
+        # Растем, только если лимит действительно используется.
+        if gradient == 1.0 and self.in_flight * 2 >= self.limit:
+            target += math.sqrt(self.limit)
+        limit = self.limit + (target - self.limit) * self.SMOOTHING
+        self.limit = max(float(self.min_limit), min(float(self.max_limit), limit))
+
+    def stats(self) -> dict:
+        """Текущий лимит, занятые места, очередь, задержки и счетчики допущенных и отклоненных."""
+        return {
+            "limit": round(self.limit, 1),
+            "in_flight": self.in_flight,
+            "queued": sum(not waiter.done() for waiter in self._waiters),
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "baseline_ms": round(self.baseline * 1000, 2) if self.baseline is not None else None,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """
+    Допуск запросов к /chats с отдельными бюджетами чтения и записи.
+
+    Чтения (GET) и записи (POST, DELETE) ограничиваются разными
+    AdaptiveLimiter: медленные записи не вытесняют чтения, и наоборот.
+    Поток сообщений чата (/stream) держит соединение долго и не ограничивается,
+    остальные маршруты (/metrics, /admin) тоже.
+
+    Attributes:
+        limiters (dict[str, AdaptiveLimiter]): Ограничители по классам read и write.
+        retry_after (int): Значение Retry-After в ответе 503, в секундах.
+    """
+
+    def __init__(self, read: AdaptiveLimiter, write: AdaptiveLimiter, retry_after: int):
+        self.limiters = {READ: read, WRITE: write}
+        self.retry_after = retry_after
+
+    @staticmethod
+    def classify(method: str, path: str) -> str | None:
+        """Класс запроса (read или write) или None, если запрос не ограничивается."""
+        if not path.startswith("/chats") or path.endswith("/stream"):
+            return None
+        if method == "GET":
+            return READ
+        if method in WRITE_METHODS:
+            return WRITE
+        return None
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+class AdmissionMiddleware:
+    """
+    Отвечает 503 с Retry-After, когда бюджет класса запросов исчерпан.
+
+    Вместо неограниченной очереди перед пулом соединений запрос ждет места
+    не дольше queue_timeout, а при полной очереди отклоняется сразу.
+
+    Attributes:
+        app (ASGIApp): Обернутое ASGI-приложение.
+        controller (AdmissionController): Бюджеты чтения и записи.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        kind = self.controller.classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+        limiter = self.controller.limiters[kind]
+        if not await limiter.acquire():
+            logger.warning("Запрос %s %s отклонен: бюджет %s исчерпан", scope["method"], scope["path"], kind)
+            response = JSONResponse(
+                {"detail": "Service overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        started = time.perf_counter()
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.perf_counter() - started
+        finally:
+            limiter.release(latency)
+
+
+admission_controller = AdmissionController(
+    read=AdaptiveLimiter(
+        READ,
+        max_limit=settings.admission_read_limit,
+        min_limit=settings.admission_min_limit,
+        max_queue=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout,
+        tolerance=settings.admission_latency_tolerance,
+    ),
+    write=AdaptiveLimiter(
+        WRITE,
+        max_limit=settings.admission_write_limit,
+        min_limit=settings.admission_min_limit,
+        max_queue=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout,
+        tolerance=settings.admission_latency_tolerance,
+    ),
+    retry_after=settings.admission_retry_after,
+) if settings.admission_control else None
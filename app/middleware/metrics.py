@@ -0,0 +1,49 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.monitoring.collectors import http_request_duration, http_requests, http_requests_in_flight
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Собирает метрики HTTP-запросов для /metrics.
+
+    Время запроса пишется в гистограмму по методу и шаблону маршрута
+    (/chats/{id}, а не /chats/42, чтобы число рядов не росло), запросы
+    считаются по коду ответа, отдельно учитываются запросы в обработке.
+    Для потоковых ответов время включает всю передачу тела.
+
+    Attributes:
+        app (ASGIApp): Обернутое ASGI-приложение.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec(method)
+            route = scope.get("route")
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            http_request_duration.observe(elapsed, method, path)
+            http_requests.inc(method, path, str(status_code))
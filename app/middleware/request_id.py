@@ -0,0 +1,49 @@
+import re
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.logs.logger import request_id
+
+REQUEST_ID_HEADER = "x-request-id"
+VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+
+class RequestIdMiddleware:
+    """
+    Присваивает каждому HTTP-запросу ID для логов.
+
+    ID берется из заголовка X-Request-ID (если он корректен) или генерируется,
+    кладется в contextvar request_id на время обработки запроса, включая
+    фоновые задачи, и возвращается клиенту в том же заголовке.
+
+    Attributes:
+        app (ASGIApp): Обернутое ASGI-приложение.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = None
+        for name, raw in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                value = raw.decode("latin-1")
+                break
+        if value is None or not VALID_REQUEST_ID.fullmatch(value):
+            value = uuid.uuid4().hex
+        header = (REQUEST_ID_HEADER.encode(), value.encode())
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        token = request_id.set(value)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,205 @@
+"""Метрики в текстовом формате Prometheus.
+
+Каждый воркер держит свои счетчики и отдает их с меткой worker (PID),
+так что ряды разных процессов не смешиваются. Метрики обновляются только
+из потока event loop, поэтому обходятся без блокировок: обновление — это
+несколько операций со словарем и списком."""
+import math
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric(ABC):
+    """
+    Базовая метрика с метками.
+
+    Наследники реализуют samples(); без него метрику нельзя создать.
+
+    Attributes:
+        name (str): Имя метрики.
+        documentation (str): Описание (строка HELP).
+        label_names (tuple[str, ...]): Имена меток.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def _labels(self, values: LabelValues, extra: dict[str, str] | None = None) -> str:
+        pairs = [*zip(self.label_names, values), *(extra or {}).items()]
+        return ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs)
+
+    @abstractmethod
+    def samples(self) -> list[tuple[str, str, float]]:
+        """Выборки метрики: (суффикс имени, метки, значение)."""
+
+    def render(self, constant_labels: str) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            labels = ",".join(part for part in (labels, constant_labels) if part)
+            lines.append(f"{self.name}{suffix}{{{labels}}} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        return [("_total", self._labels(labels), value) for labels, value in self._values.items()]
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться."""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self._values[labels] = value
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        return [("", self._labels(labels), value) for labels, value in self._values.items()]
+
+
+class Histogram(Metric):
+    """
+    Гистограмма с фиксированными границами корзин.
+
+    Наблюдение увеличивает одну корзину (поиск делением пополам),
+    накопленные значения считаются только при выдаче.
+
+    Attributes:
+        buckets (tuple[float, ...]): Верхние границы корзин по возрастанию.
+    """
+    type = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def samples(self) -> list[tuple[str, str, float]]:
+        samples = []
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                samples.append(("_bucket", self._labels(labels, {"le": _format_value(float(bound))}), cumulative))
+            samples.append(("_sum", self._labels(labels), self._sums[labels]))
+            samples.append(("_count", self._labels(labels), cumulative))
+        return samples
+
+
+class Registry:
+    """
+    Набор метрик воркера.
+
+    Attributes:
+        constant_labels (dict[str, str]): Метки, добавляемые ко всем выборкам.
+    """
+
+    def __init__(self, constant_labels: dict[str, str]):
+        self.constant_labels = constant_labels
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus 0.0.4."""
+        constant = ",".join(f'{name}="{_escape(value)}"' for name, value in self.constant_labels.items())
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(constant))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(constant_labels={"worker": str(os.getpid())})
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по маршруту.",
+    ("method", "route"),
+))
+http_requests = registry.register(Counter(
+    "http_requests",
+    "HTTP-запросы по маршруту и коду ответа.",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "HTTP-запросы, обрабатываемые в данный момент.",
+    ("method",),
+))
+db_statement_duration = registry.register(Histogram(
+    "db_statement_duration_seconds",
+    "Время выполнения SQL-запроса по типу.",
+    ("operation",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+))
+db_slow_statements = registry.register(Counter(
+    "db_slow_statements",
+    "SQL-запросы дольше порога SLOW_QUERY_THRESHOLD_MS.",
+    ("operation",),
+))
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections",
+    "Соединения пула основной БД по состоянию (обновляется при выдаче метрик).",
+    ("state",),
+))
+chat_purges = registry.register(Counter(
+    "chat_purges",
+    "Фоновые удаления чатов по результату (succeeded, failed).",
+    ("result",),
+))
@@ -0,0 +1,51 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.logs.logger import logger
+from app.monitoring.collectors import db_slow_statements, db_statement_duration
+
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def statement_operation(statement: str) -> str:
+    """Тип запроса по первому слову: SELECT, INSERT, ... или OTHER."""
+    words = statement.split(None, 1)
+    word = words[0].upper() if words else ""
+    return word if word in OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine, slow_threshold: float) -> None:
+    """
+    Подключить к движку учет времени SQL-запросов и журнал медленных запросов.
+
+    Время меряется между before_cursor_execute и after_cursor_execute
+    (для executemany — на весь пакет) и попадает в гистограмму
+    db_statement_duration_seconds. Запросы дольше slow_threshold секунд
+    логируются с уровнем WARNING.
+
+    Args:
+        engine (AsyncEngine): Движок SQLAlchemy.
+        slow_threshold (float): Порог медленного запроса в секундах (0 — не логировать).
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        operation = statement_operation(statement)
+        db_statement_duration.observe(elapsed, operation)
+        if slow_threshold and elapsed >= slow_threshold:
+            db_slow_statements.inc(operation)
+            logger.warning("Медленный запрос (%.1f мс): %s", elapsed * 1000, " ".join(statement.split())[:1000])
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
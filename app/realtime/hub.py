@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime
+from typing import NamedTuple
+
+from app.config import settings
+from app.schemas.cursors import MessageCursor
+from app.schemas.responses import MessageResponseSchema
+
+
+class ChatEvent(NamedTuple):
+    """
+    Событие чата, уже отформатированное для SSE.
+
+    Attributes:
+        key (tuple | None): Позиция сообщения (created_at, id) для дедупликации
+            при догоне истории; None для служебных событий.
+        data (str): Готовый текст события в формате text/event-stream.
+    """
+    key: tuple[datetime, int] | None
+    data: str
+
+
+def message_event(message) -> ChatEvent:
+    """Событие о новом сообщении (любой объект с полями сообщения)."""
+    payload = MessageResponseSchema.model_validate(message)
+    cursor = MessageCursor.from_message(payload).encode()
+    return ChatEvent(
+        key=(payload.created_at, payload.id),
+        data=f"id: {cursor}\nevent: message\ndata: {payload.model_dump_json()}\n\n",
+    )
+
+
+RESET_EVENT = ChatEvent(key=None, data="event: reset\ndata: {}\n\n")
+DELETED_EVENT = ChatEvent(key=None, data="event: deleted\ndata: {}\n\n")
+
+
+class Subscription:
+    """
+    Подписка на события одного чата с ограниченной очередью.
+
+    Attributes:
+        chat_id (int): ID чата.
+        queue (asyncio.Queue): Очередь событий подписчика.
+        closed (bool): Подписка закрыта (чат удален или подписчик не успевал).
+    """
+    __slots__ = ("chat_id", "queue", "closed")
+
+    def __init__(self, chat_id: int, queue_size: int):
+        self.chat_id = chat_id
+        self.queue: asyncio.Queue[ChatEvent] = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def close(self, event: ChatEvent) -> None:
+        """Закрыть подписку: отбросить недоставленное и оставить финальное событие."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+        self.closed = True
+
+
+class MessageHub:
+    """
+    Внутрипроцессный pub/sub новых сообщений по чатам.
+
+    Событие форматируется один раз и раскладывается по очередям подписчиков.
+    Очереди ограничены: если подписчик не успевает, недоставленные события
+    отбрасываются, он получает событие reset и отключается, а при переподключении
+    догоняет историю из БД по курсору.
+
+    Если задан relay (см. PostgresBroadcaster), опубликованное также
+    пересылается остальным воркерам, а полученное от них раздается только
+    локальным подписчикам через dispatch_*.
+
+    Attributes:
+        queue_size (int): Размер очереди одного подписчика.
+        relay: Пересылка событий другим воркерам или None.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.relay = None
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self.published = 0
+        self.slow_consumers_dropped = 0
+
+    def subscribe(self, chat_id: int) -> Subscription:
+        """Подписаться на события чата."""
+        subscription = Subscription(chat_id, self.queue_size)
+        self._subscribers.setdefault(chat_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Отписаться от событий чата."""
+        subscribers = self._subscribers.get(subscription.chat_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.chat_id]
+
+    def has_subscribers(self, chat_id: int) -> bool:
+        return chat_id in self._subscribers
+
+    def wants_messages(self, chat_id: int) -> bool:
+        """Нужны ли сообщения чата хоть кому-то (здесь или в других воркерах)."""
+        return self.relay is not None or self.has_subscribers(chat_id)
+
+    def publish(self, chat_id: int, event: ChatEvent) -> None:
+        """Разослать событие подписчикам чата."""
+        for subscription in list(self._subscribers.get(chat_id, ())):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.close(RESET_EVENT)
+                self.unsubscribe(subscription)
+                self.slow_consumers_dropped += 1
+        self.published += 1
+
+    def publish_messages(self, chat_id: int, messages: list) -> None:
+        """Разослать подписчикам новые сообщения чата (по порядку создания)."""
+        self.dispatch_messages(chat_id, messages)
+        if self.relay is not None:
+            self.relay.send_messages(chat_id, messages)
+
+    def dispatch_messages(self, chat_id: int, messages: list) -> None:
+        """Раздать сообщения только подписчикам этого воркера."""
+        if not self.has_subscribers(chat_id):
+            return
+        for message in messages:
+            self.publish(chat_id, message_event(message))
+
+    def close_chat(self, chat_id: int) -> None:
+        """Сообщить подписчикам, что чат удален, и отключить их."""
+        self.dispatch_close(chat_id)
+        if self.relay is not None:
+            self.relay.send_close(chat_id)
+
+    def dispatch_close(self, chat_id: int) -> None:
+        """Отключить подписчиков удаленного чата в этом воркере."""
+        for subscription in list(self._subscribers.pop(chat_id, ())):
+            subscription.close(DELETED_EVENT)
+
+    def reset_all(self) -> None:
+        """Отключить всех подписчиков событием reset (события могли потеряться)."""
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.close(RESET_EVENT)
+        self._subscribers.clear()
+
+    def stats(self) -> dict:
+        """Количество подписчиков, опубликованных и сброшенных из-за медленных клиентов."""
+        return {
+            "chats": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+        }
+
+
+message_hub = MessageHub(queue_size=settings.stream_queue_size)
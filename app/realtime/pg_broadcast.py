@@ -0,0 +1,272 @@
+import asyncio
+import json
+import uuid
+
+import asyncpg
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database.db import db
+from app.logs.logger import logger
+from app.realtime.hub import MessageHub, message_hub
+from app.repositories.messages import MessageRepository
+from app.schemas.responses import MessageResponseSchema
+
+CHANNEL = "chat_messages"
+
+
+class PostgresBroadcaster:
+    """
+    Рассылка новых сообщений между воркерами через LISTEN/NOTIFY PostgreSQL.
+
+    Подключается к хабу как relay: опубликованное в этом воркере копится
+    interval секунд, склеивается по чатам и отправляется пачкой NOTIFY
+    через отдельное соединение asyncpg. Уведомления других воркеров
+    раздаются только локальным подписчикам хаба.
+
+    Полезная нагрузка NOTIFY ограничена 8000 байт, поэтому сообщения
+    раскладываются по нескольким уведомлениям, а не влезающие в одно
+    уведомление пересылаются списком ID и дочитываются получателем из БД.
+    Порядок сообщений сохраняется: пока чат дочитывается по ID, следующие
+    уведомления этого чата ждут в очереди чата и раздаются после него.
+    Чужие и поврежденные уведомления канала пропускаются с предупреждением
+    в логе и учитываются в stats() как receive_errors.
+
+    Attributes:
+        dsn (str): Адрес PostgreSQL в формате libpq.
+        hub (MessageHub): Хаб, которому раздаются полученные сообщения.
+        session_factory (async_sessionmaker): Фабрика сессий для дочитывания по ID.
+        interval (float): Сколько секунд копить уведомления перед отправкой.
+    """
+
+    MAX_PAYLOAD = 7000
+    IDS_PER_PAYLOAD = 500
+    RECONNECT_DELAY = 1
+
+    def __init__(self, dsn: str, hub: MessageHub, session_factory: async_sessionmaker, interval: float):
+        self.dsn = dsn
+        self.hub = hub
+        self.session_factory = session_factory
+        self.interval = interval
+        self.origin = uuid.uuid4().hex
+        self._connection: asyncpg.Connection | None = None
+        self._pending: dict[int, list[dict]] = {}
+        self._deleted: list[int] = []
+        self._flusher: asyncio.Task | None = None
+        self._reconnecting: asyncio.Task | None = None
+        self._backlog: dict[int, list[tuple[str, list]]] = {}
+        self._dispatches: set[asyncio.Task] = set()
+        self._closing = False
+        self.notifications_sent = 0
+        self.notifications_received = 0
+        self.send_errors = 0
+        self.receive_errors = 0
+
+    async def _connect(self) -> None:
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(CHANNEL, self._on_notification)
+        self._connection.add_termination_listener(self._on_termination)
+
+    async def start(self) -> None:
+        """Подключиться, начать прием уведомлений и подключиться к хабу."""
+        self._closing = False
+        await self._connect()
+        self.hub.relay = self
+        logger.info("Рассылка сообщений через LISTEN/NOTIFY запущена, канал %s", CHANNEL)
+
+    async def close(self) -> None:
+        """Отправить накопленное, отключиться от хаба и закрыть соединение."""
+        self._closing = True
+        self.hub.relay = None
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+        if self._flusher is not None:
+            await self._flusher
+        for task in list(self._dispatches):
+            task.cancel()
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+        self._backlog.clear()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    def send_messages(self, chat_id: int, messages: list) -> None:
+        """Поставить сообщения чата в очередь на отправку другим воркерам."""
+        pending = self._pending.setdefault(chat_id, [])
+        for message in messages:
+            pending.append(MessageResponseSchema.model_validate(message).model_dump(mode="json"))
+        self._schedule_flush()
+
+    def send_close(self, chat_id: int) -> None:
+        """Поставить в очередь уведомление об удалении чата."""
+        self._deleted.append(chat_id)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush())
+
+    def _payloads(self, chat_id: int, messages: list[dict]) -> list[str]:
+        """
+        Разложить сообщения чата по уведомлениям, не превышающим MAX_PAYLOAD.
+
+        Уведомления идут в порядке сообщений: перед списком ID не влезающих
+        сообщений отправляется накопленная пачка предыдущих.
+        """
+        payloads = []
+        chunk: list[str] = []
+        size = 0
+        oversize: list[int] = []
+
+        def flush_chunk() -> None:
+            nonlocal chunk, size
+            if chunk:
+                payloads.append(self._envelope(chat_id, "m", f"[{','.join(chunk)}]"))
+                chunk, size = [], 0
+
+        def flush_oversize() -> None:
+            nonlocal oversize
+            for start in range(0, len(oversize), self.IDS_PER_PAYLOAD):
+                payloads.append(self._envelope(chat_id, "ids", json.dumps(oversize[start:start + self.IDS_PER_PAYLOAD])))
+            oversize = []
+
+        for message in messages:
+            encoded = json.dumps(message, ensure_ascii=False)
+            length = len(encoded.encode())
+            if length > self.MAX_PAYLOAD:
+                flush_chunk()
+                oversize.append(message["id"])
+                continue
+            flush_oversize()
+            if chunk and size + length > self.MAX_PAYLOAD:
+                flush_chunk()
+            chunk.append(encoded)
+            size += length + 1
+        flush_chunk()
+        flush_oversize()
+        return payloads
+
+    def _envelope(self, chat_id: int, kind: str, body: str) -> str:
+        return f'{{"o":"{self.origin}","c":{chat_id},"{kind}":{body}}}'
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending or self._deleted:
+                if not self._closing:
+                    await asyncio.sleep(self.interval)
+                pending, self._pending = self._pending, {}
+                deleted, self._deleted = self._deleted, []
+                payloads = [
+                    payload
+                    for chat_id, messages in pending.items()
+                    for payload in self._payloads(chat_id, messages)
+                ]
+                payloads.extend(self._envelope(chat_id, "d", "1") for chat_id in deleted)
+                if self._connection is None or self._connection.is_closed():
+                    self.send_errors += len(payloads)
+                    continue
+                try:
+                    await self._connection.executemany(
+                        "SELECT pg_notify($1, $2)", [(CHANNEL, payload) for payload in payloads]
+                    )
+                    self.notifications_sent += len(payloads)
+                except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError) as e:
+                    self.send_errors += len(payloads)
+                    logger.warning("Не удалось разослать %s уведомлений о сообщениях: %s", len(payloads), e)
+        finally:
+            self._flusher = None
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            if data["o"] == self.origin:
+                return
+            chat_id = int(data["c"])
+        except (ValueError, KeyError, TypeError) as e:
+            self._reject(payload, e)
+            return
+        self.notifications_received += 1
+        if "d" in data:
+            self.hub.dispatch_close(chat_id)
+            return
+        if not self.hub.has_subscribers(chat_id):
+            return
+        try:
+            if "m" in data:
+                item = ("m", [MessageResponseSchema.model_validate(m) for m in data["m"]])
+            else:
+                item = ("ids", [int(message_id) for message_id in data["ids"]])
+        except (ValueError, KeyError, TypeError) as e:
+            self._reject(payload, e)
+            return
+        if chat_id in self._backlog:
+            self._backlog[chat_id].append(item)
+        elif item[0] == "m":
+            self.hub.dispatch_messages(chat_id, item[1])
+        else:
+            self._backlog[chat_id] = [item]
+            task = asyncio.create_task(self._dispatch_backlog(chat_id))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    def _reject(self, payload: str, error: Exception) -> None:
+        """Учесть уведомление, которое не удалось разобрать (чужое или поврежденное)."""
+        self.receive_errors += 1
+        logger.warning("Пропущено некорректное уведомление в канале %s: %s (%.200s)", CHANNEL, error, payload)
+
+    async def _dispatch_backlog(self, chat_id: int) -> None:
+        """Раздать уведомления чата по порядку, дочитывая сообщения по ID из БД."""
+        backlog = self._backlog[chat_id]
+        try:
+            while backlog:
+                kind, items = backlog.pop(0)
+                if kind == "m":
+                    self.hub.dispatch_messages(chat_id, items)
+                    continue
+                try:
+                    async with self.session_factory() as session:
+                        messages = await MessageRepository(session).get_messages_by_ids(items)
+                except Exception as e:
+                    logger.warning("Не удалось дочитать сообщения чата id=%s по уведомлению: %s", chat_id, e)
+                    continue
+                self.hub.dispatch_messages(chat_id, messages)
+        finally:
+            self._backlog.pop(chat_id, None)
+
+    def _on_termination(self, connection) -> None:
+        if self._closing:
+            return
+        logger.warning("Соединение LISTEN/NOTIFY потеряно, переподключение")
+        self._connection = None
+        # Пока соединения не было, уведомления могли потеряться:
+        # подписчики переподключатся и догонят историю по курсору.
+        self.hub.reset_all()
+        self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while not self._closing:
+            await asyncio.sleep(self.RECONNECT_DELAY)
+            try:
+                await self._connect()
+                logger.info("Соединение LISTEN/NOTIFY восстановлено")
+                return
+            except (asyncpg.PostgresError, OSError) as e:
+                logger.warning("Не удалось переподключиться для LISTEN/NOTIFY: %s", e)
+
+    def stats(self) -> dict:
+        """Отправленные и полученные уведомления, ошибки отправки и разбора."""
+        return {
+            "sent": self.notifications_sent,
+            "received": self.notifications_received,
+            "send_errors": self.send_errors,
+            "receive_errors": self.receive_errors,
+        }
+
+
+pg_broadcaster = PostgresBroadcaster(
+    dsn=make_url(settings.pg_url).set(drivername="postgresql").render_as_string(hide_password=False),
+    hub=message_hub,
+    session_factory=db.session_factory,
+    interval=settings.pg_broadcast_interval,
+) if settings.pg_broadcast else None
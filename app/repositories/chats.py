@@ -1,7 +1,11 @@
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import select, delete, insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database.models import ChatModels
+from app.repositories.rows import ChatRow, ChatSummaryRow, ChatVersionRow
+from app.schemas.cursors import ChatCursor
 
 
 class ChatRepository:
@@ -11,7 +15,11 @@ class ChatRepository:
     Отвечает за CRUD-операции над моделью ChatModels:
     - создание чата,
     - получение чата по id,
+    - версия истории чата для условных запросов,
+    - список чатов по последней активности,
     - удаление чата.
+
+    Методы не фиксируют транзакцию: это делает UnitOfWork.
     """
 
     model = ChatModels
@@ -25,44 +33,99 @@ class ChatRepository:
         """
         self.session = session
 
-    async def create_chat(self, title: str) -> ChatModels:
+    async def create_chat(self, title: str, created_at: datetime | None = None) -> ChatRow:
         """
-        Создать новый чат.
+        Создать новый чат одним запросом INSERT ... RETURNING.
 
         Args:
             title (str): Заголовок чата.
+            created_at (datetime | None): Время создания (по умолчанию — now() на стороне БД),
+                задается при восстановлении из архива. Последняя активность чата
+                до первого сообщения равна времени создания.
 
         Returns:
-            ChatModels: Созданный объект чата с заполненным id и created_at.
+            ChatRow: Созданный чат.
         """
-        chat = self.model(title=title)
-        self.session.add(chat)
-        await self.session.commit()
-        return chat
+        values = {"title": title}
+        if created_at is not None:
+            values.update(created_at=created_at, last_message_at=created_at)
+        query = insert(self.model).values(values).returning(self.model.id, self.model.title, self.model.created_at)
+        return ChatRow._make((await self.session.execute(query)).one())
 
-    async def get_chat(self, chat_id: int) -> ChatModels | None:
+    async def get_chat(self, chat_id: int) -> ChatRow | None:
         """
         Получить чат по идентификатору.
 
+        Читаются только колонки, ORM-объект не создается.
+
         Args:
             chat_id (int): ID чата.
 
         Returns:
-            ChatModels | None: Найденный чат или None, если не найден.
+            ChatRow | None: Найденный чат или None, если не найден.
         """
-        query = select(self.model).where(self.model.id == chat_id)
+        query = select(self.model.id, self.model.title, self.model.created_at).where(self.model.id == chat_id)
         result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        row = result.one_or_none()
+        return ChatRow._make(row) if row is not None else None
+
+    async def get_chat_version(self, chat_id: int) -> ChatVersionRow | None:
+        """
+        Получить версию истории чата одним чтением строки чата по первичному ключу.
+
+        Последнее сообщение и счетчик денормализованы в строке чата,
+        поэтому таблица сообщений не читается.
+
+        Args:
+            chat_id (int): ID чата.
+
+        Returns:
+            ChatVersionRow | None: Последнее сообщение и количество сообщений
+                или None, если чат не найден.
+        """
+        query = select(self.model.last_message_id, self.model.message_count).where(self.model.id == chat_id)
+        row = (await self.session.execute(query)).one_or_none()
+        return ChatVersionRow._make(row) if row is not None else None
 
-    async def delete_chat(self, chat: ChatModels) -> None:
+    async def list_chats(self, limit: int, cursor: ChatCursor | None = None) -> list[ChatSummaryRow]:
         """
-        Удалить чат.
+        Получить чаты по убыванию последней активности.
+
+        Порядок (last_message_at, id) обслуживается индексом
+        ix_chat_last_message_at_id; счетчик и последнее сообщение хранятся
+        в самой строке чата, поэтому таблица сообщений не читается.
 
         Args:
-            chat (ChatModels): Объект чата для удаления.
+            limit (int): Максимальное количество чатов.
+            cursor (ChatCursor | None): Вернуть чаты после курсора.
 
         Returns:
-            None
+            list[ChatSummaryRow]: Чаты по убыванию (last_message_at, id).
+        """
+        query = select(*(getattr(self.model, name) for name in ChatSummaryRow._fields))
+        if cursor is not None:
+            query = query.where(tuple_(self.model.last_message_at, self.model.id) < (cursor.last_message_at, cursor.id))
+        query = query.order_by(self.model.last_message_at.desc(), self.model.id.desc()).limit(limit)
+        return [ChatSummaryRow._make(row) for row in await self.session.execute(query)]
+
+    async def delete_chat(self, chat_id: int) -> bool:
         """
-        await self.session.delete(chat)
-        await self.session.commit()
+        Удалить чат одним запросом DELETE.
+
+        Сообщения чата удаляются самой БД (ON DELETE CASCADE),
+        ORM их не загружает.
+
+        Args:
+            chat_id (int): ID чата для удаления.
+
+        Returns:
+            bool: True, если чат был удален, False, если чат не найден.
+        """
+        query = (
+            delete(self.model)
+            .where(self.model.id == chat_id)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none() is not None
@@ -0,0 +1,16 @@
+from sqlalchemy.exc import IntegrityError
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+class ChatNotFoundError(Exception):
+    """Чат, к которому относится операция, не существует."""
+
+    def __init__(self, chat_id: int):
+        super().__init__(f"Chat with id={chat_id} not found")
+        self.chat_id = chat_id
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    """Проверить, что IntegrityError вызвана нарушением внешнего ключа."""
+    return getattr(error.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION
@@ -1,15 +1,37 @@
-from sqlalchemy import select
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+from sqlalchemy import Row, Select, Update, bindparam, case, cast, column, func, select, tuple_, delete, insert, true, update
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.models import MessageModels
+from app.config import settings
+from app.database.models import ChatModels, MessageModels
+from app.repositories.exceptions import ChatNotFoundError, is_foreign_key_violation
+from app.repositories.rows import ChatRow, MessageRow, SearchHit
+from app.schemas.cursors import MessageCursor, SearchCursor
 
 
 class MessageRepository:
     """
     Репозиторий для работы с сообщениями.
+
+    Методы не фиксируют транзакцию: это делает UnitOfWork.
     """
 
     model = MessageModels
+    # Колонки для чтения без ORM-объектов, в порядке полей MessageRow.
+    row_columns = tuple(getattr(MessageModels, name) for name in MessageRow._fields)
+    # Окно новейших партиций, в котором сначала ищется страница истории.
+    recent_window = (
+        timedelta(days=settings.message_recent_window_days)
+        if settings.message_partitioning and settings.message_recent_window_days
+        else None
+    )
+    # Колонка tsvector есть только в PostgreSQL (миграция), в ORM-модели ее нет.
+    search_vector = column("search_vector", TSVECTOR)
+    search_config = settings.search_config
 
     def __init__(self, session: AsyncSession):
         """
@@ -20,38 +42,439 @@ class MessageRepository:
         """
         self.session = session
 
-    async def send_message(self, chat_id: int, text: str) -> MessageModels:
+    @staticmethod
+    def _chat_activity(last_id, last_at, count) -> dict:
+        """
+        Значения UPDATE chat после вставки count сообщений, последнее из которых (last_id, last_at).
+
+        Последнее сообщение меняется, только если новое не старше текущего:
+        транзакции, начатые раньше (now() — время начала транзакции), могут
+        закоммититься позже.
+        """
+        newer = ChatModels.last_message_at <= last_at
+        return {
+            "message_count": ChatModels.message_count + count,
+            "last_message_id": case((newer, last_id), else_=ChatModels.last_message_id),
+            "last_message_at": case((newer, last_at), else_=ChatModels.last_message_at),
+        }
+
+    @staticmethod
+    def uncount_messages(chat_id: int, deleted: int) -> Update:
+        """
+        UPDATE chat после удаления deleted сообщений чата.
+
+        Счетчик уменьшается, а последнее сообщение пересчитывается по новейшему
+        из оставшихся (по индексу chat_id, created_at, id): удаленным могло
+        оказаться и оно. Если сообщений не осталось, последней активностью
+        становится время создания чата.
+        """
+        newest = (
+            select(MessageModels.id, MessageModels.created_at)
+            .where(MessageModels.chat_id == chat_id)
+            .order_by(MessageModels.created_at.desc(), MessageModels.id.desc())
+            .limit(1)
+            .subquery("newest")
+        )
+        return (
+            update(ChatModels)
+            .where(ChatModels.id == chat_id)
+            .values(
+                message_count=ChatModels.message_count - deleted,
+                last_message_id=select(newest.c.id).scalar_subquery(),
+                last_message_at=func.coalesce(select(newest.c.created_at).scalar_subquery(), ChatModels.created_at),
+            )
+        )
+
+    async def send_message(self, chat_id: int, text: str) -> MessageRow:
         """
         Создать и сохранить сообщение в чате.
 
+        Выполняется одним запросом без предварительной проверки существования
+        чата (ее выполняет внешний ключ): INSERT ... RETURNING в CTE и UPDATE
+        счетчика и последнего сообщения чата в одном запросе.
+        Запрос использует data-modifying CTE и рассчитан на PostgreSQL.
+
         Args:
             chat_id (int): ID чата.
             text (str): Текст сообщения.
 
         Returns:
-            MessageModels: Созданное сообщение.
+            MessageRow: Созданное сообщение.
+
+        Raises:
+            ChatNotFoundError: Если чат с указанным ID не существует.
         """
-        message = self.model(chat_id=chat_id, text=text)
-        self.session.add(message)
-        await self.session.commit()
+        inserted = insert(self.model).values(chat_id=chat_id, text=text).returning(*self.row_columns).cte("inserted")
+        query = (
+            update(ChatModels)
+            .where(ChatModels.id == inserted.c.chat_id)
+            .values(self._chat_activity(inserted.c.id, inserted.c.created_at, 1))
+            .returning(*inserted.c)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            message = MessageRow._make((await self.session.execute(query)).one())
+        except IntegrityError as e:
+            if is_foreign_key_violation(e):
+                raise ChatNotFoundError(chat_id) from e
+            raise
         return message
 
-    async def get_last_messages(self, chat_id: int, limit: int) -> list[MessageModels]:
+    async def send_messages(self, chat_id: int, texts: list[str]) -> list[Row]:
         """
-        Получить последние сообщения чата.
+        Сохранить пачку сообщений в чате.
+
+        Вставка выполняется многострочными INSERT ... RETURNING
+        (insertmanyvalues), порядок возвращаемых строк совпадает с порядком texts.
+        Счетчик и последнее сообщение чата обновляются вторым запросом.
 
         Args:
             chat_id (int): ID чата.
-            limit (int): Максимальное количество сообщений.
+            texts (list[str]): Тексты сообщений.
+
+        Returns:
+            list[Row]: Строки (id, created_at) созданных сообщений.
+
+        Raises:
+            ChatNotFoundError: Если чат с указанным ID не существует.
+        """
+        query = insert(self.model).returning(self.model.id, self.model.created_at, sort_by_parameter_order=True)
+        try:
+            result = await self.session.execute(query, [{"chat_id": chat_id, "text": text} for text in texts])
+            rows = list(result.all())
+            await self.session.execute(
+                update(ChatModels)
+                .where(ChatModels.id == chat_id)
+                .values(self._chat_activity(rows[-1].id, rows[-1].created_at, len(rows)))
+            )
+        except IntegrityError as e:
+            if is_foreign_key_violation(e):
+                raise ChatNotFoundError(chat_id) from e
+            raise
+        return rows
+
+    async def send_to_chats(self, messages: list[tuple[int, str]]) -> list[MessageRow | None]:
+        """
+        Сохранить сообщения разных чатов (пачка группового коммита).
+
+        Чаты пачки блокируются FOR KEY SHARE в порядке id: удалить их до
+        конца транзакции нельзя, а сообщения несуществующих чатов отбрасываются
+        заранее и не откатывают остальные. Затем один многострочный
+        INSERT ... RETURNING и UPDATE счетчиков чатов (executemany).
+
+        Args:
+            messages (list[tuple[int, str]]): Пары (chat_id, text).
 
         Returns:
-            list[MessageModels]: Список сообщений, отсортированных по убыванию created_at.
+            list[MessageRow | None]: Созданные сообщения в порядке messages;
+                None для сообщений в несуществующие чаты.
+        """
+        chat_ids = sorted({chat_id for chat_id, _ in messages})
+        lock = (
+            select(ChatModels.id)
+            .where(ChatModels.id.in_(chat_ids))
+            .order_by(ChatModels.id)
+            .with_for_update(key_share=True)
+        )
+        existing = set(await self.session.scalars(lock))
+        accepted = [{"chat_id": chat_id, "text": text} for chat_id, text in messages if chat_id in existing]
+        if not accepted:
+            return [None] * len(messages)
+        query = insert(self.model).returning(*self.row_columns, sort_by_parameter_order=True)
+        rows = [MessageRow._make(row) for row in await self.session.execute(query, accepted)]
+        latest: dict[int, MessageRow] = {}
+        counts: dict[int, int] = {}
+        for row in rows:
+            latest[row.chat_id] = row
+            counts[row.chat_id] = counts.get(row.chat_id, 0) + 1
+        chat = ChatModels.__table__
+        activity = (
+            update(chat)
+            .where(chat.c.id == bindparam("activity_chat_id"))
+            .values(self._chat_activity(
+                bindparam("activity_last_id", type_=chat.c.last_message_id.type),
+                bindparam("activity_last_at", type_=chat.c.last_message_at.type),
+                bindparam("activity_count", type_=chat.c.message_count.type),
+            ))
+        )
+        await self.session.execute(activity, [
+            {
+                "activity_chat_id": chat_id,
+                "activity_last_id": row.id,
+                "activity_last_at": row.created_at,
+                "activity_count": counts[chat_id],
+            }
+            for chat_id, row in sorted(latest.items())
+        ])
+        created = iter(rows)
+        return [next(created) if chat_id in existing else None for chat_id, _ in messages]
+
+    async def import_messages(self, chat_id: int, messages: list[dict]) -> int:
+        """
+        Загрузить пачку сообщений с заданным временем создания (восстановление из архива).
+
+        Вставка без RETURNING многострочными INSERT, затем обновление
+        счетчика и последнего сообщения чата.
+
+        Args:
+            chat_id (int): ID чата.
+            messages (list[dict]): Сообщения с ключами text и created_at.
+
+        Returns:
+            int: Количество вставленных сообщений.
+        """
+        await self.session.execute(
+            insert(self.model),
+            [{"chat_id": chat_id, "text": m["text"], "created_at": m["created_at"]} for m in messages],
+        )
+        latest = (
+            select(self.model.id, self.model.created_at)
+            .where(self.model.chat_id == chat_id)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .limit(1)
+            .subquery()
+        )
+        activity = self._chat_activity(
+            select(latest.c.id).scalar_subquery(),
+            select(latest.c.created_at).scalar_subquery(),
+            len(messages),
+        )
+        await self.session.execute(update(ChatModels).where(ChatModels.id == chat_id).values(activity))
+        return len(messages)
+
+    async def stream_messages(self, chat_id: int, batch_size: int) -> AsyncIterator[list[MessageRow]]:
+        """
+        Прочитать все сообщения чата порциями через серверный курсор.
+
+        Строки забираются из БД по batch_size (yield_per), поэтому память
+        не зависит от размера чата. Сессия держит транзакцию, пока идет чтение.
+
+        Args:
+            chat_id (int): ID чата.
+            batch_size (int): Размер порции.
+
+        Yields:
+            list[MessageRow]: Порция сообщений по возрастанию (created_at, id).
         """
         query = (
-            select(self.model)
+            select(*self.row_columns)
             .where(self.model.chat_id == chat_id)
-            .order_by(self.model.created_at.desc())
-            .limit(limit)
+            .order_by(self.model.created_at.asc(), self.model.id.asc())
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        async for partition in result.partitions():
+            yield [MessageRow._make(row) for row in partition]
+
+    async def get_last_messages(
+        self,
+        chat_id: int,
+        limit: int,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
+    ) -> list[MessageRow]:
+        """
+        Получить последние сообщения чата (keyset-пагинация по (created_at, id)).
+
+        Запрос обслуживается индексом ix_message_chat_id_created_at_id,
+        поэтому стоимость страницы не зависит от ее глубины. Выбираются
+        только колонки: ORM-объекты не создаются и не попадают в identity map.
+        Если таблица секционирована, страница сначала ищется в окне
+        recent_window (PostgreSQL отсекает старые партиции), а старше окна —
+        только когда сообщений не хватило.
+
+        Args:
+            chat_id (int): ID чата.
+            limit (int): Максимальное количество сообщений.
+            before (MessageCursor | None): Вернуть сообщения старше курсора.
+            after (MessageCursor | None): Вернуть сообщения новее курсора.
+
+        Returns:
+            list[MessageRow]: Список сообщений, отсортированных по убыванию created_at.
+        """
+        query = self._page_query(chat_id, limit, before, after)
+        since = self._recent_since(before, after)
+        if since is not None:
+            query = query.where(self.model.created_at >= since)
+        res = await self.session.execute(query)
+        if after is not None:
+            return [MessageRow._make(row) for row in reversed(res.all())]
+        messages = [MessageRow._make(row) for row in res]
+        if since is not None and len(messages) < limit:
+            messages += await self._older_messages(chat_id, limit - len(messages), before, since)
+        return messages
+
+    def _recent_since(self, before: MessageCursor | None, after: MessageCursor | None) -> datetime | None:
+        """Нижняя граница окна recent_window для страницы (None — окно не применяется)."""
+        if self.recent_window is None or after is not None:
+            return None
+        newest = before.created_at if before is not None else datetime.now(timezone.utc)
+        return newest - self.recent_window
+
+    async def _older_messages(
+        self,
+        chat_id: int,
+        limit: int,
+        before: MessageCursor | None,
+        since: datetime,
+    ) -> list[MessageRow]:
+        """Дочитать страницу сообщениями старше окна since."""
+        query = self._page_query(chat_id, limit, before, None).where(self.model.created_at < since)
+        return [MessageRow._make(row) for row in await self.session.execute(query)]
+
+    def _page_query(
+        self,
+        chat_id: int,
+        limit: int,
+        before: MessageCursor | None,
+        after: MessageCursor | None,
+    ) -> Select:
+        """
+        Запрос страницы сообщений по курсору.
+
+        Страница после курсора after выбирается по возрастанию (ближайшие
+        к курсору сообщения), остальные — по убыванию (created_at, id).
+        """
+        key = tuple_(self.model.created_at, self.model.id)
+        query = select(*self.row_columns).where(self.model.chat_id == chat_id)
+        if before is not None:
+            query = query.where(key < tuple_(before.created_at, before.id))
+        if after is not None:
+            return (
+                query
+                .where(key > tuple_(after.created_at, after.id))
+                .order_by(self.model.created_at.asc(), self.model.id.asc())
+                .limit(limit)
+            )
+        return query.order_by(self.model.created_at.desc(), self.model.id.desc()).limit(limit)
+
+    async def get_chat_page(
+        self,
+        chat_id: int,
+        limit: int,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
+    ) -> tuple[ChatRow, list[MessageRow]] | None:
+        """
+        Получить заголовок чата и страницу его сообщений одним запросом.
+
+        Страница сообщений (как в get_last_messages) присоединяется к строке
+        чата через LEFT JOIN ... ON true, поэтому чат без сообщений дает одну
+        строку с пустыми колонками сообщения, а несуществующий чат — ни одной.
+        Сообщения старше окна recent_window дочитываются вторым запросом,
+        только если их не хватило на страницу.
+
+        Args:
+            chat_id (int): ID чата.
+            limit (int): Максимальное количество сообщений.
+            before (MessageCursor | None): Вернуть сообщения старше курсора.
+            after (MessageCursor | None): Вернуть сообщения новее курсора.
+
+        Returns:
+            tuple | None: (ChatRow, list[MessageRow]) — чат и сообщения по убыванию
+                created_at, или None, если чат не найден.
+        """
+        page_query = self._page_query(chat_id, limit, before, after)
+        since = self._recent_since(before, after)
+        if since is not None:
+            page_query = page_query.where(self.model.created_at >= since)
+        page = page_query.subquery("page")
+        query = (
+            select(ChatModels.id, ChatModels.title, ChatModels.created_at, *page.c)
+            .select_from(ChatModels)
+            .outerjoin(page, true())
+            .where(ChatModels.id == chat_id)
+            .order_by(page.c.created_at.desc(), page.c.id.desc())
+        )
+        rows = (await self.session.execute(query)).all()
+        if not rows:
+            return None
+        chat = ChatRow._make(rows[0][:3])
+        messages = [MessageRow._make(row[3:]) for row in rows if row[3] is not None]
+        if since is not None and len(messages) < limit:
+            messages += await self._older_messages(chat_id, limit - len(messages), before, since)
+        return chat, messages
+
+    async def search(
+        self,
+        q: str,
+        limit: int,
+        chat_id: int | None = None,
+        cursor: SearchCursor | None = None,
+    ) -> list[SearchHit]:
+        """
+        Полнотекстовый поиск сообщений по всем чатам или в одном чате.
+
+        Запрос разбирается websearch_to_tsquery и ищется по GIN-индексу
+        колонки search_vector, результаты ранжируются ts_rank и листаются
+        keyset-пагинацией по (rank, id). Фрагменты ts_headline строятся только
+        для выданной страницы.
+
+        Args:
+            q (str): Поисковый запрос.
+            limit (int): Максимальное количество результатов.
+            chat_id (int | None): Искать только в этом чате.
+            cursor (SearchCursor | None): Вернуть результаты после курсора.
+
+        Returns:
+            list[SearchHit]: Результаты по убыванию (rank, id).
+        """
+        ts_query = func.websearch_to_tsquery(cast(self.search_config, REGCONFIG), q)
+        rank = func.ts_rank(self.search_vector, ts_query)
+        query = select(*self.row_columns, rank.label("rank")).where(self.search_vector.bool_op("@@")(ts_query))
+        if chat_id is not None:
+            query = query.where(self.model.chat_id == chat_id)
+        if cursor is not None:
+            query = query.where(tuple_(rank, self.model.id) < tuple_(cursor.rank, cursor.id))
+        page = query.order_by(rank.desc(), self.model.id.desc()).limit(limit).subquery("page")
+        snippet = func.ts_headline(cast(self.search_config, REGCONFIG), page.c.text, ts_query)
+        res = await self.session.execute(
+            select(*page.c, snippet).order_by(page.c.rank.desc(), page.c.id.desc())
+        )
+        return [SearchHit._make(row) for row in res]
+
+    async def get_messages_by_ids(self, ids: list[int]) -> list[MessageRow]:
+        """
+        Получить сообщения по списку ID.
+
+        Args:
+            ids (list[int]): ID сообщений.
+
+        Returns:
+            list[MessageRow]: Найденные сообщения по возрастанию (created_at, id).
+        """
+        query = (
+            select(*self.row_columns)
+            .where(self.model.id.in_(ids))
+            .order_by(self.model.created_at.asc(), self.model.id.asc())
         )
         res = await self.session.execute(query)
-        return list(res.scalars().all())
+        return [MessageRow._make(row) for row in res]
+
+    async def delete_messages_batch(self, chat_id: int, batch_size: int) -> int:
+        """
+        Удалить очередную порцию сообщений чата (вместе с уменьшением
+        счетчика и пересчетом последнего сообщения чата).
+
+        Args:
+            chat_id (int): ID чата.
+            batch_size (int): Максимальное количество сообщений за один вызов.
+
+        Returns:
+            int: Количество удаленных сообщений (0, если сообщений не осталось).
+        """
+        batch = (
+            select(self.model.id)
+            .where(self.model.chat_id == chat_id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        query = (
+            delete(self.model)
+            .where(self.model.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        deleted = (await self.session.execute(query)).rowcount
+        if deleted:
+            await self.session.execute(self.uncount_messages(chat_id, deleted))
+        return deleted
@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import NamedTuple
+
+
+class ChatRow(NamedTuple):
+    """
+    Чат, прочитанный без ORM: неизменяемая строка из колонок таблицы `chat`.
+
+    Attributes:
+        id (int): ID чата.
+        title (str): Название чата.
+        created_at (datetime): Дата и время создания.
+    """
+    id: int
+    title: str
+    created_at: datetime
+
+
+class ChatSummaryRow(NamedTuple):
+    """
+    Чат в списке чатов: строка `chat` вместе с денормализованной активностью.
+
+    Attributes:
+        id (int): ID чата.
+        title (str): Название чата.
+        created_at (datetime): Дата и время создания.
+        last_message_at (datetime): Время последнего сообщения (время создания,
+            если сообщений еще не было).
+        last_message_id (int | None): ID последнего сообщения.
+        message_count (int): Количество сообщений в чате.
+    """
+    id: int
+    title: str
+    created_at: datetime
+    last_message_at: datetime
+    last_message_id: int | None
+    message_count: int
+
+
+class ChatVersionRow(NamedTuple):
+    """
+    Версия истории чата: меняется при каждой вставке и удалении сообщений.
+
+    Attributes:
+        last_message_id (int | None): ID последнего сообщения.
+        message_count (int): Количество сообщений в чате.
+    """
+    last_message_id: int | None
+    message_count: int
+
+
+class MessageRow(NamedTuple):
+    """
+    Сообщение, прочитанное без ORM: неизменяемая строка из колонок таблицы `message`.
+
+    Поля идут в порядке MessageResponseSchema, поэтому строку можно
+    сериализовать позиционно.
+
+    Attributes:
+        id (int): ID сообщения.
+        chat_id (int): ID чата.
+        text (str): Текст сообщения.
+        created_at (datetime): Дата и время создания.
+    """
+    id: int
+    chat_id: int
+    text: str
+    created_at: datetime
+
+    @classmethod
+    def from_message(cls, message) -> "MessageRow":
+        """Строка из любого объекта с полями сообщения (например, ORM-модели)."""
+        return cls(message.id, message.chat_id, message.text, message.created_at)
+
+
+class SearchHit(NamedTuple):
+    """
+    Сообщение, найденное полнотекстовым поиском.
+
+    Attributes:
+        id (int): ID сообщения.
+        chat_id (int): ID чата.
+        text (str): Текст сообщения.
+        created_at (datetime): Дата и время создания.
+        rank (float): Релевантность (больше — выше в выдаче).
+        snippet (str): Фрагмент текста с найденными словами в <b>...</b>.
+    """
+    id: int
+    chat_id: int
+    text: str
+    created_at: datetime
+    rank: float
+    snippet: str
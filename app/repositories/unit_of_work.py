@@ -0,0 +1,66 @@
+from typing import AsyncContextManager, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.chats import ChatRepository
+from app.repositories.messages import MessageRepository
+
+
+class UnitOfWork:
+    """
+    Единица работы: сессия и одна транзакция на операцию use case.
+
+    Репозитории сами не коммитят: вызовы внутри `async with uow` попадают
+    в одну транзакцию, которая фиксируется при выходе без ошибки
+    и откатывается при исключении. Операции, сознательно разбитые
+    на короткие транзакции (удаление и импорт порциями), фиксируют
+    каждую порцию через commit().
+
+    Сессия открывается только при входе в `async with`, поэтому запрос,
+    обслуженный из кэша, не берет соединение из пула. В режиме только
+    для чтения транзакция не фиксируется: COMMIT не отправляется,
+    сессия закрывается с откатом.
+
+    Attributes:
+        open_session (Callable): Фабрика сессии: async_sessionmaker или
+            функция, возвращающая асинхронный контекстный менеджер сессии
+            (например, Database.session).
+        read_only (bool): Только чтение, commit() запрещен.
+        session (AsyncSession | None): Сессия внутри `async with`.
+        chats (ChatRepository): Репозиторий чатов этой сессии.
+        messages (MessageRepository): Репозиторий сообщений этой сессии.
+    """
+
+    def __init__(self, open_session: Callable[[], AsyncContextManager[AsyncSession]], read_only: bool = False):
+        self.open_session = open_session
+        self.read_only = read_only
+        self.session: AsyncSession | None = None
+        self._context: AsyncContextManager[AsyncSession] | None = None
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._context = self.open_session()
+        self.session = await self._context.__aenter__()
+        self.chats = ChatRepository(self.session)
+        self.messages = MessageRepository(self.session)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is not None:
+                await self.session.rollback()
+            elif not self.read_only:
+                await self.session.commit()
+        finally:
+            context, self._context, self.session = self._context, None, None
+            await context.__aexit__(exc_type, exc, tb)
+
+    async def commit(self) -> None:
+        """
+        Зафиксировать изменения, сделанные с начала транзакции.
+
+        Raises:
+            RuntimeError: Если единица работы только для чтения.
+        """
+        if self.read_only:
+            raise RuntimeError("read-only unit of work cannot commit")
+        await self.session.commit()
@@ -0,0 +1,154 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.database.db import db
+from app.logs.logger import logger
+from app.repositories.exceptions import ChatNotFoundError
+from app.repositories.rows import MessageRow
+from app.repositories.unit_of_work import UnitOfWork
+
+
+class MessageWriteCoalescer:
+    """
+    Групповой коммит одиночных сообщений.
+
+    Сообщения, пришедшие из разных запросов в течение max_delay секунд
+    (или пока не набралось max_batch), сохраняются одной транзакцией
+    (MessageRepository.send_to_chats): вместо транзакции и сброса WAL
+    на каждое сообщение — одна на пачку. Каждый отправитель получает
+    свое сообщение (id, created_at) или свою ошибку: сообщения
+    в несуществующие чаты завершаются ChatNotFoundError, а если пачка
+    не сохранилась целиком, ее сообщения сохраняются по одному.
+
+    Одновременно пишется не больше max_inflight пачек, пока они пишутся,
+    следующая пачка копится.
+
+    Attributes:
+        session_factory (async_sessionmaker): Фабрика сессий основной БД.
+        max_delay (float): Сколько секунд копить пачку после первого сообщения.
+        max_batch (int): Максимальный размер пачки.
+        max_inflight (int): Сколько пачек может писаться одновременно.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_delay: float,
+        max_batch: int,
+        max_inflight: int = 4,
+    ):
+        self.session_factory = session_factory
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending: list[tuple[int, str, asyncio.Future]] = []
+        self._full: asyncio.Event | None = None
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._flusher: asyncio.Task | None = None
+        self._writes: set[asyncio.Task] = set()
+        self._closing = False
+        self.batches = 0
+        self.messages = 0
+        self.fallbacks = 0
+
+    async def send(self, chat_id: int, text: str) -> MessageRow:
+        """
+        Сохранить сообщение в ближайшей пачке.
+
+        Args:
+            chat_id (int): ID чата.
+            text (str): Текст сообщения.
+
+        Returns:
+            MessageRow: Созданное сообщение.
+
+        Raises:
+            ChatNotFoundError: Если чат с указанным ID не существует.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((chat_id, text, future))
+        if len(self._pending) >= self.max_batch and self._full is not None:
+            self._full.set()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush())
+        return await future
+
+    async def close(self) -> None:
+        """Сохранить накопленные сообщения и дождаться записи пачек."""
+        self._closing = True
+        if self._full is not None:
+            self._full.set()
+        if self._flusher is not None:
+            await self._flusher
+        if self._writes:
+            await asyncio.gather(*self._writes)
+
+    async def _flush(self) -> None:
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_batch and not self._closing:
+                    self._full = asyncio.Event()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.max_delay)
+                    except TimeoutError:
+                        pass
+                await self._slots.acquire()
+                batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+                task = asyncio.create_task(self._write(batch))
+                self._writes.add(task)
+                task.add_done_callback(self._writes.discard)
+        finally:
+            self._flusher = None
+
+    async def _write(self, batch: list[tuple[int, str, asyncio.Future]]) -> None:
+        try:
+            try:
+                async with UnitOfWork(self.session_factory) as uow:
+                    rows = await uow.messages.send_to_chats([(c, t) for c, t, _ in batch])
+            except Exception as e:
+                self.fallbacks += 1
+                logger.warning("Пачка из %s сообщений не сохранена (%s), сохранение по одному", len(batch), e)
+                await self._write_each(batch)
+                return
+            self.batches += 1
+            self.messages += sum(row is not None for row in rows)
+            for (chat_id, _, future), row in zip(batch, rows):
+                if future.done():
+                    continue
+                if row is None:
+                    future.set_exception(ChatNotFoundError(chat_id))
+                else:
+                    future.set_result(row)
+        finally:
+            self._slots.release()
+
+    async def _write_each(self, batch: list[tuple[int, str, asyncio.Future]]) -> None:
+        """Сохранить сообщения пачки по одному, ошибка достается только своему отправителю."""
+        for chat_id, text, future in batch:
+            try:
+                async with UnitOfWork(self.session_factory) as uow:
+                    row = await uow.messages.send_message(chat_id, text)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.messages += 1
+            if not future.done():
+                future.set_result(row)
+
+    def stats(self) -> dict:
+        """Записанные пачки и сообщения, средний размер пачки, откаты на запись по одному."""
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "avg_batch": round(self.messages / self.batches, 1) if self.batches else 0,
+            "fallbacks": self.fallbacks,
+        }
+
+
+message_write_coalescer = MessageWriteCoalescer(
+    session_factory=db.session_factory,
+    max_delay=settings.write_coalesce_max_delay,
+    max_batch=settings.write_coalesce_max_batch,
+) if settings.write_coalescing else None
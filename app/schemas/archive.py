@@ -0,0 +1,65 @@
+"""Формат архива чата: gzip-сжатый NDJSON.
+
+Первая строка — заголовок {"format": ..., "chat": {"id", "title", "created_at"}},
+далее по строке на сообщение {"id", "text", "created_at"} по возрастанию
+(created_at, id). Даты в ISO 8601 с Z для UTC, как в ответах API.
+Строки независимы, поэтому архив пишется и читается потоково."""
+from datetime import datetime
+
+import orjson
+
+from app.repositories.rows import ChatRow, MessageRow
+from app.schemas.encoders import JSON_OPTIONS
+
+ARCHIVE_FORMAT = "chatapi-archive/1"
+LINE_OPTIONS = JSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+
+
+def encode_header(chat: ChatRow) -> bytes:
+    """Строка заголовка архива для чата."""
+    return orjson.dumps({"format": ARCHIVE_FORMAT, "chat": chat._asdict()}, option=LINE_OPTIONS)
+
+
+def encode_messages(messages: list[MessageRow]) -> bytes:
+    """Строки архива для порции сообщений."""
+    return b"".join(
+        orjson.dumps({"id": m.id, "text": m.text, "created_at": m.created_at}, option=LINE_OPTIONS)
+        for m in messages
+    )
+
+
+def decode_header(line: bytes) -> dict:
+    """
+    Разобрать заголовок архива.
+
+    Returns:
+        dict: Чат архива с ключами id, title и created_at (datetime).
+
+    Raises:
+        ValueError: Если строка не является заголовком архива этого формата.
+    """
+    try:
+        header = orjson.loads(line)
+        if header["format"] != ARCHIVE_FORMAT:
+            raise ValueError(f"unsupported archive format: {header['format']!r}")
+        chat = header["chat"]
+        return {"id": chat["id"], "title": chat["title"], "created_at": datetime.fromisoformat(chat["created_at"])}
+    except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("invalid archive header") from e
+
+
+def decode_message(line: bytes) -> dict:
+    """
+    Разобрать строку сообщения архива.
+
+    Returns:
+        dict: Сообщение с ключами text и created_at (datetime).
+
+    Raises:
+        ValueError: Если строка не является сообщением архива.
+    """
+    try:
+        message = orjson.loads(line)
+        return {"text": message["text"], "created_at": datetime.fromisoformat(message["created_at"])}
+    except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("invalid archive line") from e
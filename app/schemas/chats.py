@@ -16,3 +16,10 @@ class ChatSchemas(BaseModel):
 class ChatWithMessagesSchema(BaseModel):
     id: int
     limit: int = Field(20, ge=20, le=100)
+    before: str | None = None
+    after: str | None = None
+
+
+class ChatListSchema(BaseModel):
+    limit: int = Field(20, ge=1, le=100)
+    cursor: str | None = None
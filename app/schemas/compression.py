@@ -0,0 +1,78 @@
+"""Сжатие ответов по Accept-Encoding: zstd (если установлен zstandard) и gzip.
+
+Тела меньше порога отдаются как есть: заголовки и кадр сжатия съели бы
+выигрыш. Большие тела сжимаются в пуле потоков (asyncio.to_thread),
+чтобы не останавливать цикл событий; zlib и zstandard отпускают GIL."""
+import asyncio
+import gzip
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from app.config import settings
+
+GZIP = "gzip"
+ZSTD = "zstd"
+# В порядке предпочтения при равном q.
+AVAILABLE_ENCODINGS = (ZSTD, GZIP) if zstandard is not None else (GZIP,)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Выбрать сжатие по заголовку Accept-Encoding.
+
+    Args:
+        accept_encoding (str | None): Значение заголовка, например "gzip, zstd;q=0.9".
+
+    Returns:
+        str | None: zstd или gzip; None, если клиент не принимает ни одно из них.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in AVAILABLE_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Сжать тело ответа (синхронно)."""
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=settings.compression_zstd_level).compress(body)
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+async def compress_body(body: bytes, encoding: str | None) -> tuple[bytes, str | None]:
+    """
+    Сжать тело ответа, если клиент это принимает и тело не меньше порога.
+
+    Тела от compression_thread_min_size байт сжимаются в пуле потоков.
+
+    Args:
+        body (bytes): Тело ответа.
+        encoding (str | None): Результат negotiate_encoding.
+
+    Returns:
+        tuple: (тело, Content-Encoding или None, если тело не сжато).
+    """
+    if encoding is None or not settings.response_compression or len(body) < settings.compression_min_size:
+        return body, None
+    if len(body) >= settings.compression_thread_min_size:
+        return await asyncio.to_thread(compress, body, encoding), encoding
+    return compress(body, encoding), encoding
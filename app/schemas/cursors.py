@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class MessageCursor(BaseModel):
+    """
+    Курсор keyset-пагинации по истории сообщений.
+
+    Указывает на позицию (created_at, id) сообщения. Клиенту передается
+    в виде непрозрачной строки (base64url от JSON).
+
+    Attributes:
+        created_at (datetime): Время создания сообщения.
+        id (int): ID сообщения, разрешает совпадения по created_at.
+    """
+    created_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        """Закодировать курсор в непрозрачную строку."""
+        raw = json.dumps([self.created_at.isoformat(), self.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "MessageCursor":
+        """
+        Раскодировать курсор из строки.
+
+        Raises:
+            ValueError: Если строка не является корректным курсором.
+        """
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(created_at=created_at, id=id)
+        except Exception as e:
+            raise ValueError(f"invalid cursor: {value!r}") from e
+
+    @classmethod
+    def from_message(cls, message) -> "MessageCursor":
+        """Построить курсор по сообщению (любой объект с created_at и id)."""
+        return cls(created_at=message.created_at, id=message.id)
+
+
+class SearchCursor(BaseModel):
+    """
+    Курсор keyset-пагинации результатов поиска.
+
+    Указывает на позицию (rank, id) последнего выданного результата.
+
+    Attributes:
+        rank (float): Релевантность результата.
+        id (int): ID сообщения, разрешает совпадения по rank.
+    """
+    rank: float
+    id: int
+
+    def encode(self) -> str:
+        """Закодировать курсор в непрозрачную строку."""
+        raw = json.dumps([self.rank, self.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "SearchCursor":
+        """
+        Раскодировать курсор из строки.
+
+        Raises:
+            ValueError: Если строка не является корректным курсором.
+        """
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            rank, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(rank=rank, id=id)
+        except Exception as e:
+            raise ValueError(f"invalid cursor: {value!r}") from e
+
+
+class ChatCursor(BaseModel):
+    """
+    Курсор keyset-пагинации списка чатов.
+
+    Указывает на позицию (last_message_at, id) последнего выданного чата.
+
+    Attributes:
+        last_message_at (datetime): Время последней активности чата.
+        id (int): ID чата, разрешает совпадения по last_message_at.
+    """
+    last_message_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        """Закодировать курсор в непрозрачную строку."""
+        raw = json.dumps([self.last_message_at.isoformat(), self.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "ChatCursor":
+        """
+        Раскодировать курсор из строки.
+
+        Raises:
+            ValueError: Если строка не является корректным курсором.
+        """
+        try:
+            padded = value + "=" * (-len(value) % 4)
+            last_message_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return cls(last_message_at=last_message_at, id=id)
+        except Exception as e:
+            raise ValueError(f"invalid cursor: {value!r}") from e
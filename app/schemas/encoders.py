@@ -0,0 +1,124 @@
+"""Быстрая сериализация ответов без повторной валидации Pydantic.
+
+Для горячих эндпоинтов ответ собирается из строк БД (или объектов кэша)
+в словари и сразу кодируется в JSON-байты orjson. Формат совпадает с тем,
+что выдают схемы из app.schemas.responses (те же поля в том же порядке,
+даты в ISO 8601 с Z для UTC), поэтому схемы остаются в response_model
+и описывают ответ в OpenAPI."""
+import orjson
+from fastapi import Response
+
+from app.repositories.rows import MessageRow
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def message_dict(message) -> dict:
+    """Сообщение (строка БД, ORM-объект или схема) в словарь MessageResponseSchema."""
+    if isinstance(message, MessageRow):
+        return message._asdict()
+    return {
+        "id": message.id,
+        "chat_id": message.chat_id,
+        "text": message.text,
+        "created_at": message.created_at,
+    }
+
+
+def encode_chat_page(chat, messages: list, next_cursor: str | None, prev_cursor: str | None) -> bytes:
+    """
+    Закодировать страницу истории в JSON по схеме ChatWithMessagesResponseSchema.
+
+    Args:
+        chat: Чат (объект с id, title, created_at).
+        messages (list): Сообщения от новых к старым.
+        next_cursor (str | None): Курсор более старой страницы.
+        prev_cursor (str | None): Курсор более новой страницы.
+
+    Returns:
+        bytes: JSON-представление страницы.
+    """
+    return orjson.dumps(
+        {
+            "id": chat.id,
+            "title": chat.title,
+            "created_at": chat.created_at,
+            "messages": [message_dict(message) for message in messages],
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        },
+        option=JSON_OPTIONS,
+    )
+
+
+def chat_page_etag(chat_id: int, limit: int, newest_id: int | None, size: int) -> str:
+    """
+    Сильный ETag первой страницы истории чата.
+
+    Новые сообщения меняют новейшее сообщение, а удаление (порциями от старых
+    сообщений или всей истории) — размер страницы, если сообщений в чате
+    не больше limit. Поэтому пара (новейшее сообщение, размер) вместе
+    с ID чата и limit однозначно определяет содержимое страницы.
+
+    Args:
+        chat_id (int): ID чата.
+        limit (int): Размер запрошенной страницы.
+        newest_id (int | None): ID новейшего сообщения.
+        size (int): Количество сообщений на странице.
+
+    Returns:
+        str: Значение заголовка ETag (в кавычках).
+    """
+    return f'"{chat_id}.{newest_id if size else 0}.{size}.{limit}"'
+
+
+def representation_etag(etag: str, content_encoding: str | None) -> str:
+    """ETag сжатого представления страницы: сильные ETag разных представлений должны различаться."""
+    return etag if content_encoding is None else f'{etag[:-1]}+{content_encoding}"'
+
+
+def page_headers(etag: str | None, content_encoding: str | None) -> dict:
+    """
+    Заголовки ответа со страницей истории.
+
+    Args:
+        etag (str | None): ETag страницы (None — страница по курсору, без ETag).
+        content_encoding (str | None): Сжатие тела (None — без сжатия).
+
+    Returns:
+        dict: Vary, а также ETag представления и Content-Encoding, если заданы.
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+    if etag is not None:
+        headers["ETag"] = representation_etag(etag, content_encoding)
+    return headers
+
+
+def match_etag(if_none_match: str, etag: str) -> str | None:
+    """
+    Найти в If-None-Match ETag текущей страницы (слабое сравнение, RFC 9110).
+
+    Представления страницы с разным сжатием (см. representation_etag)
+    считаются совпадающими: клиенту отвечают 304 с тем ETag, который он прислал.
+
+    Args:
+        if_none_match (str): Значение заголовка: "*" или список ETag через запятую.
+        etag (str): Текущий ETag страницы.
+
+    Returns:
+        str | None: Совпавший ETag клиента или None, если клиенту нужно отдать страницу.
+    """
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag.split("+")[0].rstrip('"') + '"' == etag:
+            return tag
+    return None
+
+
+class JSONBytesResponse(Response):
+    """Ответ с уже закодированным JSON (тело передается как есть)."""
+    media_type = "application/json"
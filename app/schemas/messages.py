@@ -1,6 +1,17 @@
 from pydantic import BaseModel, Field
 
+MESSAGE_BATCH_MAX_SIZE = 5000
+
 
 class MessageSchemas(BaseModel):
     text: str = Field(..., min_length=1, max_length=5000)
 
+
+class MessageBatchSchemas(BaseModel):
+    messages: list[MessageSchemas] = Field(..., min_length=1, max_length=MESSAGE_BATCH_MAX_SIZE)
+
+
+class MessageSearchSchema(BaseModel):
+    q: str = Field(..., min_length=1, max_length=200)
+    limit: int = Field(20, ge=1, le=100)
+    cursor: str | None = None
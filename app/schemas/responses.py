@@ -12,6 +12,17 @@ class ChatResponseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ChatSummaryResponseSchema(ChatResponseSchema):
+    last_message_at: datetime
+    last_message_id: int | None = None
+    message_count: int
+
+
+class ChatListResponseSchema(BaseModel):
+    chats: List[ChatSummaryResponseSchema]
+    next_cursor: str | None = None
+
+
 class MessageResponseSchema(BaseModel):
     id: int
     chat_id: int
@@ -21,5 +32,22 @@ class MessageResponseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MessageBatchResponseSchema(BaseModel):
+    chat_id: int
+    ids: List[int]
+
+
 class ChatWithMessagesResponseSchema(ChatResponseSchema):
     messages: List[MessageResponseSchema]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class MessageSearchHitSchema(MessageResponseSchema):
+    rank: float
+    snippet: str
+
+
+class MessageSearchResponseSchema(BaseModel):
+    messages: List[MessageSearchHitSchema]
+    next_cursor: str | None = None
@@ -0,0 +1,218 @@
+import time
+import zlib
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette import status
+
+from app.logs.logger import logger
+from app.repositories.chats import ChatRepository
+from app.repositories.messages import MessageRepository
+from app.repositories.rows import ChatRow
+from app.repositories.unit_of_work import UnitOfWork
+from app.schemas.archive import decode_header, decode_message, encode_header, encode_messages
+
+GZIP_WBITS = 31
+MAX_INFLATE = 256 * 1024
+
+
+class ArchiveStats:
+    """Счетчики одного экспорта или импорта архива."""
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def finish(self) -> None:
+        """Зафиксировать длительность."""
+        self.seconds = time.perf_counter() - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec),
+        }
+
+
+class ExportChatUseCase:
+    """
+    UseCase для выгрузки чата в архив (gzip NDJSON, см. app.schemas.archive).
+
+    Сообщения читаются серверным курсором порциями по batch_size и сразу
+    сжимаются, поэтому память не зависит от размера чата.
+
+    Attributes:
+        session_factory (async_sessionmaker): Фабрика сессий для чтения
+            (сессия держится все время выгрузки).
+        batch_size (int): Размер порции сообщений.
+        level (int): Уровень сжатия gzip.
+    """
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int, level: int = 6):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.level = level
+
+    async def get_chat(self, id: int) -> ChatRow:
+        """
+        Найти выгружаемый чат.
+
+        Args:
+            id (int): ID чата.
+
+        Returns:
+            ChatRow: Чат.
+
+        Raises:
+            HTTPException 404: Если чат с указанным ID не найден.
+        """
+        async with self.session_factory() as session:
+            chat = await ChatRepository(session).get_chat(id)
+        if chat is None:
+            logger.warning("Чат с id=%s не найден", id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
+        return chat
+
+    async def export(self, chat: ChatRow, stats: ArchiveStats | None = None) -> AsyncIterator[bytes]:
+        """
+        Выгрузить чат в сжатый архив.
+
+        Args:
+            chat (ChatRow): Чат (из get_chat).
+            stats (ArchiveStats | None): Куда записать число строк, байт и скорость.
+
+        Yields:
+            bytes: Очередной фрагмент gzip-потока.
+        """
+        stats = stats or ArchiveStats()
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, GZIP_WBITS)
+        chunk = compressor.compress(encode_header(chat))
+        async with self.session_factory() as session:
+            async for messages in MessageRepository(session).stream_messages(chat.id, self.batch_size):
+                chunk += compressor.compress(encode_messages(messages))
+                stats.rows += len(messages)
+                if chunk:
+                    stats.bytes += len(chunk)
+                    yield chunk
+                    chunk = b""
+        chunk += compressor.flush()
+        stats.bytes += len(chunk)
+        yield chunk
+        stats.finish()
+        logger.info(
+            "Чат id=%s выгружен в архив: %s сообщений, %s байт за %.2f с (%.0f строк/с)",
+            chat.id, stats.rows, stats.bytes, stats.seconds, stats.rows_per_sec,
+        )
+
+
+class ImportChatUseCase:
+    """
+    UseCase для восстановления чата из архива (gzip NDJSON, см. app.schemas.archive).
+
+    Архив распаковывается и разбирается потоково; сообщения загружаются
+    пачками по batch_size, каждая пачка — отдельной короткой транзакцией.
+    Чат создается заново (новые ID, исходные title и created_at сохраняются);
+    если загрузка прервалась, созданный чат удаляется вместе с сообщениями.
+    В секционированную таблицу сообщения попадут, только если партиции
+    их месяцев существуют.
+
+    Attributes:
+        session_factory (async_sessionmaker): Фабрика сессий основной БД.
+        batch_size (int): Размер пачки вставляемых сообщений.
+    """
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    @staticmethod
+    async def lines(chunks: AsyncIterator[bytes], stats: ArchiveStats) -> AsyncIterator[bytes]:
+        """
+        Распаковать gzip-поток и разбить его на строки.
+
+        NDJSON сжимается в десятки раз, поэтому входной фрагмент распаковывается
+        частями не больше MAX_INFLATE байт.
+        """
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        tail = b""
+        async for chunk in chunks:
+            stats.bytes += len(chunk)
+            while chunk:
+                try:
+                    data = tail + decompressor.decompress(chunk, MAX_INFLATE)
+                except zlib.error as e:
+                    raise ValueError("archive is not a gzip stream") from e
+                chunk = decompressor.unconsumed_tail
+                *complete, tail = data.split(b"\n")
+                for line in complete:
+                    if line:
+                        yield line
+        if not decompressor.eof:
+            raise ValueError("archive is truncated")
+        tail += decompressor.flush()
+        for line in tail.split(b"\n"):
+            if line:
+                yield line
+
+    async def execute(self, chunks: AsyncIterator[bytes]) -> tuple[int, ArchiveStats]:
+        """
+        Восстановить чат из архива.
+
+        Args:
+            chunks (AsyncIterator[bytes]): Сжатый архив по частям (файл или тело запроса).
+
+        Returns:
+            tuple: (int, ArchiveStats) — ID восстановленного чата и счетчики импорта.
+
+        Raises:
+            HTTPException 400: Если архив поврежден или в неизвестном формате.
+            HTTPException 500: Если сообщения не удалось сохранить.
+        """
+        stats = ArchiveStats()
+        lines = self.lines(chunks, stats)
+        chat_id = None
+        try:
+            header = decode_header(await anext(lines, b""))
+            async with UnitOfWork(self.session_factory) as uow:
+                chat_id = (await uow.chats.create_chat(header["title"], header["created_at"])).id
+                await uow.commit()
+                batch = []
+                async for line in lines:
+                    batch.append(decode_message(line))
+                    if len(batch) >= self.batch_size:
+                        stats.rows += await uow.messages.import_messages(chat_id, batch)
+                        await uow.commit()
+                        batch = []
+                if batch:
+                    stats.rows += await uow.messages.import_messages(chat_id, batch)
+        except Exception as e:
+            await self._discard(chat_id)
+            logger.error("Не удалось импортировать архив чата: %s", e)
+            if isinstance(e, ValueError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid archive: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Could not import archive: {str(e)}",
+            )
+        stats.finish()
+        logger.info(
+            "Чат id=%s (исходный id=%s) восстановлен из архива: %s сообщений за %.2f с (%.0f строк/с)",
+            chat_id, header["id"], stats.rows, stats.seconds, stats.rows_per_sec,
+        )
+        return chat_id, stats
+
+    async def _discard(self, chat_id: int | None) -> None:
+        """Удалить частично импортированный чат."""
+        if chat_id is None:
+            return
+        try:
+            async with UnitOfWork(self.session_factory) as uow:
+                await uow.chats.delete_chat(chat_id)
+        except Exception as e:
+            logger.error("Не удалось удалить частично импортированный чат id=%s: %s", chat_id, e)
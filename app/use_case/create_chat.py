@@ -1,9 +1,9 @@
 from fastapi import HTTPException
 from starlette import status
 
-from app.database.models import ChatModels
 from app.logs.logger import logger
-from app.repositories.chats import ChatRepository
+from app.repositories.rows import ChatRow
+from app.repositories.unit_of_work import UnitOfWork
 from app.schemas.chats import ChatSchemas
 
 
@@ -12,18 +12,18 @@ class CreateChatUseCase:
     UseCase для создания  чата.
 
     Attributes:
-        repo (ChatRepository): Репозиторий для работы с чатами в базе данных.
+        uow (UnitOfWork): Единица работы с репозиторием чатов.
 
     Methods:
-        execute(data: ChatSchemas) -> ChatModels:
+        execute(data: ChatSchemas) -> ChatRow:
             Создает чат с указанным заголовком.
             Логирует процесс и выбрасывает HTTPException при ошибках.
     """
 
-    def __init__(self, repo: ChatRepository):
-        self.repo = repo
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
 
-    async def execute(self, data: ChatSchemas) -> ChatModels:
+    async def execute(self, data: ChatSchemas) -> ChatRow:
         """
         Создает новый чат с указанным заголовком.
 
@@ -31,18 +31,19 @@ class CreateChatUseCase:
             data (ChatSchemas): Pydantic-схема с заголовком чата.
 
         Returns:
-            ChatModels: Объект созданного чата.
+            ChatRow: Созданный чат.
 
         Raises:
             HTTPException 500: Если возникла ошибка при создании чата.
         """
-        logger.info(f"Попытка создать чат с title='{data.title}'")
+        logger.info("Попытка создать чат с title='%s'", data.title)
         try:
-            chat = await self.repo.create_chat(data.title)
-            logger.info(f"Чат '{data.title}' успешно создан с id={chat.id}")
+            async with self.uow:
+                chat = await self.uow.chats.create_chat(data.title)
+            logger.info("Чат '%s' успешно создан с id=%s", data.title, chat.id)
             return chat
         except Exception as e:
-            logger.error(f"Ошибка при создании чата '{data.title}': {str(e)}")
+            logger.error("Ошибка при создании чата '%s': %s", data.title, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Could not create chat: {str(e)}"
@@ -1,23 +1,36 @@
 from fastapi import HTTPException
 from starlette import status
 
+from app.cache.hot_chats import HotChatCache
+from app.cache.shared import SharedChatCache
 from app.logs.logger import logger
-from app.repositories.chats import ChatRepository
+from app.realtime.hub import MessageHub
+from app.repositories.unit_of_work import UnitOfWork
 
 
 class DeleteChatUseCase:
     """
     UseCase для удаления чата вместе со всеми сообщениями.
 
+    Чат удаляется одним запросом DELETE, сообщения удаляет БД каскадно.
+    Чат вытесняется из кэша активных чатов и из общего кэша воркеров,
+    подписчики потока чата отключаются.
+
     Attributes:
-        repo (ChatRepository): Репозиторий для работы с чатами.
+        uow (UnitOfWork): Единица работы с репозиторием чатов.
+        cache (HotChatCache): Кэш активных чатов.
+        shared_cache (SharedChatCache): Общий кэш страниц истории.
+        hub (MessageHub): Pub/sub новых сообщений.
 
     Methods:
         execute(id: int) -> None:
             Удаляет чат по ID. Логирует процесс и выбрасывает HTTPException при ошибках.
     """
-    def __init__(self, repo: ChatRepository):
-        self.repo = repo
+    def __init__(self, uow: UnitOfWork, cache: HotChatCache, shared_cache: SharedChatCache, hub: MessageHub):
+        self.uow = uow
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.hub = hub
 
     async def execute(self, id: int) -> HTTPException:
         """
@@ -33,17 +46,19 @@ class DeleteChatUseCase:
             HTTPException 404: Если чат с указанным ID не найден.
             HTTPException 500: Если произошла ошибка при удалении чата.
         """
-        logger.info(f"Попытка удалить чат с id={id}")
-        chat = await self.repo.get_chat(id)
-        if not chat:
-            logger.warning(f"Чат с id={id} не найден")
-            raise HTTPException(status_code=404, detail="Chat not found")
+        logger.info("Попытка удалить чат с id=%s", id)
         try:
-            await self.repo.delete_chat(chat)
-            logger.info(f"Чат с id={id} успешно удалён")
-
+            async with self.uow:
+                deleted = await self.uow.chats.delete_chat(id)
         except Exception as e:
-            logger.warning(f"Чат с id={id} не найден")
+            logger.error("Ошибка при удалении чата id=%s: %s", id, e)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail=f"Could not delete chat: {str(e)}")
+        self.cache.evict(id)
+        await self.shared_cache.try_invalidate(id)
+        if not deleted:
+            logger.warning("Чат с id=%s не найден", id)
+            raise HTTPException(status_code=404, detail="Chat not found")
+        self.hub.close_chat(id)
+        logger.info("Чат с id=%s успешно удалён", id)
         return HTTPException(status_code=status.HTTP_204_NO_CONTENT)
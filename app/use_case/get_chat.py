@@ -3,67 +3,207 @@ from typing import Tuple, List
 from fastapi import HTTPException
 from starlette import status
 
-from app.database.models import ChatModels, MessageModels
+from app.cache.hot_chats import HotChatCache
+from app.cache.shared import SharedChatCache
 from app.logs.logger import logger
-from app.repositories.chats import ChatRepository
+from app.repositories.rows import ChatRow, MessageRow
 from app.schemas.chats import ChatWithMessagesSchema
-from app.repositories.messages import MessageRepository
+from app.schemas.cursors import MessageCursor
+from app.schemas.encoders import chat_page_etag
+from app.schemas.responses import ChatWithMessagesResponseSchema
+from app.repositories.unit_of_work import UnitOfWork
 
 
 class GetChatUseCase:
     """
     UseCase для получения чата и последних сообщений.
 
+    Первая страница истории (без курсоров) отдается из кэша активных чатов
+    воркера, затем из общего кэша воркеров, при промахе оба кэша заполняются
+    новейшими сообщениями чата из БД. Чат и сообщения читаются из БД одним
+    запросом (MessageRepository.get_chat_page) в транзакции только для чтения;
+    при попадании в кэш соединение с БД не берется. Кэши заполняются
+    чтением из основной БД (primary_uow): страница с отстающей реплики
+    нарушила бы read-your-writes для клиентов, только что писавших в чат.
+    Сбой общего кэша не мешает ответу: чтение из него считается промахом,
+    а ошибка записи в него только логируется.
+
+    Для условных запросов первой страницы etag() вычисляет ETag без чтения
+    сообщений: по кэшу воркера или по версии чата (последнее сообщение
+    и счетчик в строке чата, одно чтение по первичному ключу).
+
     Attributes:
-        chat_repo (ChatRepository): Репозиторий для работы с чатами.
-        message_repo (MessageRepository): Репозиторий для работы с сообщениями.
+        uow (UnitOfWork): Единица работы только для чтения (реплика или основная БД).
+        primary_uow (UnitOfWork): Единица работы только для чтения из основной БД
+            для заполнения кэшей (по умолчанию — uow).
+        cache (HotChatCache): Кэш активных чатов воркера.
+        shared_cache (SharedChatCache): Общий кэш страниц истории.
 
     Methods:
-        execute(data: ChatWithMessagesSchema) -> tuple[ChatModels, list[MessageModels]]:
+        execute(data: ChatWithMessagesSchema) -> tuple[ChatRow, list[MessageRow]]:
             Возвращает чат и список последних сообщений.
+        etag(id: int, limit: int, cached_only: bool = False) -> str | None:
+            Возвращает ETag первой страницы истории.
+        page_etag(id: int, limit: int, messages: list) -> str:
+            ETag уже полученной первой страницы.
     """
-    def __init__(self, chat_repo: ChatRepository, message_repo: MessageRepository):
-        self.chat_repo = chat_repo
-        self.message_repo = message_repo
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        cache: HotChatCache,
+        shared_cache: SharedChatCache,
+        primary_uow: UnitOfWork | None = None,
+    ):
+        self.uow = uow
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.primary_uow = primary_uow or uow
+
+    @staticmethod
+    def page_etag(id: int, limit: int, messages: list) -> str:
+        """ETag первой страницы истории по ее сообщениям (от новых к старым)."""
+        return chat_page_etag(id, limit, messages[0].id if messages else None, len(messages))
+
+    async def etag(self, id: int, limit: int, cached_only: bool = False) -> str | None:
+        """
+        Получить ETag первой страницы истории, не загружая сообщения.
+
+        ETag совпадает с тем, который получит ответ execute() для той же
+        страницы: при попадании в кэш воркера он вычисляется по кэшу,
+        иначе — по последнему сообщению и счетчику из строки чата.
+
+        Args:
+            id (int): ID чата.
+            limit (int): Размер страницы.
+            cached_only (bool): Только по кэшу воркера, без обращения к БД.
+
+        Returns:
+            str | None: ETag или None, если чат не найден (или его нет в кэше при cached_only).
 
-    async def execute(self, id, limit: int) -> tuple[ChatModels, list[MessageModels]]:
+        Raises:
+            HTTPException 500: Если произошла ошибка при чтении версии чата.
+        """
+        if self.cache.enabled:
+            cached = self.cache.get(id, limit)
+            if cached is not None:
+                return self.page_etag(id, limit, cached[1])
+        if cached_only:
+            return None
+        try:
+            async with self.uow:
+                version = await self.uow.chats.get_chat_version(id)
+        except Exception as e:
+            logger.error("Ошибка при получении версии чата id=%s: %s", id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Could not get messages for chat id={id}: {str(e)}"
+            )
+        if version is None:
+            return None
+        return chat_page_etag(id, limit, version.last_message_id, min(version.message_count, limit))
+
+    async def execute(
+        self,
+        id,
+        limit: int,
+        before: str | None = None,
+        after: str | None = None,
+    ) -> tuple[ChatRow, list[MessageRow]]:
         """
         Получить чат и последние N сообщений.
 
         Args:
             data (ChatWithMessagesSchema): Схема с ID чата и параметром limit
                 (количество сообщений для выборки, по умолчанию 20, максимум 100).
+            before (str | None): Курсор — вернуть сообщения старше него.
+            after (str | None): Курсор — вернуть сообщения новее него.
 
         Returns:
-            tuple: (ChatModels, list[MessageModels])
-                Чат и список сообщений, отсортированных по created_at.
+            tuple: (ChatRow, list[MessageRow])
+                Чат и список сообщений (строки БД или объекты кэша с теми же полями),
+                отсортированных по created_at.
 
         Raises:
+            HTTPException 400: Если курсор некорректен или переданы оба курсора.
             HTTPException 404: Если чат с указанным ID не найден.
             HTTPException 500: Если произошла ошибка при получении сообщений.
         """
-        logger.info(f"Запрос на получение чата id={id} с последними {limit} сообщениями")
-
-        chat = await self.chat_repo.get_chat(id)
-        if not chat:
-            logger.warning(f"Чат с id={id} не найден")
+        logger.info("Запрос на получение чата id=%s с последними %s сообщениями", id, limit)
+        if before is not None and after is not None:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Chat with id={id} not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only one of 'before' and 'after' can be specified"
+            )
+        try:
+            before_cursor = MessageCursor.decode(before) if before is not None else None
+            after_cursor = MessageCursor.decode(after) if after is not None else None
+        except ValueError as e:
+            logger.warning("Некорректный курсор для чата id=%s: %s", id, e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
             )
 
+        first_page = before is None and after is None
+        use_cache = self.cache.enabled and first_page
+        use_shared_cache = self.shared_cache.enabled and first_page
+        if use_cache:
+            cached = self.cache.get(id, limit)
+            if cached is not None:
+                logger.info("Чат id=%s отдан из кэша", id)
+                return cached
+            token = self.cache.fill_token()
+        shared_token = None
+        if use_shared_cache:
+            try:
+                page = await self.shared_cache.get(id, limit)
+                if page is None:
+                    shared_token = await self.shared_cache.fill_token(id)
+            except Exception as e:
+                # Сбой общего кэша — промах: страница читается из БД и в кэш не пишется.
+                logger.warning("Общий кэш недоступен при чтении чата id=%s: %s", id, e)
+                page = None
+            if page is not None:
+                logger.info("Чат id=%s отдан из общего кэша", id)
+                if use_cache:
+                    self.cache.put(id, page, page.messages, token)
+                return page, page.messages[:limit]
+
+        fill_cache = use_cache or use_shared_cache
         try:
-            messages = await self.message_repo.get_last_messages(id, limit)
-            logger.info(f"Получено {len(messages)} сообщений для чата id={id}")
+            if fill_cache:
+                async with self.primary_uow as uow:
+                    page = await uow.messages.get_chat_page(id, max(limit, self.cache.max_messages))
+            else:
+                async with self.uow as uow:
+                    page = await uow.messages.get_chat_page(id, limit, before=before_cursor, after=after_cursor)
         except Exception as e:
-            logger.error(f"Ошибка при получении сообщений для чата id={id}: {str(e)}")
+            logger.error("Ошибка при получении сообщений для чата id=%s: %s", id, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Could not get messages for chat id={id}: {str(e)}"
             )
+        if page is None:
+            logger.warning("Чат с id=%s не найден", id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Chat with id={id} not found"
+            )
 
+        chat, messages = page
+        if shared_token is not None:
+            try:
+                await self.shared_cache.put(id, ChatWithMessagesResponseSchema(
+                    id=chat.id,
+                    title=chat.title,
+                    created_at=chat.created_at,
+                    messages=messages[:self.shared_cache.max_messages],
+                ), shared_token)
+            except Exception as e:
+                logger.warning("Не удалось сохранить чат id=%s в общем кэше: %s", id, e)
+        if use_cache:
+            self.cache.put(id, chat, messages, token)
+        if fill_cache:
+            messages = messages[:limit]
+        logger.info("Получено %s сообщений для чата id=%s", len(messages), id)
         return chat, messages
-
-
-
-
@@ -0,0 +1,56 @@
+from fastapi import HTTPException
+from starlette import status
+
+from app.logs.logger import logger
+from app.repositories.rows import ChatSummaryRow
+from app.repositories.unit_of_work import UnitOfWork
+from app.schemas.cursors import ChatCursor
+
+
+class ListChatsUseCase:
+    """
+    UseCase для списка чатов по последней активности.
+
+    Attributes:
+        uow (UnitOfWork): Единица работы только для чтения.
+
+    Methods:
+        execute(limit: int, cursor: str | None) -> tuple[list[ChatSummaryRow], str | None]:
+            Возвращает страницу чатов и курсор следующей страницы.
+    """
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def execute(self, limit: int, cursor: str | None = None) -> tuple[list[ChatSummaryRow], str | None]:
+        """
+        Получить чаты по убыванию времени последнего сообщения.
+
+        Args:
+            limit (int): Максимальное количество чатов.
+            cursor (str | None): Курсор next_cursor предыдущей страницы.
+
+        Returns:
+            tuple: (list[ChatSummaryRow], str | None) — чаты со счетчиком и последним
+                сообщением и курсор следующей страницы (None, если страница последняя).
+
+        Raises:
+            HTTPException 400: Если курсор некорректен.
+            HTTPException 500: Если список не удалось получить.
+        """
+        logger.info("Получение списка чатов limit=%s", limit)
+        try:
+            chat_cursor = ChatCursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        try:
+            async with self.uow:
+                chats = await self.uow.chats.list_chats(limit, chat_cursor)
+        except Exception as e:
+            logger.error("Ошибка получения списка чатов: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Could not list chats: {str(e)}",
+            )
+        last = chats[-1] if len(chats) == limit else None
+        next_cursor = ChatCursor(last_message_at=last.last_message_at, id=last.id).encode() if last else None
+        return chats, next_cursor
@@ -0,0 +1,105 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette import status
+
+from app.cache.hot_chats import HotChatCache
+from app.cache.shared import SharedChatCache
+from app.logs.logger import logger
+from app.monitoring.collectors import chat_purges
+from app.realtime.hub import MessageHub
+from app.repositories.unit_of_work import UnitOfWork
+
+
+class PurgeChatUseCase:
+    """
+    UseCase для фонового удаления очень больших чатов.
+
+    Сообщения удаляются порциями по batch_size, каждая порция — в отдельной
+    короткой транзакции, поэтому удаление не держит одну огромную транзакцию
+    и блокировки. После удаления всех сообщений удаляется сам чат.
+    Результат фонового удаления учитывается в счетчике chat_purges_total
+    (/metrics): после сбоя чат остается удаленным частично, и повторный
+    DELETE ?purge=true доудаляет его.
+
+    Attributes:
+        uow (UnitOfWork): Единица работы запроса (проверка существования чата).
+        session_factory (async_sessionmaker): Фабрика сессий для фоновой работы
+            (сессия запроса к этому моменту уже закрыта).
+        batch_size (int): Размер порции удаляемых сообщений.
+        cache (HotChatCache): Кэш активных чатов, из которого чат вытесняется.
+        shared_cache (SharedChatCache): Общий кэш страниц истории.
+        hub (MessageHub): Pub/sub новых сообщений, подписчики отключаются после удаления.
+
+    Methods:
+        execute(id: int) -> None:
+            Проверяет, что чат существует, перед постановкой удаления в фон.
+        purge(id: int) -> int:
+            Удаляет сообщения порциями, логируя прогресс, затем удаляет чат.
+    """
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        session_factory: async_sessionmaker,
+        batch_size: int,
+        cache: HotChatCache,
+        shared_cache: SharedChatCache,
+        hub: MessageHub,
+    ):
+        self.uow = uow
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.hub = hub
+
+    async def execute(self, id: int) -> None:
+        """
+        Проверяет, что чат существует.
+
+        Args:
+            id (int): ID чата для удаления.
+
+        Raises:
+            HTTPException 404: Если чат с указанным ID не найден.
+        """
+        logger.info("Запрос на фоновое удаление чата id=%s", id)
+        async with self.uow:
+            chat = await self.uow.chats.get_chat(id)
+        if not chat:
+            logger.warning("Чат с id=%s не найден", id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
+
+    async def purge(self, id: int) -> int:
+        """
+        Удаляет сообщения чата порциями, затем сам чат.
+
+        Args:
+            id (int): ID чата для удаления.
+
+        Returns:
+            int: Общее количество удаленных сообщений.
+        """
+        total = 0
+        try:
+            async with UnitOfWork(self.session_factory) as uow:
+                while True:
+                    deleted = await uow.messages.delete_messages_batch(id, self.batch_size)
+                    await uow.commit()
+                    self.cache.evict(id)
+                    await self.shared_cache.try_invalidate(id)
+                    total += deleted
+                    logger.info("Чат id=%s: удалено %s сообщений", id, total)
+                    if deleted < self.batch_size:
+                        break
+                await uow.chats.delete_chat(id)
+                await uow.commit()
+                self.cache.evict(id)
+                await self.shared_cache.try_invalidate(id)
+                self.hub.close_chat(id)
+            logger.info("Чат с id=%s удалён в фоне, всего сообщений: %s", id, total)
+        except Exception as e:
+            chat_purges.inc("failed")
+            logger.error("Ошибка при фоновом удалении чата id=%s после %s сообщений: %s", id, total, e)
+            return total
+        chat_purges.inc("succeeded")
+        return total
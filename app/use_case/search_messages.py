@@ -0,0 +1,70 @@
+from fastapi import HTTPException
+from starlette import status
+
+from app.logs.logger import logger
+from app.repositories.rows import SearchHit
+from app.repositories.unit_of_work import UnitOfWork
+from app.schemas.cursors import SearchCursor
+
+
+class SearchMessagesUseCase:
+    """
+    UseCase для полнотекстового поиска сообщений.
+
+    Attributes:
+        uow (UnitOfWork): Единица работы только для чтения (поиск сообщений
+            и проверка существования чата).
+
+    Methods:
+        execute(q: str, limit: int, cursor: str | None, chat_id: int | None) -> tuple[list[SearchHit], str | None]:
+            Возвращает страницу результатов и курсор следующей страницы.
+    """
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def execute(
+        self,
+        q: str,
+        limit: int,
+        cursor: str | None = None,
+        chat_id: int | None = None,
+    ) -> tuple[list[SearchHit], str | None]:
+        """
+        Найти сообщения по запросу во всех чатах или в одном чате.
+
+        Args:
+            q (str): Поисковый запрос (синтаксис websearch: "фраза", OR, -слово).
+            limit (int): Максимальное количество результатов.
+            cursor (str | None): Курсор next_cursor предыдущей страницы.
+            chat_id (int | None): Искать только в этом чате.
+
+        Returns:
+            tuple: (list[SearchHit], str | None) — результаты по убыванию релевантности
+                и курсор следующей страницы (None, если страница последняя).
+
+        Raises:
+            HTTPException 400: Если курсор некорректен.
+            HTTPException 404: Если чат с указанным ID не найден.
+            HTTPException 500: Если поиск завершился ошибкой.
+        """
+        logger.info("Поиск сообщений q='%s' в чате id=%s", q, chat_id)
+        try:
+            search_cursor = SearchCursor.decode(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        try:
+            async with self.uow:
+                hits = await self.uow.messages.search(q, limit, chat_id, search_cursor)
+                # Пустая выдача может означать несуществующий чат: проверяем только ее.
+                missing = not hits and chat_id is not None and await self.uow.chats.get_chat(chat_id) is None
+        except Exception as e:
+            logger.error("Ошибка поиска сообщений q='%s': %s", q, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Could not search messages: {str(e)}",
+            )
+        if missing:
+            logger.warning("Чат с id=%s не найден", chat_id)
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Chat with id={chat_id} not found")
+        next_cursor = SearchCursor(rank=hits[-1].rank, id=hits[-1].id).encode() if len(hits) == limit else None
+        return hits, next_cursor
@@ -1,47 +1,76 @@
 from fastapi import HTTPException
 from starlette import status
 
-from app.database.models import MessageModels
+from app.cache.hot_chats import HotChatCache
+from app.cache.shared import SharedChatCache
 from app.logs.logger import logger
-from app.repositories.chats import ChatRepository
-from app.repositories.messages import MessageRepository
+from app.realtime.hub import MessageHub
+from app.repositories.exceptions import ChatNotFoundError
+from app.repositories.rows import MessageRow
+from app.repositories.unit_of_work import UnitOfWork
+from app.repositories.write_coalescer import MessageWriteCoalescer
 
 
 class SendMessageUseCase:
     """
       UseCase для отправки сообщения в чат.
 
+      Сообщение сохраняется за один запрос к БД вместе со счетчиком
+      и последним сообщением чата: существование чата проверяет внешний
+      ключ, а его нарушение превращается в 404. Если включен групповой
+      коммит, сообщение сохраняется в общей пачке с сообщениями других
+      запросов.
+      Сохраненное сообщение дописывается в кэш активных чатов,
+      страница чата в общем кэше воркеров сбрасывается, а подписчики потока
+      чата получают сообщение.
+
       Attributes:
-          chat_repo (ChatRepository): Репозиторий для работы с чатами.
-          message_repo (MessageRepository): Репозиторий для работы с сообщениями.
+          uow (UnitOfWork): Единица работы с репозиторием сообщений.
+          cache (HotChatCache): Кэш активных чатов.
+          shared_cache (SharedChatCache): Общий кэш страниц истории.
+          hub (MessageHub): Pub/sub новых сообщений.
+          coalescer (MessageWriteCoalescer | None): Групповой коммит (None — выключен).
 
       Methods:
-          execute(data: MessageSchemas) -> MessageModels:
+          execute(chat_id: int, text: str) -> MessageRow:
               Отправляет сообщение в чат и возвращает созданное сообщение.
       """
-    def __init__(self, chat_repo: ChatRepository, message_repo: MessageRepository):
-        self.chat_repo = chat_repo
-        self.message_repo = message_repo
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        cache: HotChatCache,
+        shared_cache: SharedChatCache,
+        hub: MessageHub,
+        coalescer: MessageWriteCoalescer | None = None,
+    ):
+        self.uow = uow
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.hub = hub
+        self.coalescer = coalescer
 
-    async def execute(self, chat_id: int, text: str) -> MessageModels:
-        logger.info(f"Попытка отправки сообщения в чат id={chat_id}")
-        chat = await self.chat_repo.get_chat(chat_id)
-        if not chat:
-            logger.warning(f"Чат с id={chat_id} не найден. Сообщение не отправлено.")
+    async def execute(self, chat_id: int, text: str) -> MessageRow:
+        logger.info("Попытка отправки сообщения в чат id=%s", chat_id)
+        try:
+            if self.coalescer is not None:
+                message = await self.coalescer.send(chat_id, text)
+            else:
+                async with self.uow:
+                    message = await self.uow.messages.send_message(chat_id, text)
+        except ChatNotFoundError:
+            logger.warning("Чат с id=%s не найден. Сообщение не отправлено.", chat_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Chat with id={chat_id} not found"
             )
-        try:
-            message = await self.message_repo.send_message(chat_id, text)
-            logger.info(f"Сообщение успешно отправлено в чат id={chat_id}, message_id={message.id}")
-            return message
         except Exception as e:
-            logger.error(f"Ошибка при отправке сообщения в чат id={chat_id}: {str(e)}")
+            logger.error("Ошибка при отправке сообщения в чат id=%s: %s", chat_id, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Could not send message to chat id={chat_id}: {str(e)}"
             )
-
-
-
+        self.cache.append(chat_id, message)
+        await self.shared_cache.try_invalidate(chat_id)
+        self.hub.publish_messages(chat_id, [message])
+        logger.info("Сообщение успешно отправлено в чат id=%s, message_id=%s", chat_id, message.id)
+        return message
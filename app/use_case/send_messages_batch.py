@@ -0,0 +1,84 @@
+from fastapi import HTTPException
+from starlette import status
+
+from app.cache.hot_chats import HotChatCache
+from app.cache.shared import SharedChatCache
+from app.logs.logger import logger
+from app.realtime.hub import MessageHub
+from app.repositories.exceptions import ChatNotFoundError
+from app.repositories.rows import MessageRow
+from app.repositories.unit_of_work import UnitOfWork
+from app.schemas.messages import MessageBatchSchemas
+
+
+class SendMessagesBatchUseCase:
+    """
+    UseCase для пакетной загрузки сообщений в чат.
+
+    Все сообщения пачки записываются одной транзакцией: либо сохраняются все,
+    либо ни одного. После загрузки чат вытесняется из кэша активных чатов
+    и из общего кэша воркеров, сообщения рассылаются подписчикам потока чата.
+
+    Attributes:
+        uow (UnitOfWork): Единица работы с репозиторием сообщений.
+        cache (HotChatCache): Кэш активных чатов.
+        shared_cache (SharedChatCache): Общий кэш страниц истории.
+        hub (MessageHub): Pub/sub новых сообщений.
+
+    Methods:
+        execute(chat_id: int, data: MessageBatchSchemas) -> list[int]:
+            Сохраняет пачку сообщений и возвращает их ID.
+    """
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        cache: HotChatCache,
+        shared_cache: SharedChatCache,
+        hub: MessageHub,
+    ):
+        self.uow = uow
+        self.cache = cache
+        self.shared_cache = shared_cache
+        self.hub = hub
+
+    async def execute(self, chat_id: int, data: MessageBatchSchemas) -> list[int]:
+        """
+        Сохраняет пачку сообщений в чат.
+
+        Args:
+            chat_id (int): ID чата.
+            data (MessageBatchSchemas): Провалидированная пачка сообщений.
+
+        Returns:
+            list[int]: ID созданных сообщений в порядке запроса.
+
+        Raises:
+            HTTPException 404: Если чат с указанным ID не существует.
+            HTTPException 500: Если сообщения не удалось сохранить.
+        """
+        logger.info("Попытка загрузить %s сообщений в чат id=%s", len(data.messages), chat_id)
+        try:
+            texts = [message.text for message in data.messages]
+            async with self.uow:
+                rows = await self.uow.messages.send_messages(chat_id, texts)
+        except ChatNotFoundError:
+            logger.warning("Чат с id=%s не найден. Сообщения не загружены.", chat_id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Chat with id={chat_id} not found"
+            )
+        except Exception as e:
+            logger.error("Ошибка при загрузке сообщений в чат id=%s: %s", chat_id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Could not send messages to chat id={chat_id}: {str(e)}"
+            )
+        self.cache.evict(chat_id)
+        await self.shared_cache.try_invalidate(chat_id)
+        if self.hub.wants_messages(chat_id):
+            self.hub.publish_messages(chat_id, [
+                MessageRow(row.id, chat_id, text, row.created_at)
+                for row, text in zip(rows, texts)
+            ])
+        logger.info("В чат id=%s загружено %s сообщений", chat_id, len(rows))
+        return [row.id for row in rows]
@@ -0,0 +1,113 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette import status
+
+from app.logs.logger import logger
+from app.realtime.hub import MessageHub, Subscription, RESET_EVENT, message_event
+from app.repositories.chats import ChatRepository
+from app.repositories.messages import MessageRepository
+from app.schemas.cursors import MessageCursor
+
+
+class StreamChatUseCase:
+    """
+    UseCase для потоковой доставки новых сообщений чата (SSE).
+
+    Подписка оформляется до догона истории, поэтому сообщения, пришедшие
+    во время догона, не теряются, а повторы отбрасываются по ID. Соединение
+    с БД берется только на время коротких запросов, а не на весь поток.
+
+    Attributes:
+        session_factory (async_sessionmaker): Фабрика сессий основной БД.
+        hub (MessageHub): Внутрипроцессный pub/sub сообщений.
+        heartbeat (float): Интервал комментариев-пингов в секундах.
+        replay_limit (int): Максимум сообщений, догоняемых по курсору.
+    """
+    REPLAY_PAGE_SIZE = 100
+
+    def __init__(self, session_factory: async_sessionmaker, hub: MessageHub, heartbeat: float, replay_limit: int):
+        self.session_factory = session_factory
+        self.hub = hub
+        self.heartbeat = heartbeat
+        self.replay_limit = replay_limit
+
+    async def subscribe(self, id: int, since: str | None) -> tuple[Subscription, MessageCursor | None]:
+        """
+        Подписаться на чат.
+
+        Args:
+            id (int): ID чата.
+            since (str | None): Курсор последнего полученного клиентом сообщения.
+
+        Returns:
+            tuple: (Subscription, MessageCursor | None) — подписка и курсор догона.
+
+        Raises:
+            HTTPException 400: Если курсор некорректен.
+            HTTPException 404: Если чат с указанным ID не найден.
+        """
+        logger.info("Подписка на поток сообщений чата id=%s", id)
+        try:
+            cursor = MessageCursor.decode(since) if since else None
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        subscription = self.hub.subscribe(id)
+        async with self.session_factory() as session:
+            chat = await ChatRepository(session).get_chat(id)
+        if not chat:
+            self.hub.unsubscribe(subscription)
+            logger.warning("Чат с id=%s не найден", id)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Chat with id={id} not found"
+            )
+        return subscription, cursor
+
+    async def events(self, subscription: Subscription, cursor: MessageCursor | None) -> AsyncIterator[str]:
+        """
+        Поток событий: сначала пропущенные сообщения после курсора, затем новые.
+
+        Args:
+            subscription (Subscription): Подписка из subscribe().
+            cursor (MessageCursor | None): Курсор догона истории.
+
+        Yields:
+            str: События в формате text/event-stream.
+        """
+        chat_id = subscription.chat_id
+        replayed: set[int] = set()
+        try:
+            while cursor is not None:
+                async with self.session_factory() as session:
+                    page = await MessageRepository(session).get_last_messages(
+                        chat_id, self.REPLAY_PAGE_SIZE, after=cursor
+                    )
+                for message in reversed(page):
+                    replayed.add(message.id)
+                    yield message_event(message).data
+                if len(page) < self.REPLAY_PAGE_SIZE:
+                    break
+                if len(replayed) >= self.replay_limit:
+                    logger.info("Чат id=%s: догон истории превысил %s сообщений", chat_id, self.replay_limit)
+                    yield RESET_EVENT.data
+                    return
+                cursor = MessageCursor.from_message(page[0])
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event.key is None:
+                    yield event.data
+                    return
+                if event.key[1] in replayed:
+                    continue
+                yield event.data
+        finally:
+            self.hub.unsubscribe(subscription)
+            logger.info("Поток сообщений чата id=%s закрыт", chat_id)
@@ -0,0 +1,130 @@
+"""Задержка чтения страницы чата при сетевой задержке до БД.
+
+Между приложением и PostgreSQL ставится TCP-прокси, который задерживает
+каждый пакет на rtt/2 в каждую сторону, и сравниваются два способа
+прочитать чат и его последние --limit сообщений в одной сессии:
+    two-queries — ChatRepository.get_chat, затем MessageRepository.get_last_messages;
+    one-query   — MessageRepository.get_chat_page.
+Помимо самих запросов сессия тратит два обмена на BEGIN и ROLLBACK.
+
+Запуск (на отдельной БД, настройки берутся из .env):
+    python -m benchmarks.chat_page_rtt --rtt 1 --rtt 5 --repeat 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import make_url, text
+
+from app.config import settings
+from app.database.db import Database
+from app.repositories.chats import ChatRepository
+from app.repositories.messages import MessageRepository
+
+
+class DelayProxy:
+    """TCP-прокси, задерживающий данные на delay секунд в каждую сторону."""
+
+    def __init__(self, host: str, port: int, delay: float):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def deliver() -> None:
+            while (item := await queue.get()) is not None:
+                due, data = item
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            while data := await reader.read(65536):
+                queue.put_nowait((time.perf_counter() + self.delay, data))
+        finally:
+            queue.put_nowait(None)
+            await delivery
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        upstream_reader, upstream_writer = await asyncio.open_connection(self.host, self.port)
+        await asyncio.gather(
+            self.pipe(reader, upstream_writer),
+            self.pipe(upstream_reader, writer),
+            return_exceptions=True,
+        )
+
+    async def stop(self) -> None:
+        self.server.close()
+
+
+async def two_queries(database: Database, chat_id: int, limit: int) -> None:
+    async with database.session() as session:
+        chat = await ChatRepository(session).get_chat(chat_id)
+        assert chat is not None
+        await MessageRepository(session).get_last_messages(chat_id, limit)
+
+
+async def one_query(database: Database, chat_id: int, limit: int) -> None:
+    async with database.session() as session:
+        assert await MessageRepository(session).get_chat_page(chat_id, limit) is not None
+
+
+async def measure(rtt: float, args: argparse.Namespace, chat_id: int) -> None:
+    url = make_url(settings.pg_url)
+    proxy = DelayProxy(url.host or "127.0.0.1", url.port or 5432, rtt / 2000)
+    port = await proxy.start()
+    database = Database(url=url.set(host="127.0.0.1", port=port).render_as_string(hide_password=False), echo=False)
+    try:
+        results = {}
+        for name, read in (("two-queries", two_queries), ("one-query", one_query)):
+            await read(database, chat_id, args.limit)
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                await read(database, chat_id, args.limit)
+                samples.append(time.perf_counter() - started)
+            results[name] = statistics.quantiles(samples, n=100)
+        two, one = results["two-queries"], results["one-query"]
+        print(
+            f"rtt={rtt:g}ms: two-queries p50={two[49] * 1000:.2f}ms p99={two[98] * 1000:.2f}ms, "
+            f"one-query p50={one[49] * 1000:.2f}ms p99={one[98] * 1000:.2f}ms, "
+            f"delta p50={(two[49] - one[49]) * 1000:.2f}ms"
+        )
+    finally:
+        await database.dispose()
+        await proxy.stop()
+
+
+async def main(args: argparse.Namespace) -> None:
+    database = Database(url=settings.pg_url, echo=False)
+    async with database.engine.begin() as conn:
+        chat_id = (await conn.execute(text("INSERT INTO chat (title) VALUES ('rtt') RETURNING id"))).scalar()
+        await conn.execute(
+            text("INSERT INTO message (chat_id, text) SELECT :chat_id, 'message ' || g FROM generate_series(1, :n) g"),
+            {"chat_id": chat_id, "n": args.limit * 2},
+        )
+    try:
+        for rtt in args.rtt or [0.0, 1.0, 5.0]:
+            await measure(rtt, args, chat_id)
+    finally:
+        async with database.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM chat WHERE id = :id"), {"id": chat_id})
+        await database.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt", type=float, action="append", help="сетевая задержка туда-обратно, мс")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
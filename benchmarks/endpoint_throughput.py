@@ -0,0 +1,85 @@
+"""Пропускная способность эндпоинтов чатов на одном ядре.
+
+Гоняет приложение в процессе (httpx + ASGITransport, без сети) и для каждого
+эндпоинта в течение --duration секунд держит --concurrency одновременных
+запросов, затем выводит requests/sec и p50/p99. Процесс однопоточный,
+поэтому результат — запросы в секунду на ядро (вместе с расходами клиента).
+Для сравнения "до/после" запускается на двух ревизиях с одинаковыми параметрами.
+
+Запуск:
+    python -m benchmarks.endpoint_throughput --duration 5 --concurrency 20
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.database.db import db
+from app.main import app
+
+
+async def measure(name: str, request, args: argparse.Namespace, available=lambda: True) -> None:
+    """Гонять request(i) concurrency воркерами, пока не выйдет время или available() не вернет False."""
+    latencies: list[float] = []
+    counter = itertools.count()
+    deadline = time.perf_counter() + args.duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline and available():
+            started = time.perf_counter()
+            resp = await request(next(counter))
+            latencies.append(time.perf_counter() - started)
+            assert resp.status_code < 400, resp.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<32} {len(latencies) / elapsed:8.0f} req/s  "
+        f"p50={q[49] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        chat_id = (await client.post("/chats/", json={"title": "throughput"})).json()["id"]
+        for i in range(args.history):
+            await client.post(f"/chats/{chat_id}/messages/", json={"text": f"seed {i}"})
+        created: list[int] = []
+
+        async def create_chat(i: int):
+            resp = await client.post("/chats/", json={"title": f"bench {i}"})
+            created.append(resp.json()["id"])
+            return resp
+
+        async def delete_chat(i: int):
+            return await client.delete(f"/chats/{created.pop()}")
+
+        endpoints = [
+            ("POST /chats/", create_chat),
+            ("POST /chats/{id}/messages/",
+             lambda i: client.post(f"/chats/{chat_id}/messages/", json={"text": f"message {i}"})),
+            ("GET /chats/{id}", lambda i: client.get(f"/chats/{chat_id}", params={"limit": 20})),
+            ("GET /chats/{id} (100)", lambda i: client.get(f"/chats/{chat_id}", params={"limit": 100})),
+            ("DELETE /chats/{id}", delete_chat),
+        ]
+        for name, request in endpoints[:-1]:
+            await measure(name, request, args)
+        # Удалять можно только чаты, созданные на первом шаге.
+        await measure(*endpoints[-1], args, available=lambda: bool(created))
+        for remaining in created:
+            await client.delete(f"/chats/{remaining}")
+        await client.delete(f"/chats/{chat_id}")
+    await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--history", type=int, default=200, help="сообщений в чате для GET")
+    asyncio.run(main(parser.parse_args()))
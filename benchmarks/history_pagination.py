@@ -0,0 +1,139 @@
+"""Бенчмарк чтения истории чата.
+
+Засевает большие чаты и замеряет p50/p99 задержки страницы истории:
+- keyset-пагинация курсорами (MessageRepository.get_last_messages с before),
+- OFFSET-пагинация (как пришлось бы листать без курсоров).
+
+С флагом --compare-no-index дополнительно замеряет первую страницу без
+индекса ix_message_chat_id_created_at_id (индекс удаляется на время замера
+и создается заново), т.е. поведение до миграции ffc21ef6e3dc.
+
+Запуск (на отдельной БД, настройки берутся из .env):
+    python -m benchmarks.history_pagination --chats 3 --messages 1000000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select, text
+
+from app.database.db import db
+from app.database.models import MessageModels
+from app.repositories.messages import MessageRepository
+from app.schemas.cursors import MessageCursor
+
+
+def report(name: str, samples: list[float]) -> None:
+    """Вывести p50/p99 задержки в миллисекундах."""
+    q = statistics.quantiles(samples, n=100)
+    print(f"{name:<28} n={len(samples):<6} p50={q[49] * 1000:8.2f}ms  p99={q[98] * 1000:8.2f}ms")
+
+
+async def seed(chats: int, messages: int) -> list[int]:
+    """Создать чаты и наполнить их сообщениями средствами БД."""
+    chat_ids = []
+    async with db.engine.begin() as conn:
+        for i in range(chats):
+            chat_id = (await conn.execute(
+                text("INSERT INTO chat (title) VALUES (:title) RETURNING id"),
+                {"title": f"bench {i}"},
+            )).scalar_one()
+            await conn.execute(
+                text(
+                    "INSERT INTO message (chat_id, text, created_at) "
+                    "SELECT :chat_id, 'message ' || g, now() - make_interval(secs => :n - g) "
+                    "FROM generate_series(1, :n) AS g"
+                ),
+                {"chat_id": chat_id, "n": messages},
+            )
+            chat_ids.append(chat_id)
+        await conn.execute(text("ANALYZE message"))
+    return chat_ids
+
+
+async def keyset_walk(chat_id: int, limit: int, pages: int) -> list[float]:
+    samples = []
+    cursor = None
+    async with db.session_factory() as session:
+        repo = MessageRepository(session)
+        for _ in range(pages):
+            started = time.perf_counter()
+            messages = await repo.get_last_messages(chat_id, limit, before=cursor)
+            samples.append(time.perf_counter() - started)
+            if len(messages) < limit:
+                break
+            cursor = MessageCursor.from_message(messages[-1])
+    return samples
+
+
+async def offset_walk(chat_id: int, limit: int, pages: int) -> list[float]:
+    samples = []
+    async with db.session_factory() as session:
+        for page in range(pages):
+            query = (
+                select(MessageModels)
+                .where(MessageModels.chat_id == chat_id)
+                .order_by(MessageModels.created_at.desc(), MessageModels.id.desc())
+                .offset(page * limit)
+                .limit(limit)
+            )
+            started = time.perf_counter()
+            messages = (await session.execute(query)).scalars().all()
+            samples.append(time.perf_counter() - started)
+            session.expunge_all()
+            if len(messages) < limit:
+                break
+    return samples
+
+
+async def first_page(chat_ids: list[int], limit: int, repeats: int) -> list[float]:
+    samples = []
+    async with db.session_factory() as session:
+        repo = MessageRepository(session)
+        for _ in range(repeats):
+            for chat_id in chat_ids:
+                started = time.perf_counter()
+                await repo.get_last_messages(chat_id, limit)
+                samples.append(time.perf_counter() - started)
+                session.expunge_all()
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    chat_ids = await seed(args.chats, args.messages)
+    print(f"seeded {args.chats} chats x {args.messages} messages")
+    try:
+        report("first page (index)", await first_page(chat_ids, args.limit, args.repeats))
+        keyset, offset = [], []
+        for chat_id in chat_ids:
+            keyset += await keyset_walk(chat_id, args.limit, args.pages)
+            offset += await offset_walk(chat_id, args.limit, args.pages)
+        report("keyset pages", keyset)
+        report("offset pages", offset)
+        if args.compare_no_index:
+            async with db.engine.begin() as conn:
+                await conn.execute(text("DROP INDEX ix_message_chat_id_created_at_id"))
+            try:
+                report("first page (no index)", await first_page(chat_ids, args.limit, max(args.repeats // 10, 1)))
+            finally:
+                async with db.engine.begin() as conn:
+                    await conn.execute(text(
+                        "CREATE INDEX ix_message_chat_id_created_at_id ON message (chat_id, created_at, id)"
+                    ))
+    finally:
+        async with db.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM message WHERE chat_id = ANY(:ids)"), {"ids": chat_ids})
+            await conn.execute(text("DELETE FROM chat WHERE id = ANY(:ids)"), {"ids": chat_ids})
+        await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=3)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--compare-no-index", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,137 @@
+"""Задержки event loop из-за логирования.
+
+Моделирует обработку запросов, каждый из которых пишет несколько записей
+в лог, и параллельно измеряет, насколько опаздывает пробуждение задачи,
+спящей по 1 мс (lag), — это время, на которое логирование блокирует loop.
+
+Сравниваются два варианта:
+    sync  — как раньше: FileHandler и StreamHandler в потоке loop, f-строки;
+    queue — QueueHandler/QueueListener из app.logs.logger, %-форматирование.
+
+--io-delay добавляет задержку к каждой записи на диск (медленный диск,
+сетевой том), --sample-info прореживает INFO в варианте queue.
+
+Запуск:
+    python -m benchmarks.logging_stall --requests 20000 --io-delay 0.2
+"""
+import argparse
+import asyncio
+import logging
+import queue
+import statistics
+import tempfile
+import time
+from logging.handlers import QueueListener
+from pathlib import Path
+
+from app.logs.logger import DeferredQueueHandler, RequestIdFilter, SamplingFilter
+
+FORMAT = "%(asctime)s [%(levelname)s] %(name)s [%(request_id)s]: %(message)s"
+
+
+class SlowFileHandler(logging.FileHandler):
+    """FileHandler, каждая запись которого дополнительно занимает io_delay секунд."""
+
+    def __init__(self, path: Path, io_delay: float):
+        super().__init__(path, encoding="utf-8")
+        self.io_delay = io_delay
+
+    def emit(self, record: logging.LogRecord) -> None:
+        super().emit(record)
+        if self.io_delay:
+            time.sleep(self.io_delay)
+
+
+def handlers(directory: Path, io_delay: float) -> list[logging.Handler]:
+    formatter = logging.Formatter(FORMAT)
+    file_handler = SlowFileHandler(directory / "app.log", io_delay)
+    console_handler = logging.StreamHandler(open(directory / "console.log", "w", encoding="utf-8"))
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    return [file_handler, console_handler]
+
+
+async def run(mode: str, args: argparse.Namespace, directory: Path) -> None:
+    logger = logging.getLogger(f"bench_{mode}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    listener = None
+    if mode == "sync":
+        for handler in handlers(directory, args.io_delay):
+            handler.addFilter(RequestIdFilter())
+            logger.addHandler(handler)
+    else:
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        if args.sample_info < 1:
+            queue_handler.addFilter(SamplingFilter({logging.INFO: args.sample_info}))
+        queue_handler.addFilter(RequestIdFilter())
+        logger.addHandler(queue_handler)
+        listener = QueueListener(log_queue, *handlers(directory, args.io_delay))
+        listener.start()
+
+    lags: list[float] = []
+    done = False
+
+    async def monitor() -> None:
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+
+    remaining = args.requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            chat_id = remaining
+            if mode == "sync":
+                logger.info(f"Попытка отправки сообщения в чат id={chat_id}")
+                logger.info(f"Сообщение успешно отправлено в чат id={chat_id}, message_id={chat_id * 7}")
+            else:
+                logger.info("Попытка отправки сообщения в чат id=%s", chat_id)
+                logger.info("Сообщение успешно отправлено в чат id=%s, message_id=%s", chat_id, chat_id * 7)
+            await asyncio.sleep(0)
+
+    watcher = asyncio.create_task(monitor())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    done = True
+    await watcher
+    if listener is not None:
+        drain_started = time.perf_counter()
+        listener.stop()
+        drained = time.perf_counter() - drain_started
+    else:
+        drained = 0.0
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    for handler in (listener.handlers if listener is not None else ()):
+        handler.close()
+
+    q = statistics.quantiles(lags, n=100)
+    print(
+        f"{mode:>5}: {args.requests} requests in {elapsed:.2f}s "
+        f"({args.requests / elapsed:.0f} req/s), loop lag "
+        f"p50={q[49] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms max={max(lags) * 1000:.2f}ms, "
+        f"background drain {drained:.2f}s"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    for mode in ("sync", "queue"):
+        with tempfile.TemporaryDirectory() as directory:
+            await run(mode, args, Path(directory))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--io-delay", type=float, default=0.0, help="задержка записи на диск, мс")
+    parser.add_argument("--sample-info", type=float, default=1.0, help="доля сохраняемых INFO в варианте queue")
+    args = parser.parse_args()
+    args.io_delay /= 1000
+    asyncio.run(main(args))
@@ -0,0 +1,81 @@
+"""Чтение страницы истории: ORM-объекты против строк из колонок.
+
+Засевает чат и читает его последние --limit сообщений двумя способами:
+    orm  — select(MessageModels): объекты в identity map сессии;
+    rows — MessageRepository.get_last_messages: select колонок -> MessageRow.
+Для каждого выводит p50/p99 времени страницы и число выделенных блоков
+памяти (tracemalloc) на одну страницу.
+
+Запуск (на отдельной БД, настройки берутся из .env):
+    python -m benchmarks.row_hydration --limit 100 --repeat 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import select, text
+
+from app.database.db import db
+from app.database.models import MessageModels
+from app.repositories.messages import MessageRepository
+
+
+async def orm_page(session, chat_id: int, limit: int) -> list:
+    query = (
+        select(MessageModels)
+        .where(MessageModels.chat_id == chat_id)
+        .order_by(MessageModels.created_at.desc(), MessageModels.id.desc())
+        .limit(limit)
+    )
+    return list((await session.execute(query)).scalars().all())
+
+
+async def rows_page(session, chat_id: int, limit: int) -> list:
+    return await MessageRepository(session).get_last_messages(chat_id, limit)
+
+
+async def measure(name: str, read, chat_id: int, args: argparse.Namespace) -> None:
+    samples: list[float] = []
+    async with db.session_factory() as session:
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            await read(session, chat_id, args.limit)
+            samples.append(time.perf_counter() - started)
+            session.expunge_all()
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        page = await read(session, chat_id, args.limit)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    q = statistics.quantiles(samples, n=100)
+    print(
+        f"{name:>4}: p50={q[49] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms, "
+        f"{blocks} live blocks after reading {len(page)} messages"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with db.engine.begin() as conn:
+        chat_id = (await conn.execute(text("INSERT INTO chat (title) VALUES ('hydration') RETURNING id"))).scalar()
+        await conn.execute(
+            text("INSERT INTO message (chat_id, text) SELECT :chat_id, 'message ' || g FROM generate_series(1, :n) g"),
+            {"chat_id": chat_id, "n": args.limit * 2},
+        )
+    try:
+        await measure("orm", orm_page, chat_id, args)
+        await measure("rows", rows_page, chat_id, args)
+    finally:
+        async with db.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM chat WHERE id = :id"), {"id": chat_id})
+        await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
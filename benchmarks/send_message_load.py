@@ -0,0 +1,55 @@
+"""Нагрузочный тест POST /chats/{id}/messages/.
+
+Гоняет приложение в процессе (httpx + ASGITransport) против настроенной БД
+и выводит messages/sec и p50/p99 задержки. Для сравнения "до/после"
+запускается на двух ревизиях репозитория с одинаковыми параметрами.
+
+Запуск:
+    python -m benchmarks.send_message_load --concurrency 50 --messages 20000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.database.db import db
+from app.main import app
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        chat_id = (await client.post("/chats/", json={"title": "load test"})).json()["id"]
+        latencies: list[float] = []
+        remaining = args.messages
+
+        async def sender() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                resp = await client.post(f"/chats/{chat_id}/messages/", json={"text": "x" * args.size})
+                latencies.append(time.perf_counter() - started)
+                assert resp.status_code == 201, resp.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(sender() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        q = statistics.quantiles(latencies, n=100)
+        print(
+            f"{len(latencies)} messages, concurrency={args.concurrency}: "
+            f"{len(latencies) / elapsed:.0f} msg/s, "
+            f"p50={q[49] * 1000:.2f}ms p99={q[98] * 1000:.2f}ms"
+        )
+        await client.delete(f"/chats/{chat_id}")
+    await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
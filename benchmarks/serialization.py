@@ -0,0 +1,76 @@
+"""Стоимость сериализации страницы истории из 100 сообщений.
+
+Сравнивает без БД и сети два способа превратить чат и 100 сообщений в тело
+ответа GET /chats/{id}:
+    pydantic — как раньше: ORM-объекты -> ChatWithMessagesResponseSchema
+               (from_attributes), повторная валидация по response_model,
+               jsonable_encoder и JSONResponse, как это делает FastAPI;
+    orjson   — строки из колонок (MessageRow) -> encode_chat_page -> байты.
+
+Запуск:
+    python -m benchmarks.serialization --messages 100 --repeat 2000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.database.models import ChatModels, MessageModels
+from app.repositories.rows import ChatRow, MessageRow
+from app.schemas.encoders import encode_chat_page
+from app.schemas.responses import ChatWithMessagesResponseSchema
+
+
+def pydantic_page(chat: ChatModels, messages: list[MessageModels]) -> bytes:
+    page = ChatWithMessagesResponseSchema(
+        id=chat.id,
+        title=chat.title,
+        created_at=chat.created_at,
+        messages=messages,
+        next_cursor="cursor",
+        prev_cursor="cursor",
+    )
+    validated = ChatWithMessagesResponseSchema.model_validate(page.model_dump())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def orjson_page(chat: ChatRow, rows: list[MessageRow]) -> bytes:
+    return encode_chat_page(chat, rows, next_cursor="cursor", prev_cursor="cursor")
+
+
+def run(name: str, func, args: argparse.Namespace, *func_args) -> float:
+    for _ in range(min(args.repeat, 100)):
+        func(*func_args)
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        func(*func_args)
+    per_page = (time.perf_counter() - started) / args.repeat
+    print(f"{name:>8}: {per_page * 1e6:8.1f} us/page, {1 / per_page:8.0f} pages/s")
+    return per_page
+
+
+def main(args: argparse.Namespace) -> None:
+    now = datetime.now(timezone.utc)
+    chat = ChatModels(id=1, title="benchmark", created_at=now)
+    values = [
+        (i, 1, f"message number {i} " + "x" * args.size, now - timedelta(seconds=i))
+        for i in range(args.messages)
+    ]
+    orm_messages = [MessageModels(**MessageRow._make(value)._asdict()) for value in values]
+    rows = [MessageRow._make(value) for value in values]
+    chat_row = ChatRow(chat.id, chat.title, chat.created_at)
+
+    assert pydantic_page(chat, orm_messages) == orjson_page(chat_row, rows)
+    before = run("pydantic", pydantic_page, args, chat, orm_messages)
+    after = run("orjson", orjson_page, args, chat_row, rows)
+    print(f"{args.messages} messages per page: {before / after:.1f}x faster")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--size", type=int, default=100, help="длина текста сообщения")
+    parser.add_argument("--repeat", type=int, default=2000)
+    main(parser.parse_args())
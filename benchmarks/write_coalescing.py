@@ -0,0 +1,74 @@
+"""Групповой коммит одиночных сообщений против транзакции на сообщение.
+
+Каждый из --senders отправителей сохраняет --per-sender сообщений подряд
+в один из --chats чатов:
+    single    — своя единица работы и MessageRepository.send_message (транзакция на сообщение);
+    coalesced — MessageWriteCoalescer.send (одна транзакция на пачку).
+Выводятся messages/sec и p50/p99 задержки одного сообщения, включая
+ожидание соединения из пула.
+
+Запуск (на отдельной БД, настройки берутся из .env):
+    python -m benchmarks.write_coalescing --senders 100 --senders 1000 --senders 10000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.database.db import db
+from app.repositories.unit_of_work import UnitOfWork
+from app.repositories.write_coalescer import MessageWriteCoalescer
+
+
+async def single(chat_id: int, text: str) -> None:
+    async with UnitOfWork(db.session) as uow:
+        await uow.messages.send_message(chat_id, text)
+
+
+async def run(mode: str, senders: int, args: argparse.Namespace, chat_ids: list[int]) -> None:
+    coalescer = MessageWriteCoalescer(db.session_factory, args.max_delay / 1000, args.max_batch)
+    send = coalescer.send if mode == "coalesced" else single
+    latencies: list[float] = []
+
+    async def sender(n: int) -> None:
+        for i in range(args.per_sender):
+            started = time.perf_counter()
+            await send(chat_ids[(n + i) % len(chat_ids)], "x" * args.size)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender(n) for n in range(senders)))
+    elapsed = time.perf_counter() - started
+    await coalescer.close()
+
+    q = statistics.quantiles(latencies, n=100)
+    batches = f", avg batch {coalescer.stats()['avg_batch']}" if mode == "coalesced" else ""
+    print(
+        f"{mode:>9} senders={senders:>5}: {len(latencies) / elapsed:8.0f} msg/s, "
+        f"p50={q[49] * 1000:8.2f}ms p99={q[98] * 1000:8.2f}ms{batches}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with UnitOfWork(db.session) as uow:
+        chat_ids = [(await uow.chats.create_chat(f"coalescing {i}")).id for i in range(args.chats)]
+    try:
+        for senders in args.senders or [100, 1000, 10000]:
+            for mode in ("single", "coalesced"):
+                await run(mode, senders, args, chat_ids)
+    finally:
+        async with UnitOfWork(db.session) as uow:
+            for chat_id in chat_ids:
+                await uow.chats.delete_chat(chat_id)
+        await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--senders", type=int, action="append")
+    parser.add_argument("--per-sender", type=int, default=5)
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--max-delay", type=float, default=2, help="мс")
+    parser.add_argument("--max-batch", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
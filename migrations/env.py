@@ -17,6 +17,21 @@ config.set_main_option("sqlalchemy.url", settings.pg_url + "?async_fallback=True
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Не предлагать в autogenerate удаление объектов, которых нет в моделях
+    намеренно: колонки search_vector с ее индексом и помесячных партиций message.
+    """
+    if reflected and compare_to is None:
+        if type_ == "column" and name == "search_vector":
+            return False
+        if type_ == "index" and name == "ix_message_search_vector":
+            return False
+        if type_ == "table" and name.startswith("message_p"):
+            return False
+    return True
+
+
 
 
 def run_migrations_offline() -> None:
@@ -58,7 +73,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
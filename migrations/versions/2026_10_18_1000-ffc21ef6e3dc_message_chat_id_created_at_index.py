@@ -0,0 +1,33 @@
+"""message chat_id created_at index
+
+Revision ID: ffc21ef6e3dc
+Revises: 8b8de72be8f7
+Create Date: 2026-10-18 10:00:12.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ffc21ef6e3dc'
+down_revision: Union[str, Sequence[str], None] = '8b8de72be8f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_message_chat_id_created_at_id',
+        'message',
+        ['chat_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_chat_id_created_at_id', table_name='message')
@@ -0,0 +1,34 @@
+"""message chat_id on delete cascade
+
+Revision ID: b0321e2ecff2
+Revises: ffc21ef6e3dc
+Create Date: 2026-10-18 11:00:41.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b0321e2ecff2'
+down_revision: Union[str, Sequence[str], None] = 'ffc21ef6e3dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('message_chat_id_fkey', 'message', type_='foreignkey')
+    op.create_foreign_key(
+        'message_chat_id_fkey', 'message', 'chat',
+        ['chat_id'], ['id'],
+        ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('message_chat_id_fkey', 'message', type_='foreignkey')
+    op.create_foreign_key('message_chat_id_fkey', 'message', 'chat', ['chat_id'], ['id'])
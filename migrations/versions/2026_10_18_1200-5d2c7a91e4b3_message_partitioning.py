@@ -0,0 +1,125 @@
+"""message partitioning by created_at
+
+Revision ID: 5d2c7a91e4b3
+Revises: b0321e2ecff2
+Create Date: 2026-10-18 12:00:27.503118
+
+Секционирование включается явно при запуске миграций:
+
+    alembic -x partition_messages=true upgrade head
+
+Тогда таблица message пересоздается секционированной по месяцам created_at
+(первичный ключ становится (id, created_at)), строки копируются одним
+INSERT ... SELECT. Без аргумента миграция ничего не делает. На больших
+таблицах миграция требует окна обслуживания.
+
+Миграция не зависит от кода приложения: вспомогательные функции
+скопированы сюда, чтобы их изменения не меняли уже примененную ревизию.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c7a91e4b3'
+down_revision: Union[str, Sequence[str], None] = 'b0321e2ecff2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PARENT = 'message'
+# Партиции вперед от текущего месяца; дальше их создает обслуживание партиций приложения.
+PREMAKE_MONTHS = 3
+
+
+def partitioning_requested() -> bool:
+    value = context.get_x_argument(as_dictionary=True).get('partition_messages', 'false')
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(start: datetime, months: int) -> datetime:
+    index = start.year * 12 + start.month - 1 + months
+    return start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def create_partition(start: datetime) -> None:
+    quote = op.get_bind().dialect.identifier_preparer.quote_identifier
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS {quote(f'{PARENT}_p{start:%Y_%m}')} PARTITION OF {quote(PARENT)} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    )
+
+
+def is_partitioned() -> bool:
+    kind = op.get_bind().execute(sa.text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('message')")).scalar()
+    return kind == 'p'
+
+
+def rename_message_table(new_name: str) -> None:
+    """Освободить имена таблицы, первичного ключа и индекса message."""
+    op.rename_table('message', new_name)
+    op.execute(f'ALTER TABLE {new_name} RENAME CONSTRAINT message_pkey TO {new_name}_pkey')
+    op.execute(f'ALTER INDEX ix_message_chat_id_created_at_id RENAME TO ix_{new_name}_chat_id_created_at_id')
+    op.execute('ALTER SEQUENCE message_id_seq OWNED BY NONE')
+
+
+def create_message_table(primary_key: list[str], **kwargs) -> None:
+    op.create_table('message',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('message_id_seq')"), nullable=False),
+    sa.Column('chat_id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['chat_id'], ['chat.id'], name='message_chat_id_fkey', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint(*primary_key, name='message_pkey'),
+    **kwargs,
+    )
+    op.execute('ALTER SEQUENCE message_id_seq OWNED BY message.id')
+    op.create_index(
+        'ix_message_chat_id_created_at_id',
+        'message',
+        ['chat_id', 'created_at', 'id'],
+        unique=False,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not partitioning_requested() or is_partitioned():
+        return
+    rename_message_table('message_unpartitioned')
+    create_message_table(['id', 'created_at'], postgresql_partition_by='RANGE (created_at)')
+
+    now = datetime.now(timezone.utc)
+    oldest = op.get_bind().execute(sa.text('SELECT min(created_at) FROM message_unpartitioned')).scalar()
+    start = month_start(oldest or now)
+    last = add_months(month_start(now), PREMAKE_MONTHS)
+    while start <= last:
+        create_partition(start)
+        start = add_months(start, 1)
+
+    op.execute(
+        'INSERT INTO message (id, chat_id, text, created_at) '
+        'SELECT id, chat_id, text, created_at FROM message_unpartitioned'
+    )
+    op.drop_table('message_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not is_partitioned():
+        return
+    rename_message_table('message_partitioned')
+    create_message_table(['id'])
+    op.execute(
+        'INSERT INTO message (id, chat_id, text, created_at) '
+        'SELECT id, chat_id, text, created_at FROM message_partitioned'
+    )
+    op.drop_table('message_partitioned')
@@ -0,0 +1,62 @@
+"""message search_vector with gin index
+
+Revision ID: c41f0e9a7d26
+Revises: 5d2c7a91e4b3
+Create Date: 2026-10-18 13:00:09.184467
+
+Добавляет вычисляемую колонку search_vector = to_tsvector(config, text)
+и GIN-индекс по ней. Конфигурация поиска по умолчанию simple, другая
+задается явно и должна совпадать с SEARCH_CONFIG приложения:
+
+    alembic -x search_config=russian upgrade head
+
+Колонка хранимая, поэтому таблица переписывается целиком; смена
+конфигурации требует пересоздания колонки.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f0e9a7d26'
+down_revision: Union[str, Sequence[str], None] = '5d2c7a91e4b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def search_config_literal() -> str:
+    """Конфигурация поиска из -x search_config, проверенная по pg_ts_config, в виде SQL-литерала."""
+    name = context.get_x_argument(as_dictionary=True).get('search_config', 'simple')
+    literal = op.get_bind().execute(
+        sa.text('SELECT quote_literal(cfgname) FROM pg_ts_config WHERE cfgname = :name'),
+        {'name': name},
+    ).scalar()
+    if literal is None:
+        raise ValueError(f'unknown text search configuration: {name!r}')
+    return literal
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('message', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(f"to_tsvector({search_config_literal()}::regconfig, text)", persisted=True),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_message_search_vector',
+        'message',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_search_vector', table_name='message')
+    op.drop_column('message', 'search_vector')
@@ -0,0 +1,43 @@
+"""chat last_message_at, last_message_id, message_count
+
+Revision ID: 7e93b5d0a1c8
+Revises: c41f0e9a7d26
+Create Date: 2026-10-18 14:00:51.630274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e93b5d0a1c8'
+down_revision: Union[str, Sequence[str], None] = 'c41f0e9a7d26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat', sa.Column('last_message_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('chat', sa.Column('last_message_id', sa.Integer(), nullable=True))
+    op.add_column('chat', sa.Column('message_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute('UPDATE chat SET last_message_at = created_at')
+    op.execute(
+        'UPDATE chat SET last_message_at = last.created_at, last_message_id = last.id, message_count = last.count '
+        'FROM ('
+        '  SELECT DISTINCT ON (chat_id) chat_id, id, created_at, count(*) OVER (PARTITION BY chat_id) AS count '
+        '  FROM message ORDER BY chat_id, created_at DESC, id DESC'
+        ') AS last '
+        'WHERE chat.id = last.chat_id'
+    )
+    op.create_index('ix_chat_last_message_at_id', 'chat', ['last_message_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_last_message_at_id', table_name='chat')
+    op.drop_column('chat', 'message_count')
+    op.drop_column('chat', 'last_message_id')
+    op.drop_column('chat', 'last_message_at')
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.middleware.admission import (
+    READ,
+    WRITE,
+    AdaptiveLimiter,
+    AdmissionController,
+    AdmissionMiddleware,
+)
+
+
+class SlowDatabase:
+    """Замена БД для нагрузочного теста: пул из pool_size соединений, каждый запрос занимает delay секунд."""
+
+    def __init__(self, pool_size: int, delay: float):
+        self.pool = asyncio.Semaphore(pool_size)
+        self.delay = delay
+
+    async def query(self) -> None:
+        async with self.pool:
+            await asyncio.sleep(self.delay)
+
+
+def make_app(database: SlowDatabase, controller: AdmissionController) -> FastAPI:
+    slow_app = FastAPI()
+
+    @slow_app.get("/chats/{id}")
+    async def get_chat(id: int):
+        await database.query()
+        return {"id": id}
+
+    @slow_app.post("/chats/{id}/messages/", status_code=201)
+    async def send_message(id: int):
+        await database.query()
+        return {"chat_id": id}
+
+    slow_app.add_middleware(AdmissionMiddleware, controller=controller)
+    return slow_app
+
+
+def test_requests_are_classified_by_budget():
+    """
+    Проверяет разделение запросов на чтения и записи и маршруты без ограничения
+    """
+    classify = AdmissionController.classify
+    assert classify("GET", "/chats/1") == READ
+    assert classify("GET", "/chats/") == READ
+    assert classify("POST", "/chats/1/messages/") == WRITE
+    assert classify("DELETE", "/chats/1") == WRITE
+    assert classify("GET", "/chats/1/stream") is None
+    assert classify("GET", "/metrics") is None
+
+
+@pytest.mark.asyncio
+async def test_overload_is_shed_with_fast_503():
+    """
+    Проверяет, что при замедлении БД лимит чтений снижается, лишние запросы
+    быстро получают 503 с Retry-After, допущенные не ждут неограниченно,
+    а бюджет записей от перегрузки чтений не страдает
+    """
+    database = SlowDatabase(pool_size=4, delay=0.005)
+    read = AdaptiveLimiter(READ, max_limit=32, min_limit=2, max_queue=16, queue_timeout=0.2)
+    write = AdaptiveLimiter(WRITE, max_limit=8, min_limit=2, max_queue=16, queue_timeout=0.2)
+    controller = AdmissionController(read, write, retry_after=1)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=make_app(database, controller)),
+        base_url="http://test"
+    ) as client:
+
+        for _ in range(30):
+            assert (await client.get("/chats/1")).status_code == 200
+        baseline = read.baseline
+
+        database.delay = 0.05
+
+        async def timed_get() -> tuple[int, str | None, float]:
+            started = time.perf_counter()
+            resp = await client.get("/chats/1")
+            return resp.status_code, resp.headers.get("retry-after"), time.perf_counter() - started
+
+        results, write_resp = await asyncio.gather(
+            asyncio.gather(*(timed_get() for _ in range(300))),
+            client.post("/chats/1/messages/"),
+        )
+
+    served = [elapsed for status, _, elapsed in results if status == 200]
+    shed = [(retry_after, elapsed) for status, retry_after, elapsed in results if status == 503]
+    assert served and shed
+    assert {retry_after for retry_after, _ in shed} == {"1"}
+    # Без ограничения последний из 300 запросов ждал бы 300 / 4 * 0.05 = 3.75 с.
+    assert max(served) < 2.0
+    assert max(elapsed for _, elapsed in shed) < 1.0
+    assert read.limit < read.max_limit
+    assert read.latency > baseline
+    assert write_resp.status_code == 201
+    assert read.in_flight == 0 and write.in_flight == 0
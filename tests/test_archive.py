@@ -0,0 +1,74 @@
+import gzip
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.config import settings
+from app.database.db import db
+from app.main import app
+from app.use_case.archive_chat import ExportChatUseCase
+
+TOKEN = {"X-Admin-Token": "secret"}
+
+
+@pytest.mark.asyncio
+async def test_chat_archive_round_trip(monkeypatch):
+    """
+    Проверяет выгрузку чата в gzip NDJSON и восстановление из архива
+    с сохранением порядка, текстов и времени сообщений
+    """
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "archive_batch_size", 7)
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_id = (await client.post("/chats/", json={"title": "Архив"})).json()["id"]
+        texts = [f"сообщение {i}" for i in range(30)]
+        await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": [{"text": t} for t in texts]})
+        original = (await client.get(f"/chats/{chat_id}?limit=100")).json()
+
+        assert (await client.get(f"/admin/chats/{chat_id}/archive")).status_code == 403
+        assert (await client.get("/admin/chats/999999/archive", headers=TOKEN)).status_code == 404
+
+        archive = await client.get(f"/admin/chats/{chat_id}/archive", headers=TOKEN)
+        assert archive.status_code == 200
+        assert archive.headers["content-type"] == "application/gzip"
+        lines = gzip.decompress(archive.content).splitlines()
+        assert len(lines) == 1 + len(texts)
+
+        restored = await client.post("/admin/chats/import", content=archive.content, headers=TOKEN)
+        assert restored.status_code == 201
+        report = restored.json()
+        assert report["rows"] == len(texts)
+        assert report["chat_id"] != chat_id
+
+        copy = (await client.get(f"/chats/{report['chat_id']}?limit=100")).json()
+        assert copy["title"] == original["title"]
+        assert copy["created_at"] == original["created_at"]
+        assert [(m["text"], m["created_at"]) for m in copy["messages"]] == [
+            (m["text"], m["created_at"]) for m in original["messages"]
+        ]
+
+        broken = await client.post("/admin/chats/import", content=archive.content[:-20], headers=TOKEN)
+        assert broken.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_export_yields_chunks_per_batch(monkeypatch):
+    """
+    Проверяет, что выгрузка отдает архив по частям, а не одним буфером
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Порции"})).json()["id"]
+        texts = [f"{i} " + "x" * 2000 for i in range(200)]
+        await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": [{"text": t} for t in texts]})
+
+    use_case = ExportChatUseCase(db.session_factory, batch_size=50, level=0)
+    chunks = [chunk async for chunk in use_case.export(await use_case.get_chat(chat_id))]
+    assert len(chunks) >= 4
+    assert len(gzip.decompress(b"".join(chunks)).splitlines()) == 1 + len(texts)
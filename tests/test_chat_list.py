@@ -0,0 +1,45 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_chats_listed_by_last_activity_with_counters():
+    """
+    Проверяет список чатов: порядок по последнему сообщению, счетчик
+    и ID последнего сообщения, keyset-пагинацию и некорректный курсор
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        first, second, third = [
+            (await client.post("/chats/", json={"title": title})).json()
+            for title in ("Первый", "Второй", "Третий")
+        ]
+        listed = (await client.get("/chats/", params={"limit": 3})).json()["chats"]
+        assert [chat["id"] for chat in listed] == [third["id"], second["id"], first["id"]]
+        assert listed[0]["message_count"] == 0 and listed[0]["last_message_id"] is None
+        assert listed[0]["last_message_at"] == third["created_at"]
+
+        message = (await client.post(f"/chats/{first['id']}/messages/", json={"text": "Привет"})).json()
+        batch = (await client.post(
+            f"/chats/{second['id']}/messages/batch",
+            json={"messages": [{"text": "раз"}, {"text": "два"}, {"text": "три"}]},
+        )).json()
+
+        page = (await client.get("/chats/", params={"limit": 2})).json()
+        assert [chat["id"] for chat in page["chats"]] == [second["id"], first["id"]]
+        assert page["chats"][0]["message_count"] == 3
+        assert page["chats"][0]["last_message_id"] == batch["ids"][-1]
+        assert page["chats"][1]["message_count"] == 1
+        assert page["chats"][1]["last_message_id"] == message["id"]
+        assert page["chats"][1]["last_message_at"] == message["created_at"]
+
+        rest = (await client.get("/chats/", params={"limit": 2, "cursor": page["next_cursor"]})).json()
+        assert rest["chats"][0]["id"] == third["id"]
+
+        assert (await client.get("/chats/", params={"cursor": "!"})).status_code == 400
+        assert (await client.get("/chats/", params={"limit": 0})).status_code == 422
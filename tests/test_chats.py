@@ -1,6 +1,12 @@
 import pytest
 from httpx import AsyncClient, ASGITransport
+from app.cache.hot_chats import hot_chat_cache
+from app.cache.shared import shared_chat_cache
 from app.main import app
+from app.monitoring.collectors import chat_purges
+from app.realtime.hub import message_hub
+from app.schemas.responses import ChatWithMessagesResponseSchema
+from app.use_case.purge_chat import PurgeChatUseCase
 
 
 @pytest.mark.asyncio
@@ -44,3 +50,167 @@ async def test_create_chat_and_send_message():
             json={"text": "Тест"}
         )
         assert bad_msg_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_chat_history_cursor_pagination():
+    """
+    Проверяет keyset-пагинацию истории чата курсорами before/after
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_resp = await client.post("/chats/", json={"title": "Пагинация"})
+        chat_id = chat_resp.json()["id"]
+        for i in range(25):
+            resp = await client.post(f"/chats/{chat_id}/messages/", json={"text": f"msg {i}"})
+            assert resp.status_code == 201
+
+        first_page = (await client.get(f"/chats/{chat_id}?limit=20")).json()
+        assert [m["text"] for m in first_page["messages"]] == [f"msg {i}" for i in range(24, 4, -1)]
+        assert first_page["next_cursor"] is not None
+
+        second_page = (await client.get(
+            f"/chats/{chat_id}", params={"limit": 20, "before": first_page["next_cursor"]}
+        )).json()
+        assert [m["text"] for m in second_page["messages"]] == [f"msg {i}" for i in range(4, -1, -1)]
+        assert second_page["next_cursor"] is None
+
+        newer_page = (await client.get(
+            f"/chats/{chat_id}", params={"limit": 20, "after": second_page["prev_cursor"]}
+        )).json()
+        assert [m["text"] for m in newer_page["messages"]] == [f"msg {i}" for i in range(24, 4, -1)]
+
+        past_end_page = (await client.get(
+            f"/chats/{chat_id}", params={"limit": 20, "after": first_page["prev_cursor"]}
+        )).json()
+        assert past_end_page["title"] == "Пагинация"
+        assert past_end_page["messages"] == []
+
+        missing_resp = await client.get("/chats/999999999", params={"before": first_page["next_cursor"]})
+        assert missing_resp.status_code == 404
+
+        bad_cursor_resp = await client.get(f"/chats/{chat_id}", params={"before": "garbage"})
+        assert bad_cursor_resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_delete_chat_cascades_messages():
+    """
+    Проверяет удаление чата одним запросом и фоновое удаление порциями
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        for purge in (False, True):
+            chat_id = (await client.post("/chats/", json={"title": "Удаление"})).json()["id"]
+            for i in range(3):
+                await client.post(f"/chats/{chat_id}/messages/", json={"text": f"msg {i}"})
+
+            delete_resp = await client.delete(f"/chats/{chat_id}", params={"purge": purge})
+            assert delete_resp.status_code == (202 if purge else 204)
+
+            get_resp = await client.get(f"/chats/{chat_id}")
+            assert get_resp.status_code == 404
+
+            missing_resp = await client.delete(f"/chats/{chat_id}", params={"purge": purge})
+            assert missing_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_failed_purge_is_counted_in_metrics():
+    """
+    Проверяет, что сбой фонового удаления чата виден в /metrics
+    """
+    def broken_session_factory():
+        raise ConnectionError("БД недоступна")
+
+    use_case = PurgeChatUseCase(None, broken_session_factory, 10, hot_chat_cache, shared_chat_cache, message_hub)
+    await use_case.purge(999999)
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        body = (await client.get("/metrics")).text
+    assert chat_purges._values[("failed",)] >= 1
+    assert 'chat_purges_total{result="failed"' in body
+
+
+@pytest.mark.asyncio
+async def test_send_messages_batch():
+    """
+    Проверяет пакетную загрузку сообщений в чат
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_id = (await client.post("/chats/", json={"title": "Пачка"})).json()["id"]
+        batch = {"messages": [{"text": f"msg {i}"} for i in range(30)]}
+
+        batch_resp = await client.post(f"/chats/{chat_id}/messages/batch", json=batch)
+        assert batch_resp.status_code == 201
+        ids = batch_resp.json()["ids"]
+        assert len(ids) == 30
+        assert ids == sorted(ids)
+
+        get_resp = await client.get(f"/chats/{chat_id}?limit=30")
+        assert [m["id"] for m in get_resp.json()["messages"]] == ids[::-1]
+
+        empty_resp = await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": []})
+        assert empty_resp.status_code == 422
+
+        invalid_resp = await client.post(
+            f"/chats/{chat_id}/messages/batch",
+            json={"messages": [{"text": "ok"}, {"text": ""}]}
+        )
+        assert invalid_resp.status_code == 422
+
+        missing_resp = await client.post("/chats/999999/messages/batch", json=batch)
+        assert missing_resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics():
+    """
+    Проверяет эндпоинт статистики пула соединений
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        await client.post("/chats/", json={"title": "Пул"})
+        resp = await client.get("/metrics/pool")
+        assert resp.status_code == 200
+        stats = resp.json()
+        assert stats["acquired"] >= 1
+        assert {"size", "checked_out", "overflow", "timeouts", "wait_max_ms"} <= stats.keys()
+
+
+@pytest.mark.asyncio
+async def test_chat_page_matches_response_schema():
+    """
+    Проверяет, что страница, закодированная без Pydantic, совпадает с сериализацией схемы ответа
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_id = (await client.post("/chats/", json={"title": "Схема"})).json()["id"]
+        await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": [{"text": "раз"}, {"text": "два"}]})
+
+        resp = await client.get(f"/chats/{chat_id}?limit=20")
+        assert resp.headers["content-type"] == "application/json"
+        page = ChatWithMessagesResponseSchema.model_validate_json(resp.content)
+        assert resp.content == page.model_dump_json().encode()
+        assert [message.text for message in page.messages] == ["два", "раз"]
+
+        schema = app.openapi()["paths"]["/chats/{id}"]["get"]["responses"]["200"]["content"]["application/json"]
+        assert schema["schema"]["$ref"].endswith("/ChatWithMessagesResponseSchema")
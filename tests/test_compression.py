@@ -0,0 +1,91 @@
+import gzip
+
+import orjson
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.cache.encoded_pages import EncodedPageCache, encoded_page_cache
+from app.main import app
+from app.schemas import compression
+from app.schemas.compression import GZIP, ZSTD, negotiate_encoding
+
+
+def test_accept_encoding_is_negotiated():
+    """
+    Проверяет выбор сжатия по Accept-Encoding с учетом q и отсутствия zstandard
+    """
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == GZIP
+    assert negotiate_encoding("gzip;q=0, br") is None
+    assert negotiate_encoding("*") == compression.AVAILABLE_ENCODINGS[0]
+    expected = ZSTD if compression.zstandard is not None else GZIP
+    assert negotiate_encoding("gzip;q=0.5, zstd") == expected
+    assert negotiate_encoding("zstd;q=0.5, gzip") == GZIP
+
+
+def test_encoded_page_cache_is_bounded():
+    """
+    Проверяет, что кэш готовых страниц вытесняет старые тела по LRU и не хранит слишком большие
+    """
+    cache = EncodedPageCache(max_bytes=1500, max_entry_bytes=500)
+    cache.put('"1"', GZIP, b"a" * 400, GZIP)
+    cache.put('"2"', None, b"b" * 400, None)
+    assert cache.get('"1"', GZIP) == (b"a" * 400, GZIP)
+    cache.put('"3"', GZIP, b"c" * 400, GZIP)
+    cache.put('"4"', GZIP, b"d" * 600, GZIP)
+    assert cache.get('"2"', None) is None and cache.get('"4"', GZIP) is None
+    assert cache.get('"1"', None) is None
+    assert cache.stats()["pages"] == 2 and cache.size <= cache.max_bytes
+
+
+@pytest.mark.asyncio
+async def test_large_history_page_is_compressed_once():
+    """
+    Проверяет, что большая страница истории сжимается gzip по Accept-Encoding,
+    повторный запрос отдает то же готовое тело из кэша, ETag сжатого
+    представления принимается в If-None-Match, а без Accept-Encoding
+    и для маленьких страниц тело не сжимается
+    """
+    encoded_page_cache.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Сжатие"})).json()["id"]
+        small = await client.get(f"/chats/{chat_id}", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+        assert small.headers["vary"] == "Accept-Encoding"
+
+        await client.post(
+            f"/chats/{chat_id}/messages/batch",
+            json={"messages": [{"text": f"{i} " + "сообщение " * 400} for i in range(30)]},
+        )
+        hits = encoded_page_cache.hits
+        raw = []
+        for _ in range(2):
+            async with client.stream("GET", f"/chats/{chat_id}?limit=30", headers={"Accept-Encoding": "gzip"}) as resp:
+                raw.append((resp.headers, b"".join([chunk async for chunk in resp.aiter_raw()])))
+        (headers, body), (_, cached_body) = raw
+        assert headers["content-encoding"] == "gzip"
+        assert headers["etag"].endswith('+gzip"')
+        assert cached_body == body
+        assert encoded_page_cache.hits == hits + 1
+        page = orjson.loads(gzip.decompress(body))
+        assert len(page["messages"]) == 30
+        assert len(body) * 10 < len(gzip.decompress(body))
+
+        resp = await client.get(f"/chats/{chat_id}?limit=30", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in resp.headers and resp.json() == page
+        assert f'{resp.headers["etag"][:-1]}+gzip"' == headers["etag"]
+
+        resp = await client.get(
+            f"/chats/{chat_id}?limit=30",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": headers["etag"]},
+        )
+        assert resp.status_code == 304 and resp.headers["etag"] == headers["etag"]
+
+        await client.post(f"/chats/{chat_id}/messages/", json={"text": "новое"})
+        resp = await client.get(f"/chats/{chat_id}?limit=30", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["etag"] != headers["etag"]
+        assert resp.json()["messages"][0]["text"] == "новое"
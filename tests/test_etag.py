@@ -0,0 +1,77 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.cache.hot_chats import hot_chat_cache
+from app.cache.shared import shared_chat_cache
+from app.database.db import db
+from app.main import app
+from app.repositories.unit_of_work import UnitOfWork
+
+
+@pytest.mark.asyncio
+async def test_unchanged_chat_page_is_not_modified():
+    """
+    Проверяет, что первая страница истории отдается с ETag, повторный запрос
+    с If-None-Match получает 304 без тела и без чтения сообщений, а новое
+    сообщение или другой limit меняют ETag
+    """
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "ETag"})).json()["id"]
+        await client.post(f"/chats/{chat_id}/messages/", json={"text": "Первое"})
+
+        resp = await client.get(f"/chats/{chat_id}?limit=20")
+        etag = resp.headers["etag"]
+        assert resp.status_code == 200 and etag.startswith('"')
+
+        event.listen(db.engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            resp = await client.get(f"/chats/{chat_id}?limit=20", headers={"If-None-Match": etag})
+        finally:
+            event.remove(db.engine.sync_engine, "before_cursor_execute", listener)
+        assert resp.status_code == 304 and resp.content == b""
+        assert resp.headers["etag"] == etag
+        assert not any("message" in statement for statement in statements)
+
+        assert (await client.get(f"/chats/{chat_id}", headers={"If-None-Match": f'W/{etag}, "x"'})).status_code == 304
+        other_limit = await client.get(f"/chats/{chat_id}?limit=30", headers={"If-None-Match": etag})
+        assert other_limit.status_code == 200 and other_limit.headers["etag"] != etag
+
+        await client.post(f"/chats/{chat_id}/messages/", json={"text": "Второе"})
+        resp = await client.get(f"/chats/{chat_id}?limit=20", headers={"If-None-Match": etag})
+        assert resp.status_code == 200 and resp.headers["etag"] != etag
+        assert [m["text"] for m in resp.json()["messages"]] == ["Второе", "Первое"]
+
+        cursor = resp.json()["next_cursor"] or resp.json()["prev_cursor"]
+        older = await client.get(f"/chats/{chat_id}?before={cursor}", headers={"If-None-Match": "*"})
+        assert older.status_code == 200 and "etag" not in older.headers
+
+        assert (await client.get("/chats/999999", headers={"If-None-Match": "*"})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_etag_changes_when_history_is_purged():
+    """
+    Проверяет, что удаление сообщений меняет ETag, хотя новых сообщений не было
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Очистка"})).json()["id"]
+        await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": [{"text": "раз"}, {"text": "два"}]})
+        etag = (await client.get(f"/chats/{chat_id}")).headers["etag"]
+
+        async with UnitOfWork(db.session) as uow:
+            await uow.messages.delete_messages_batch(chat_id, 1)
+        hot_chat_cache.evict(chat_id)
+        await shared_chat_cache.invalidate(chat_id)
+
+        resp = await client.get(f"/chats/{chat_id}", headers={"If-None-Match": etag})
+        assert resp.status_code == 200 and resp.headers["etag"] != etag
+        assert len(resp.json()["messages"]) == 1
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.cache.hot_chats import HotChatCache
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def message(id: int, text: str = "x", created_at: datetime | None = None) -> SimpleNamespace:
+    return SimpleNamespace(id=id, text=text, created_at=created_at or EPOCH + timedelta(seconds=id))
+
+
+def make_cache(**kwargs) -> HotChatCache:
+    options = dict(max_chats=10, max_messages=3, ttl=60, max_bytes=10 ** 6)
+    options.update(kwargs)
+    return HotChatCache(**options)
+
+
+def test_serves_pages_from_ring_buffer():
+    """
+    Проверяет выдачу из кольцевого буфера и сквозную запись
+    """
+    cache = make_cache()
+    chat = SimpleNamespace(id=1)
+    cache.put(1, chat, [message(2), message(1)], cache.fill_token())
+
+    assert cache.get(1, 3) == (chat, [message(2), message(1)])
+
+    cache.append(1, message(3))
+    cache.append(1, message(4))
+    assert cache.get(1, 3)[1] == [message(4), message(3), message(2)]
+    assert cache.stats()["hits"] == 2
+
+    cache.evict(1)
+    assert cache.get(1, 1) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_incomplete_buffer_misses_for_larger_limit():
+    """
+    Проверяет, что неполный буфер не отдает больше сообщений, чем хранит
+    """
+    cache = make_cache(max_messages=2)
+    cache.put(1, SimpleNamespace(id=1), [message(3), message(2), message(1)], cache.fill_token())
+    assert cache.get(1, 2) is not None
+    assert cache.get(1, 3) is None
+
+
+def test_out_of_order_commit_evicts_chat():
+    """
+    Проверяет, что сообщение, зафиксированное позже более нового
+    (меньший created_at), не дописывается в начало буфера, а вытесняет чат
+    """
+    cache = make_cache()
+    cache.put(1, SimpleNamespace(id=1), [message(2), message(1)], cache.fill_token())
+    cache.append(1, message(4, created_at=EPOCH + timedelta(seconds=3)))
+    cache.append(1, message(3, created_at=EPOCH + timedelta(seconds=2)))
+    assert cache.get(1, 1) is None
+    assert cache.stats()["chats"] == 0
+
+
+def test_stale_fill_is_discarded():
+    """
+    Проверяет, что заполнение после промаха не затирает более новую запись
+    """
+    cache = make_cache()
+    token = cache.fill_token()
+    cache.append(1, message(5))
+    cache.put(1, SimpleNamespace(id=1), [message(4)], token)
+    assert cache.get(1, 1) is None
+
+
+def test_lru_and_memory_cap():
+    """
+    Проверяет вытеснение по количеству чатов и по памяти
+    """
+    cache = make_cache(max_chats=2)
+    for chat_id in (1, 2, 3):
+        cache.put(chat_id, SimpleNamespace(id=chat_id), [message(chat_id)], cache.fill_token())
+    assert cache.get(1, 1) is None
+    assert cache.stats()["evictions"] == 1
+
+    cache = make_cache(max_bytes=2000)
+    cache.put(1, SimpleNamespace(id=1), [message(1, "a" * 1000)], cache.fill_token())
+    cache.put(2, SimpleNamespace(id=2), [message(2, "b" * 1000)], cache.fill_token())
+    assert cache.get(1, 1) is None
+    assert cache.stats()["size_bytes"] <= 2000
@@ -0,0 +1,55 @@
+import json
+import logging
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.logs.logger import JsonFormatter, RequestIdFilter, SamplingFilter, request_id
+from app.main import app
+
+
+def make_record(level: int, msg: str, *args) -> logging.LogRecord:
+    return logging.LogRecord("app_logger", level, __file__, 1, msg, args, None)
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_returned_and_generated():
+    """
+    Проверяет, что ID запроса из заголовка возвращается клиенту, а без заголовка генерируется
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        resp = await client.post("/chats/", json={"title": "Логи"}, headers={"X-Request-ID": "abc-123"})
+        assert resp.headers["x-request-id"] == "abc-123"
+
+        resp = await client.get("/metrics/pool", headers={"X-Request-ID": "bad\nid"})
+        assert resp.headers["x-request-id"] != "bad\nid"
+        assert len(resp.headers["x-request-id"]) == 32
+
+
+def test_json_format_carries_request_id():
+    """
+    Проверяет, что сообщение собирается лениво и JSON содержит ID запроса
+    """
+    token = request_id.set("req-1")
+    try:
+        record = make_record(logging.INFO, "чат id=%s", 7)
+        RequestIdFilter().filter(record)
+    finally:
+        request_id.reset(token)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "чат id=7"
+    assert entry["request_id"] == "req-1"
+    assert entry["level"] == "INFO"
+
+
+def test_sampling_filter_thins_only_configured_levels():
+    """
+    Проверяет, что прореживаются только записи уровней из настройки
+    """
+    sampler = SamplingFilter({logging.INFO: 0.0})
+    assert not sampler.filter(make_record(logging.INFO, "info"))
+    assert sampler.filter(make_record(logging.WARNING, "warning"))
@@ -0,0 +1,69 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.monitoring.collectors import Histogram, Metric, Registry
+from app.monitoring.sql import statement_operation
+
+
+@pytest.mark.asyncio
+async def test_prometheus_metrics_endpoint():
+    """
+    Проверяет, что /metrics отдает метрики запросов по шаблону маршрута и время SQL-запросов
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_id = (await client.post("/chats/", json={"title": "Метрики"})).json()["id"]
+        await client.get(f"/chats/{chat_id}")
+        await client.get("/chats/999999999")
+
+        resp = await client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = resp.text
+        assert 'http_requests_total{method="GET",route="/chats/{id}",status="200"' in body
+        assert 'http_requests_total{method="GET",route="/chats/{id}",status="404"' in body
+        assert f"/chats/{chat_id}" not in body
+        assert 'db_statement_duration_seconds_count{operation="INSERT"' in body
+        assert 'db_pool_connections{state="checked_out"' in body
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    Проверяет накопленные корзины, сумму и количество гистограммы
+    """
+    registry = Registry(constant_labels={"worker": "1"})
+    histogram = registry.register(Histogram("latency_seconds", "Задержка.", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{route="/a",le="0.1",worker="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1",worker="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf",worker="1"} 4' in lines
+    assert 'latency_seconds_count{route="/a",worker="1"} 4' in lines
+    assert 'latency_seconds_sum{route="/a",worker="1"} 3.65' in lines
+
+
+def test_metric_without_samples_cannot_be_created():
+    """
+    Проверяет, что метрика без samples() падает при создании, а не при сборе /metrics
+    """
+    class Incomplete(Metric):
+        type = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Без выборок.")
+
+
+def test_statement_operation_uses_first_word():
+    """
+    Проверяет определение типа запроса, включая CTE (WITH) и пустой запрос
+    """
+    assert statement_operation("WITH inserted AS (INSERT INTO message ...) UPDATE chat ...") == "WITH"
+    assert statement_operation("\n  select 1") == "SELECT"
+    assert statement_operation("INSERT\nINTO chat") == "INSERT"
+    assert statement_operation("SAVEPOINT sa_1") == "OTHER"
+    assert statement_operation("   ") == "OTHER"
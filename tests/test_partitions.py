@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+
+from app.cache.encoded_pages import encoded_page_cache
+from app.cache.hot_chats import hot_chat_cache
+from app.database.db import db
+from app.database.partitions import (
+    PartitionManager,
+    add_months,
+    create_partition_sql,
+    expired_partitions,
+    month_start,
+)
+from app.main import app
+from app.repositories.messages import MessageRepository
+
+
+async def make_chat(days_ago: list[int]) -> int:
+    """
+    Чат с сообщениями, созданными days_ago дней назад (по одному на значение).
+    Если таблица секционирована, недостающие партиции прошлых месяцев создаются.
+    """
+    async with db.engine.begin() as conn:
+        kind = await conn.scalar(text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass('message')"))
+        if kind == "p":
+            now = datetime.now(timezone.utc)
+            for start in {month_start(now - timedelta(days=days)) for days in days_ago}:
+                await conn.execute(text(create_partition_sql(start)))
+        chat_id = (await conn.execute(text("INSERT INTO chat (title) VALUES ('partitions') RETURNING id"))).scalar()
+        await conn.execute(
+            text("INSERT INTO message (chat_id, text, created_at) VALUES (:chat_id, :text, now() - make_interval(days => :days))"),
+            [{"chat_id": chat_id, "text": f"{days} дней назад", "days": days} for days in days_ago],
+        )
+    return chat_id
+
+
+def test_month_arithmetic_and_expired_partitions():
+    """
+    Проверяет границы месяцев, DDL партиции и выбор партиций, целиком старше отсечки
+    """
+    start = month_start(datetime(2026, 12, 15, 10, tzinfo=timezone.utc))
+    assert start == datetime(2026, 12, 1, tzinfo=timezone.utc)
+    assert add_months(start, 1) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+    assert add_months(start, -12) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert create_partition_sql(start).startswith('CREATE TABLE IF NOT EXISTS "message_p2026_12" PARTITION OF "message" ')
+
+    names = ["message_p2026_10", "message_p2026_08", "message_p2026_09", "message_default"]
+    cutoff = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    assert expired_partitions(names, cutoff) == ["message_p2026_08", "message_p2026_09"]
+
+
+@pytest.mark.asyncio
+async def test_recent_window_falls_back_to_older_messages(monkeypatch):
+    """
+    Проверяет, что страница из окна новейших партиций дочитывается
+    более старыми сообщениями, если их не хватило
+    """
+    monkeypatch.setattr(MessageRepository, "recent_window", timedelta(days=10))
+    chat_id = await make_chat([1, 5, 40, 100])
+    try:
+        async with db.session() as session:
+            repo = MessageRepository(session)
+            texts = [m.text for m in await repo.get_last_messages(chat_id, limit=3)]
+            assert texts == ["1 дней назад", "5 дней назад", "40 дней назад"]
+
+            chat, messages = await repo.get_chat_page(chat_id, limit=10)
+            assert [m.text for m in messages] == ["1 дней назад", "5 дней назад", "40 дней назад", "100 дней назад"]
+
+            # Курсор сдвигает окно: старше 5 дней -> 40 и 100.
+            page = await repo.get_last_messages(chat_id, limit=10, before=messages[1])
+            assert [m.text for m in page] == ["40 дней назад", "100 дней назад"]
+    finally:
+        async with db.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM chat WHERE id = :id"), {"id": chat_id})
+
+
+@pytest.mark.asyncio
+async def test_chat_retention_deletes_only_expired_messages_of_that_chat():
+    """
+    Проверяет, что срок хранения чата удаляет его старые сообщения порциями,
+    не трогая новые сообщения и другие чаты
+    """
+    short, other = await make_chat([1, 20, 30, 40]), await make_chat([1, 40])
+    manager = PartitionManager(
+        engine=db.engine,
+        premake=1,
+        retention_days=0,
+        retention_mode="drop",
+        chat_retention_days={short: 10},
+        batch_size=2,
+        interval=3600,
+    )
+    try:
+        await manager.run_once()
+        assert manager.stats()["messages_expired"] == 3
+        async with db.session() as session:
+            repo = MessageRepository(session)
+            assert [m.text for m in await repo.get_last_messages(short, limit=10)] == ["1 дней назад"]
+            assert len(await repo.get_last_messages(other, limit=10)) == 2
+    finally:
+        async with db.engine.begin() as conn:
+            await conn.execute(text("DELETE FROM chat WHERE id IN (:a, :b)"), {"a": short, "b": other})
+
+
+@pytest.mark.asyncio
+async def test_expiring_newest_message_recomputes_chat_activity():
+    """
+    Проверяет, что удаление по сроку хранения последнего сообщения чата
+    пересчитывает последнее сообщение в списке чатов и ETag истории
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat = (await client.post("/chats/", json={"title": "Истекает"})).json()
+        kept = (await client.post(f"/chats/{chat['id']}/messages/", json={"text": "останется"})).json()
+        expired = (await client.post(f"/chats/{chat['id']}/messages/", json={"text": "истечет"})).json()
+        async with db.engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE message SET created_at = now() - interval '30 days' WHERE id = :id"),
+                {"id": expired["id"]},
+            )
+        manager = PartitionManager(
+            engine=db.engine,
+            premake=1,
+            retention_days=0,
+            retention_mode="drop",
+            chat_retention_days={chat["id"]: 10},
+            batch_size=10,
+            interval=3600,
+        )
+        assert await manager.expire_chat_messages() == 1
+
+        listed = {c["id"]: c for c in (await client.get("/chats/?limit=100")).json()["chats"]}[chat["id"]]
+        assert listed["message_count"] == 1
+        assert listed["last_message_id"] == kept["id"]
+        assert listed["last_message_at"] == kept["created_at"]
+
+        hot_chat_cache.evict(chat["id"])
+        etag = (await client.get(f"/chats/{chat['id']}")).headers["etag"]
+        hot_chat_cache.evict(chat["id"])
+        resp = await client.get(f"/chats/{chat['id']}", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+        async with db.engine.begin() as conn:
+            await conn.execute(text("UPDATE message SET created_at = now() - interval '30 days'"
+                                    " WHERE chat_id = :id"), {"id": chat["id"]})
+        assert await manager.expire_chat_messages() == 1
+        listed = {c["id"]: c for c in (await client.get("/chats/?limit=100")).json()["chats"]}[chat["id"]]
+        assert listed["message_count"] == 0 and listed["last_message_id"] is None
+        assert listed["last_message_at"] == chat["created_at"]
+
+
+@pytest.mark.asyncio
+async def test_expired_messages_are_evicted_from_caches():
+    """
+    Проверяет, что сообщения, удаленные по сроку хранения чата, сразу
+    пропадают из кэша активных чатов и кэша готовых страниц
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Кэш и сроки"})).json()["id"]
+        await client.post(f"/chats/{chat_id}/messages/", json={"text": "новое"})
+        expired = (await client.post(f"/chats/{chat_id}/messages/", json={"text": "удалить"})).json()
+        async with db.engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE message SET created_at = now() - interval '30 days' WHERE id = :id"),
+                {"id": expired["id"]},
+            )
+        hot_chat_cache.evict(chat_id)
+        assert len((await client.get(f"/chats/{chat_id}")).json()["messages"]) == 2
+        assert hot_chat_cache.get(chat_id, 20) is not None
+        assert any(etag.startswith(f'"{chat_id}.') for etag, _ in encoded_page_cache._entries)
+
+        manager = PartitionManager(
+            engine=db.engine,
+            premake=1,
+            retention_days=0,
+            retention_mode="drop",
+            chat_retention_days={chat_id: 10},
+            batch_size=10,
+            interval=3600,
+        )
+        assert await manager.expire_chat_messages() == 1
+        assert hot_chat_cache.get(chat_id, 20) is None
+        assert not any(etag.startswith(f'"{chat_id}.') for etag, _ in encoded_page_cache._entries)
+        assert [m["text"] for m in (await client.get(f"/chats/{chat_id}")).json()["messages"]] == ["новое"]
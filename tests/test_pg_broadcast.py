@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import make_url
+
+from app.config import settings
+from app.database.db import db
+from app.main import app
+from app.realtime.hub import MessageHub, message_hub
+from app.realtime.pg_broadcast import PostgresBroadcaster
+
+pytestmark = pytest.mark.skipif(
+    make_url(settings.pg_url).get_backend_name() != "postgresql",
+    reason="LISTEN/NOTIFY есть только в PostgreSQL",
+)
+
+
+def broadcaster(hub: MessageHub) -> PostgresBroadcaster:
+    return PostgresBroadcaster(
+        dsn=make_url(settings.pg_url).set(drivername="postgresql").render_as_string(hide_password=False),
+        hub=hub,
+        session_factory=db.session_factory,
+        interval=0.01,
+    )
+
+
+async def next_event(subscription) -> str:
+    return (await asyncio.wait_for(subscription.queue.get(), 5)).data
+
+
+def event_text(event: str) -> str:
+    data = next(line for line in event.splitlines() if line.startswith("data: "))
+    return json.loads(data[len("data: "):])["text"]
+
+
+@pytest.mark.asyncio
+async def test_messages_reach_subscribers_of_another_worker():
+    """
+    Проверяет, что сообщения, принятые одним воркером, доходят до подписчиков другого:
+    обычные — в самом уведомлении, крупные — по ID с дочитыванием из БД
+    """
+    other_hub = MessageHub(queue_size=16)
+    first, second = broadcaster(message_hub), broadcaster(other_hub)
+    await first.start()
+    await second.start()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+
+            chat_id = (await client.post("/chats/", json={"title": "Воркеры"})).json()["id"]
+            subscription = other_hub.subscribe(chat_id)
+
+            await client.post(f"/chats/{chat_id}/messages/", json={"text": "привет"})
+            assert event_text(await next_event(subscription)) == "привет"
+
+            texts = [f"пачка {i}" for i in range(3)]
+            await client.post(
+                f"/chats/{chat_id}/messages/batch",
+                json={"messages": [{"text": text} for text in texts]},
+            )
+            assert [event_text(await next_event(subscription)) for _ in texts] == texts
+
+            large = "я" * 5000
+            await client.post(f"/chats/{chat_id}/messages/", json={"text": large})
+            assert event_text(await next_event(subscription)) == large
+
+            await client.delete(f"/chats/{chat_id}")
+            assert (await next_event(subscription)).startswith("event: deleted")
+            assert not other_hub.has_subscribers(chat_id)
+    finally:
+        await first.close()
+        await second.close()
+
+    assert message_hub.relay is None
+    assert second.stats()["received"] >= 4
+
+
+@pytest.mark.asyncio
+async def test_large_messages_keep_their_order():
+    """
+    Проверяет, что сообщение, дочитываемое по ID, доходит до подписчиков
+    другого воркера в исходном порядке пачки, а close() не оставляет задач дочитывания
+    """
+    other_hub = MessageHub(queue_size=16)
+    first, second = broadcaster(message_hub), broadcaster(other_hub)
+    await first.start()
+    await second.start()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            chat_id = (await client.post("/chats/", json={"title": "Порядок"})).json()["id"]
+            subscription = other_hub.subscribe(chat_id)
+            texts = ["до", "я" * 5000, "после", "ю" * 5000, "в конце"]
+            await client.post(
+                f"/chats/{chat_id}/messages/batch",
+                json={"messages": [{"text": text} for text in texts]},
+            )
+            assert [event_text(await next_event(subscription)) for _ in texts] == texts
+    finally:
+        await first.close()
+        await second.close()
+    assert not second._dispatches and not second._backlog
+
+
+@pytest.mark.asyncio
+async def test_malformed_notifications_are_counted_and_skipped():
+    """
+    Проверяет, что чужие и поврежденные NOTIFY в канале не ломают прием:
+    они учитываются как ошибки разбора, а следующие сообщения доходят
+    """
+    other_hub = MessageHub(queue_size=16)
+    first, second = broadcaster(message_hub), broadcaster(other_hub)
+    await first.start()
+    await second.start()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            chat_id = (await client.post("/chats/", json={"title": "Мусор"})).json()["id"]
+            subscription = other_hub.subscribe(chat_id)
+            payloads = ["не json", "[1, 2]", '{"c": 1}', json.dumps({"o": "x", "c": chat_id, "m": [{"id": "?"}]})]
+            await first._connection.executemany("SELECT pg_notify($1, $2)", [("chat_messages", p) for p in payloads])
+
+            await client.post(f"/chats/{chat_id}/messages/", json={"text": "после мусора"})
+            assert event_text(await next_event(subscription)) == "после мусора"
+    finally:
+        await first.close()
+        await second.close()
+    assert second.stats()["receive_errors"] == len(payloads)
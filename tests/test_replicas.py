@@ -0,0 +1,117 @@
+from collections import Counter
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.cache.hot_chats import hot_chat_cache
+from app.config import settings
+from app.database.db import Database
+from app.dependencies import repositories
+from app.main import app
+
+
+def make_replica_db() -> tuple[Database, Counter]:
+    """
+    База с двумя "репликами" — отдельными пулами к той же тестовой БД.
+    Счетчик показывает, сколько раз соединение бралось из каждой реплики.
+    """
+    replica_db = Database(url=settings.pg_url, echo=False, replica_urls=[settings.pg_url, settings.pg_url])
+    checkouts = Counter()
+    for i, engine in enumerate(replica_db.replica_engines):
+        event.listen(engine.sync_engine, "checkout", lambda *args, i=i: checkouts.update([i]))
+    return replica_db, checkouts
+
+
+@pytest.mark.asyncio
+async def test_reads_are_spread_over_replicas():
+    """
+    Проверяет, что чтения распределяются по репликам, а запись идет в основную БД,
+    и ожидание соединений учитывается отдельно для каждого пула
+    """
+    replica_db, checkouts = make_replica_db()
+    try:
+        assert replica_db.pick_session_factory() is replica_db.session_factory
+
+        for _ in range(4):
+            async with replica_db.session(read_only=True):
+                pass
+        assert checkouts == Counter({0: 2, 1: 2})
+
+        async with replica_db.session(read_only=True):
+            async with replica_db.session(read_only=True):
+                assert checkouts == Counter({0: 3, 1: 3})
+
+        async with replica_db.session():
+            pass
+        status = replica_db.pool_status()
+        assert status["acquired"] == 1
+        assert [replica["acquired"] for replica in status["replicas"]] == [3, 3]
+    finally:
+        await replica_db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_sticks_to_primary(monkeypatch):
+    """
+    Проверяет, что после записи клиент читает из основной БД
+    """
+    replica_db, checkouts = make_replica_db()
+    monkeypatch.setattr(repositories, "db", replica_db)
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as writer, AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as reader:
+
+            chat_resp = await writer.post("/chats/", json={"title": "Реплики"})
+            assert repositories.PRIMARY_STICKY_COOKIE in chat_resp.cookies
+            chat_id = chat_resp.json()["id"]
+
+            assert (await writer.get(f"/chats/{chat_id}")).status_code == 200
+            assert sum(checkouts.values()) == 0
+
+            assert (await reader.get("/chats/")).status_code == 200
+            assert sum(checkouts.values()) == 1
+
+            # Страница уже в кэше активных чатов: соединение не берется вовсе.
+            assert (await reader.get(f"/chats/{chat_id}")).status_code == 200
+            assert sum(checkouts.values()) == 1
+    finally:
+        await replica_db.dispose()
+
+
+@pytest.mark.asyncio
+async def test_caches_are_filled_from_primary(monkeypatch):
+    """
+    Проверяет, что промах кэша первой страницы читается из основной БД
+    (страница с отстающей реплики не попадает в кэш), а страницы
+    по курсору — из реплики
+    """
+    replica_db, checkouts = make_replica_db()
+    monkeypatch.setattr(repositories, "db", replica_db)
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as writer, AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as reader:
+            chat_id = (await writer.post("/chats/", json={"title": "Заполнение кэша"})).json()["id"]
+            for i in range(21):
+                await writer.post(f"/chats/{chat_id}/messages/", json={"text": f"{i}"})
+            hot_chat_cache.evict(chat_id)
+
+            page = (await reader.get(f"/chats/{chat_id}")).json()
+            assert page["messages"][0]["text"] == "20"
+            assert sum(checkouts.values()) == 0
+
+            older = await reader.get(f"/chats/{chat_id}?before={page['next_cursor']}")
+            assert [m["text"] for m in older.json()["messages"]] == ["0"]
+            assert sum(checkouts.values()) == 1
+    finally:
+        await replica_db.dispose()
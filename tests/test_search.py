@@ -0,0 +1,59 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import make_url
+
+from app.config import settings
+from app.main import app
+
+pytestmark = pytest.mark.skipif(
+    make_url(settings.pg_url).get_backend_name() != "postgresql",
+    reason="Полнотекстовый поиск есть только в PostgreSQL",
+)
+
+TEXTS = [
+    "Релиз готов, отчет внутри",
+    "Релиз, релиз, релиз: обсуждаем сроки",
+    "Погода сегодня хорошая",
+    "Сроки сдвигаются на неделю, отчет позже",
+]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_paginates_and_highlights():
+    """
+    Проверяет поиск в чате и по всем чатам: ранжирование, фрагменты
+    с подсветкой, keyset-пагинацию и ошибки
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_id = (await client.post("/chats/", json={"title": "Поиск"})).json()["id"]
+        other_id = (await client.post("/chats/", json={"title": "Другой"})).json()["id"]
+        await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": [{"text": t} for t in TEXTS]})
+        await client.post(f"/chats/{other_id}/messages/", json={"text": "Чужой релиз"})
+
+        resp = await client.get(f"/chats/{chat_id}/messages/search", params={"q": "релиз", "limit": 1})
+        assert resp.status_code == 200
+        first = resp.json()
+        assert [m["text"] for m in first["messages"]] == [TEXTS[1]]
+        assert "<b>Релиз</b>" in first["messages"][0]["snippet"]
+
+        rest = (await client.get(
+            f"/chats/{chat_id}/messages/search",
+            params={"q": "релиз", "limit": 10, "cursor": first["next_cursor"]},
+        )).json()
+        assert [m["text"] for m in rest["messages"]] == [TEXTS[0]]
+        assert rest["next_cursor"] is None
+
+        both = (await client.get(f"/chats/{chat_id}/messages/search", params={"q": "сроки отчет"})).json()
+        assert [m["text"] for m in both["messages"]] == [TEXTS[3]]
+
+        everywhere = (await client.get("/chats/messages/search", params={"q": "чужой"})).json()
+        assert [m["chat_id"] for m in everywhere["messages"]] == [other_id]
+
+        empty = await client.get(f"/chats/{chat_id}/messages/search", params={"q": "квазар"})
+        assert empty.status_code == 200 and empty.json()["messages"] == []
+        assert (await client.get("/chats/999999/messages/search", params={"q": "релиз"})).status_code == 404
+        assert (await client.get(f"/chats/{chat_id}/messages/search", params={"q": "x", "cursor": "!"})).status_code == 400
@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.cache.backends import InMemoryCacheBackend, RedisCacheBackend, RespConnection
+from app.cache.hot_chats import HotChatCache, hot_chat_cache
+from app.cache.shared import SharedChatCache, shared_chat_cache
+from app.main import app
+from app.realtime.hub import message_hub
+from app.schemas.responses import ChatWithMessagesResponseSchema, MessageResponseSchema
+
+
+class FakeRespServer:
+    """Минимальный сервер с протоколом Redis: строки, счетчики и pub/sub."""
+
+    def __init__(self):
+        self.values: dict[bytes, bytes] = {}
+        self.subscribers: dict[bytes, list[asyncio.StreamWriter]] = {}
+        self.server = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def stop(self) -> None:
+        self.server.close()
+        for writers in self.subscribers.values():
+            for writer in writers:
+                writer.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = RespConnection(reader, writer)
+        try:
+            while True:
+                command, *args = await connection.read_reply()
+                writer.write(self.reply(command.upper(), args, writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            writer.close()
+
+    def reply(self, command: bytes, args: list[bytes], writer: asyncio.StreamWriter) -> bytes:
+        if command == b"GET":
+            return self.bulk(self.values.get(args[0]))
+        if command == b"MGET":
+            return b"*%d\r\n" % len(args) + b"".join(self.bulk(self.values.get(key)) for key in args)
+        if command == b"SET":
+            self.values[args[0]] = args[1]
+            return b"+OK\r\n"
+        if command == b"INCR":
+            value = int(self.values.get(args[0], 0)) + 1
+            self.values[args[0]] = str(value).encode()
+            return b":%d\r\n" % value
+        if command == b"DEL":
+            return b":%d\r\n" % sum(self.values.pop(key, None) is not None for key in args)
+        if command == b"PUBLISH":
+            for subscriber in self.subscribers.get(args[0], []):
+                subscriber.write(RespConnection.encode(b"message", args[0], args[1]))
+            return b":%d\r\n" % len(self.subscribers.get(args[0], []))
+        if command == b"SUBSCRIBE":
+            self.subscribers.setdefault(args[0], []).append(writer)
+            return b"*3\r\n" + self.bulk(b"subscribe") + self.bulk(args[0]) + b":1\r\n"
+        return b":1\r\n"
+
+    @staticmethod
+    def bulk(value: bytes | None) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def make_page(chat_id: int, texts: list[str]) -> ChatWithMessagesResponseSchema:
+    now = datetime.now(timezone.utc)
+    return ChatWithMessagesResponseSchema(
+        id=chat_id,
+        title="Общий кэш",
+        created_at=now,
+        messages=[
+            MessageResponseSchema(id=i, chat_id=chat_id, text=text, created_at=now)
+            for i, text in enumerate(texts, start=1)
+        ],
+    )
+
+
+def make_worker(url: str) -> SharedChatCache:
+    local = HotChatCache(max_chats=10, max_messages=100, ttl=60, max_bytes=10 ** 6)
+    return SharedChatCache(RedisCacheBackend(url), local, ttl=60, max_messages=100)
+
+
+@pytest.mark.asyncio
+async def test_workers_share_pages_and_invalidations():
+    """
+    Проверяет общий кэш двух воркеров поверх фейкового Redis-сервера
+    """
+    server = FakeRespServer()
+    url = await server.start()
+    worker_a, worker_b = make_worker(url), make_worker(url)
+    await worker_a.start()
+    await worker_b.start()
+    try:
+        await asyncio.sleep(0.05)
+        page = make_page(1, ["первое", "второе"])
+
+        token = await worker_a.fill_token(1)
+        await worker_a.put(1, page, token)
+        assert await worker_b.get(1, 20) == page
+
+        worker_b.local.put(1, page, page.messages, worker_b.local.fill_token())
+        await worker_a.invalidate(1)
+        await asyncio.sleep(0.05)
+
+        assert worker_b.invalidations_received == 1
+        assert worker_b.local.get(1, 20) is None
+        assert await worker_b.get(1, 20) is None
+
+        await worker_b.put(1, page, token)
+        assert await worker_a.get(1, 20) is None
+    finally:
+        await worker_a.close()
+        await worker_b.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_cache_outage_does_not_fail_writes(monkeypatch):
+    """
+    Проверяет, что при недоступном общем кэше сохраненное сообщение
+    возвращает 201 и доходит до подписчиков потока, а удаление чата — 204
+    """
+    server = FakeRespServer()
+    url = await server.start()
+    await server.stop()
+    await server.server.wait_closed()
+    monkeypatch.setattr(shared_chat_cache, "backend", RedisCacheBackend(url))
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Кэш недоступен"})).json()["id"]
+        subscription = message_hub.subscribe(chat_id)
+        try:
+            resp = await client.post(f"/chats/{chat_id}/messages/", json={"text": "дошло"})
+            assert resp.status_code == 201
+            assert '"дошло"' in subscription.queue.get_nowait().data
+
+            resp = await client.post(f"/chats/{chat_id}/messages/batch", json={"messages": [{"text": "пачка"}]})
+            assert resp.status_code == 201
+            assert '"пачка"' in subscription.queue.get_nowait().data
+        finally:
+            message_hub.unsubscribe(subscription)
+        assert (await client.delete(f"/chats/{chat_id}")).status_code == 204
+
+
+class WriteFailingBackend(InMemoryCacheBackend):
+    """Хранилище, которое читается, но не принимает записи."""
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise ConnectionError("cache is read-only")
+
+
+@pytest.mark.asyncio
+async def test_cache_outage_does_not_fail_reads(monkeypatch):
+    """
+    Проверяет, что первая страница истории читается из БД, когда общий кэш
+    не отвечает, не принимает записи или молчит дольше таймаута
+    """
+    server = FakeRespServer()
+    url = await server.start()
+    await server.stop()
+    await server.server.wait_closed()
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Кэш недоступен"})).json()["id"]
+        await client.post(f"/chats/{chat_id}/messages/", json={"text": "из БД"})
+
+        for backend in (RedisCacheBackend(url), WriteFailingBackend()):
+            monkeypatch.setattr(shared_chat_cache, "backend", backend)
+            hot_chat_cache.evict(chat_id)
+            resp = await client.get(f"/chats/{chat_id}")
+            assert resp.status_code == 200
+            assert [m["text"] for m in resp.json()["messages"]] == ["из БД"]
+
+    silent = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+    host, port = silent.sockets[0].getsockname()[:2]
+    try:
+        backend = RedisCacheBackend(f"redis://{host}:{port}/0", timeout=0.05)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(backend.get("chat:1:page"), 1)
+    finally:
+        silent.close()
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.dependencies.repositories import get_stream_chat_use_case
+from app.main import app
+from app.realtime.hub import MessageHub, RESET_EVENT, message_event
+from app.schemas.cursors import MessageCursor
+from app.schemas.responses import MessageResponseSchema
+
+
+def event_text(event: str) -> str:
+    data = next(line for line in event.splitlines() if line.startswith("data: "))
+    return json.loads(data[len("data: "):])["text"]
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_since_cursor_and_delivers_live_messages():
+    """
+    Проверяет догон по курсору, доставку новых сообщений и закрытие потока при удалении чата
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+
+        chat_id = (await client.post("/chats/", json={"title": "Поток"})).json()["id"]
+        for text in ("первое", "второе"):
+            await client.post(f"/chats/{chat_id}/messages/", json={"text": text})
+        oldest = (await client.get(f"/chats/{chat_id}")).json()["messages"][-1]
+        since = MessageCursor(created_at=oldest["created_at"], id=oldest["id"]).encode()
+
+        use_case = await get_stream_chat_use_case()
+        subscription, cursor = await use_case.subscribe(chat_id, since)
+        events = use_case.events(subscription, cursor)
+
+        assert event_text(await anext(events)) == "второе"
+
+        await client.post(f"/chats/{chat_id}/messages/", json={"text": "третье"})
+        assert event_text(await anext(events)) == "третье"
+
+        await client.delete(f"/chats/{chat_id}")
+        assert (await anext(events)).startswith("event: deleted")
+        with pytest.raises(StopAsyncIteration):
+            await anext(events)
+
+        missing_resp = await client.get(f"/chats/{chat_id}/stream")
+        assert missing_resp.status_code == 404
+
+
+def test_slow_subscriber_is_reset():
+    """
+    Проверяет, что переполненная очередь подписчика не растет, а он получает reset
+    """
+    hub = MessageHub(queue_size=2)
+    slow = hub.subscribe(1)
+    for i in range(5):
+        message = {"id": i, "chat_id": 1, "text": str(i), "created_at": "2026-01-01T00:00:00Z"}
+        hub.publish(1, message_event(MessageResponseSchema(**message)))
+
+    assert slow.closed
+    assert slow.queue.qsize() == 1
+    assert slow.queue.get_nowait() == RESET_EVENT
+    assert hub.stats()["slow_consumers_dropped"] == 1
+    assert not hub.has_subscribers(1)
@@ -0,0 +1,56 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+
+from app.database.db import db
+from app.main import app
+from app.repositories.unit_of_work import UnitOfWork
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once_or_rolls_back():
+    """
+    Проверяет, что вызовы нескольких репозиториев фиксируются одной транзакцией,
+    а при ошибке откатываются целиком
+    """
+    async with UnitOfWork(db.session) as uow:
+        chat = await uow.chats.create_chat("Единица работы")
+        await uow.messages.send_messages(chat.id, ["раз", "два"])
+
+    with pytest.raises(RuntimeError):
+        async with UnitOfWork(db.session) as uow:
+            await uow.messages.send_messages(chat.id, ["три"])
+            await uow.chats.create_chat("Не сохранится")
+            raise RuntimeError("откат")
+
+    async with UnitOfWork(db.session, read_only=True) as uow:
+        page = await uow.messages.get_chat_page(chat.id, 20)
+        with pytest.raises(RuntimeError):
+            await uow.commit()
+    assert {m.text for m in page[1]} == {"раз", "два"}
+
+
+@pytest.mark.asyncio
+async def test_requests_commit_once_and_reads_never_commit():
+    """
+    Проверяет, что запрос на запись отправляет один COMMIT, а чтение — ни одного
+    """
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    event.listen(db.engine.sync_engine, "commit", listener)
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://test"
+        ) as client:
+            chat_id = (await client.post("/chats/", json={"title": "Коммиты"})).json()["id"]
+            assert len(commits) == 1
+
+            await client.post(f"/chats/{chat_id}/messages/", json={"text": "Привет"})
+            assert len(commits) == 2
+
+            assert (await client.get(f"/chats/{chat_id}?limit=20")).status_code == 200
+            assert (await client.get("/chats/")).status_code == 200
+            assert len(commits) == 2
+    finally:
+        event.remove(db.engine.sync_engine, "commit", listener)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.database.db import db
+from app.dependencies import repositories
+from app.main import app
+from app.repositories.exceptions import ChatNotFoundError
+from app.repositories.unit_of_work import UnitOfWork
+from app.repositories.write_coalescer import MessageWriteCoalescer
+
+
+async def make_chats(count: int) -> list[int]:
+    async with UnitOfWork(db.session) as uow:
+        return [(await uow.chats.create_chat(f"пачка {i}")).id for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sends_share_one_transaction():
+    """
+    Проверяет, что одновременные сообщения разных чатов сохраняются одной
+    пачкой, каждый отправитель получает свое сообщение, а сообщение
+    в несуществующий чат — свою ошибку
+    """
+    first, second = await make_chats(2)
+    coalescer = MessageWriteCoalescer(db.session_factory, max_delay=0.05, max_batch=100)
+    targets = [first, second, first, 999999, second, first]
+    results = await asyncio.gather(
+        *(coalescer.send(chat_id, f"сообщение {i}") for i, chat_id in enumerate(targets)),
+        return_exceptions=True,
+    )
+    assert isinstance(results[3], ChatNotFoundError)
+    sent = [r for r in results if not isinstance(r, Exception)]
+    assert [(r.chat_id, r.text) for r in sent] == [
+        (chat_id, f"сообщение {i}") for i, chat_id in enumerate(targets) if chat_id != 999999
+    ]
+    assert len({r.id for r in sent}) == 5
+    assert coalescer.stats() == {"batches": 1, "messages": 5, "avg_batch": 5.0, "fallbacks": 0}
+
+    async with UnitOfWork(db.session, read_only=True) as uow:
+        listed = {chat.id: chat for chat in await uow.chats.list_chats(100)}
+    assert listed[first].message_count == 3 and listed[first].last_message_id == sent[4].id
+    assert listed[second].message_count == 2 and listed[second].last_message_id == sent[3].id
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_single_inserts():
+    """
+    Проверяет, что при ошибке пачки сообщения сохраняются по одному
+    и ошибка достается только отправителю некорректного сообщения
+    """
+    (chat_id,) = await make_chats(1)
+    coalescer = MessageWriteCoalescer(db.session_factory, max_delay=0.05, max_batch=3)
+    results = await asyncio.gather(
+        coalescer.send(chat_id, "до"),
+        coalescer.send(chat_id, "нулевой байт \x00"),
+        coalescer.send(chat_id, "после"),
+        return_exceptions=True,
+    )
+    assert [r.text for r in (results[0], results[2])] == ["до", "после"]
+    assert isinstance(results[1], Exception)
+    assert coalescer.stats()["fallbacks"] == 1
+    await coalescer.close()
+
+
+@pytest.mark.asyncio
+async def test_send_message_endpoint_uses_coalescer(monkeypatch):
+    """
+    Проверяет отправку через API с включенным групповым коммитом, включая 404
+    """
+    coalescer = MessageWriteCoalescer(db.session_factory, max_delay=0.01, max_batch=50)
+    monkeypatch.setattr(repositories, "message_write_coalescer", coalescer)
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as client:
+        chat_id = (await client.post("/chats/", json={"title": "Групповой коммит"})).json()["id"]
+        responses = await asyncio.gather(
+            *(client.post(f"/chats/{chat_id}/messages/", json={"text": f"{i}"}) for i in range(10))
+        )
+        assert [r.status_code for r in responses] == [201] * 10
+        assert (await client.post("/chats/999999/messages/", json={"text": "x"})).status_code == 404
+
+        page = (await client.get(f"/chats/{chat_id}?limit=20")).json()
+        assert sorted(m["text"] for m in page["messages"]) == sorted(f"{i}" for i in range(10))
+    assert coalescer.stats()["messages"] == 10